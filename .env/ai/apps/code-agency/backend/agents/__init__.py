@@ -3,6 +3,8 @@ from .chat_agent import ChatAgent
 from .code_agent import CodeAgent
 from .codriver_agent import CoDriverAgent
 from .router import AgentRouter
+from .intent import KeywordAutomaton,IntentRules,IntentMatch,IntentClassifier
+from .health_monitor import CircuitState,CircuitBreaker,HealthMonitor
 
 __all__ = [
     'AgentType',
@@ -14,4 +16,11 @@ __all__ = [
     'CodeAgent',
     'CoDriverAgent',
     'AgentRouter',
+    'KeywordAutomaton',
+    'IntentRules',
+    'IntentMatch',
+    'IntentClassifier',
+    'CircuitState',
+    'CircuitBreaker',
+    'HealthMonitor',
 ]
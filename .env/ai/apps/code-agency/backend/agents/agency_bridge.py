@@ -8,14 +8,21 @@ import logging
 from typing import Dict, List, Optional, Any
 import json
 
+from .health_monitor import get_health_monitor
+
 logger = logging.getLogger(__name__)
 
 class AgencyBridge:
     """Bridge to communicate with Rust agency agents via API Gateway"""
 
-    def __init__(self, gateway_url: str = "http://127.0.0.1:9013"):
+    def __init__(self, gateway_url: str = "http://127.0.0.1:9013",
+                 coordinator_url: str = "http://127.0.0.1:9015"):
         self.gateway_url = gateway_url
+        self.coordinator_url = coordinator_url
         self.client = httpx.AsyncClient(timeout=30.0)
+        # Shared with CoordinatorAgent so both fail fast on the same breaker
+        self.gateway_health = get_health_monitor(gateway_url)
+        self.coordinator_health = get_health_monitor(coordinator_url)
         logger.info(f"Agency Bridge initialized with gateway: {gateway_url}")
 
     async def close(self):
@@ -23,13 +30,8 @@ class AgencyBridge:
         await self.client.aclose()
 
     async def check_gateway_health(self) -> bool:
-        """Check if API gateway is available"""
-        try:
-            response = await self.client.get(f"{self.gateway_url}/health")
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"Gateway health check failed: {e}")
-            return False
+        """Check if API gateway is available (cached by the shared health monitor)"""
+        return await self.gateway_health.check()
 
     async def list_services(self) -> List[Dict[str, Any]]:
         """Get list of available agency services"""
@@ -62,6 +64,9 @@ class AgencyBridge:
         """
         url = f"{self.gateway_url}/api/{service_name}/{endpoint}"
 
+        if not self.gateway_health.is_available():
+            return {"error": "Gateway unavailable", "detail": "Circuit open - gateway is failing health checks"}
+
         try:
             if method.upper() == "GET":
                 response = await self.client.get(url, params=data)
@@ -74,12 +79,20 @@ class AgencyBridge:
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
+            if response.status_code >= 500:
+                self.gateway_health.record_failure()
+            else:
+                self.gateway_health.record_success()
             response.raise_for_status()
             return response.json()
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Agent call failed ({service_name}/{endpoint}): {e}")
             return {"error": f"HTTP {e.response.status_code}", "detail": str(e)}
+        except httpx.TransportError as e:
+            logger.error(f"Gateway unreachable ({service_name}/{endpoint}): {e}")
+            self.gateway_health.record_failure()
+            return {"error": "Gateway unavailable", "detail": str(e)}
         except Exception as e:
             logger.error(f"Agent call error ({service_name}/{endpoint}): {e}")
             return {"error": "Request failed", "detail": str(e)}
@@ -158,12 +171,23 @@ class AgencyBridge:
         Execute natural language instruction through command-coordinator
         Uses Ollama to parse intent and route to appropriate agents
         """
+        if not self.coordinator_health.is_available():
+            return {"error": "Coordinator unavailable", "detail": "Circuit open - coordinator is failing health checks"}
+
         try:
             # Command coordinator is on port 9015 directly
-            url = "http://127.0.0.1:9015/execute"
+            url = f"{self.coordinator_url}/execute"
             response = await self.client.post(url, json={"command": instruction})
+            if response.status_code >= 500:
+                self.coordinator_health.record_failure()
+            else:
+                self.coordinator_health.record_success()
             response.raise_for_status()
             return response.json()
+        except httpx.TransportError as e:
+            logger.error(f"Coordinator unreachable: {e}")
+            self.coordinator_health.record_failure()
+            return {"error": "Coordinator unavailable", "detail": str(e)}
         except Exception as e:
             logger.error(f"Natural language execution failed: {e}")
             return {"error": "Execution failed", "detail": str(e)}
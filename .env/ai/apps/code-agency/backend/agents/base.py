@@ -5,6 +5,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from .intent import IntentMatch, IntentRules, intent_classifier
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +56,10 @@ class BaseAgent(ABC):
         self.system_prompt = self._get_system_prompt()
         self.capabilities = self._define_capabilities()
         
+        rules = self._define_intent_rules()
+        if rules is not None:
+            intent_classifier.register(self.name, rules)
+        
     @abstractmethod
     def _get_system_prompt(self) -> str:
         """Return the system prompt for this agent"""
@@ -64,6 +70,10 @@ class BaseAgent(ABC):
         """Define what this agent can do"""
         pass
     
+    def _define_intent_rules(self) -> Optional[IntentRules]:
+        """Keywords/patterns compiled into the shared routing classifier"""
+        return None
+    
     @abstractmethod
     async def process_message(self, context: AgentContext) -> AgentResponse:
         """Process a message and return response"""
@@ -74,6 +84,13 @@ class BaseAgent(ABC):
         Determine if this agent can handle the message
         Returns confidence score 0.0 to 1.0
         """
+        return self.score_intent(intent_classifier.match(message))
+    
+    def score_intent(self, match: IntentMatch) -> float:
+        """
+        Score a pre-computed intent match for this agent
+        Returns confidence score 0.0 to 1.0
+        """
         # Default implementation - can be overridden by specific agents
         return 0.5
     
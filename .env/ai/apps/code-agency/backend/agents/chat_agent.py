@@ -2,6 +2,7 @@ import logging
 from typing import List, AsyncGenerator
 
 from .base import BaseAgent, AgentType, AgentContext, AgentResponse
+from .intent import IntentMatch, IntentRules
 from ..inference.generator import text_generator
 from ..inference.sampler import SamplingConfig
 
@@ -41,20 +42,23 @@ class ChatAgent(BaseAgent):
             "research_assistance",
         ]
 
-    def can_handle(self, message: str, context: AgentContext) -> float:
-        message_lower = message.lower()
-        conversation_indicators = [
-            "what", "why", "how", "when", "where", "who",
-            "explain", "tell me", "help me understand",
-            "think", "opinion", "suggest", "recommend"
-        ]
-        technical_indicators = [
-            "code", "function", "class", "variable", "debug",
-            "error", "bug", "compile", "syntax", "git",
-            "terminal", "command", "script"
-        ]
-        conversation_score = sum(1 for i in conversation_indicators if i in message_lower)
-        technical_score = sum(1 for i in technical_indicators if i in message_lower)
+    def _define_intent_rules(self) -> IntentRules:
+        return IntentRules(keywords={
+            "conversation": [
+                "what", "why", "how", "when", "where", "who",
+                "explain", "tell me", "help me understand",
+                "think", "opinion", "suggest", "recommend"
+            ],
+            "technical": [
+                "code", "function", "class", "variable", "debug",
+                "error", "bug", "compile", "syntax", "git",
+                "terminal", "command", "script"
+            ],
+        })
+
+    def score_intent(self, match: IntentMatch) -> float:
+        conversation_score = match.count(self.name, "conversation")
+        technical_score = match.count(self.name, "technical")
 
         confidence = 0.7 + min(conversation_score * 0.1, 0.2) - min(technical_score * 0.15, 0.3)
         return max(0.1, min(1.0, confidence))
@@ -105,6 +105,17 @@ class ChatClient:
             elif in_message:
                 current_msg.append(line)
         
+        # Partials ([SENDING <id>]) are superseded once their [FINAL <id>] arrives
+        finished = {
+            header.split('[FINAL ', 1)[1].split(']')[0]
+            for header in (msg.split('\n', 1)[0] for msg in messages)
+            if '[FINAL ' in header
+        }
+        messages = [
+            msg for msg in messages
+            if not any(f"[SENDING {stream_id}]" in msg.split('\n', 1)[0] for stream_id in finished)
+        ]
+        
         return messages[-lines:]
     
     def format_message(self, message: str) -> str:
@@ -1,11 +1,14 @@
+import asyncio
 import logging
 import re
 from typing import List, Dict, Any
 
 from .base import BaseAgent, AgentType, AgentContext, AgentResponse
+from .intent import IntentMatch, IntentRules
 from ..inference.generator import text_generator
 from ..inference.sampler import SamplingConfig
 from ..ide.file_manager import file_manager
+from ..ide.code_index import code_index
 
 logger = logging.getLogger(__name__)
 
@@ -37,47 +40,50 @@ Always follow best practices, include comments, and consider error handling. Ref
             "best_practices"
         ]
 
-    def can_handle(self, message: str, context: AgentContext) -> float:
+    def _define_intent_rules(self) -> IntentRules:
+        return IntentRules(
+            keywords={
+                "programming": [
+                    "import", "export", "class", "def", "function", "var", "let", "const",
+                    "if", "else", "for", "while", "try", "catch", "async", "await",
+                    "return", "yield", "break", "continue", "lambda", "map", "filter",
+                    "api", "database", "server", "client", "framework", "library",
+                    "git", "commit", "push", "pull", "merge", "branch"
+                ],
+                "language": [
+                    "python", "javascript", "typescript", "rust", "golang", "java",
+                    "react", "vue", "angular", "django", "flask", "fastapi", "nodejs",
+                    "sql", "mongodb", "postgresql", "redis", "docker", "kubernetes"
+                ],
+                "extension": [".py", ".js", ".ts", ".rs", ".go", ".java"],
+                "non_technical": ["what is", "explain", "tell me about", "general", "opinion"],
+            },
+            patterns={
+                "code_terms": r'\b(code|function|class|method|variable)\b',
+                "debugging": r'\b(debug|error|bug|fix|syntax)\b',
+                "build_request": r'\b(write|create|build|implement)\b.*\b(function|class|script)\b',
+                "refactor_request": r'\b(optimize|refactor|improve)\b.*\b(code|function)\b',
+                "algorithms": r'\b(algorithm|data structure)\b',
+                "code_block": r'```.*```',
+                "file_suffix": r'\.(py|js|ts|rs|go|java|cpp|c|html|css|sql)$',
+            }
+        )
+
+    def score_intent(self, match: IntentMatch) -> float:
         """Determine confidence for coding requests."""
-        message_lower = message.lower()
         confidence = 0.3
+        confidence += match.pattern_count(self.name) * 0.2
 
-        high_patterns = [
-            r'\b(code|function|class|method|variable)\b',
-            r'\b(debug|error|bug|fix|syntax)\b', 
-            r'\b(write|create|build|implement)\b.*\b(function|class|script)\b',
-            r'\b(optimize|refactor|improve)\b.*\b(code|function)\b',
-            r'\b(algorithm|data structure)\b',
-            r'```.*```',
-            r'\.(py|js|ts|rs|go|java|cpp|c|html|css|sql)$'
-        ]
-        for p in high_patterns:
-            if re.search(p, message_lower):
-                confidence += 0.2
-
-        programming_keywords = [
-            "import", "export", "class", "def", "function", "var", "let", "const",
-            "if", "else", "for", "while", "try", "catch", "async", "await",
-            "return", "yield", "break", "continue", "lambda", "map", "filter",
-            "api", "database", "server", "client", "framework", "library",
-            "git", "commit", "push", "pull", "merge", "branch"
-        ]
-        keyword_matches = sum(1 for k in programming_keywords if k in message_lower)
+        keyword_matches = match.count(self.name, "programming")
         confidence += min(keyword_matches * 0.1, 0.3)
 
-        language_terms = [
-            "python", "javascript", "typescript", "rust", "golang", "java",
-            "react", "vue", "angular", "django", "flask", "fastapi", "nodejs",
-            "sql", "mongodb", "postgresql", "redis", "docker", "kubernetes"
-        ]
-        language_matches = sum(1 for t in language_terms if t in message_lower)
+        language_matches = match.count(self.name, "language")
         confidence += min(language_matches * 0.15, 0.2)
 
-        if any(ext in message_lower for ext in ['.py', '.js', '.ts', '.rs', '.go', '.java']):
+        if match.has(self.name, "extension"):
             confidence += 0.2
 
-        non_technical = ["what is", "explain", "tell me about", "general", "opinion"]
-        if any(phrase in message_lower for phrase in non_technical) and not any(k in message_lower for k in programming_keywords):
+        if match.has(self.name, "non_technical") and not keyword_matches:
             confidence -= 0.2
 
         return max(0.1, min(1.0, confidence))
@@ -130,7 +136,8 @@ Always follow best practices, include comments, and consider error handling. Ref
 
         for filename in referenced_files[:3]:
             try:
-                file_data = file_manager.read_file(filename)
+                # Only the head of the file reaches the prompt, so large files are not read in full
+                file_data = await asyncio.to_thread(file_manager.read_file, filename, end_line=200)
                 if file_data.get("content") and not file_data.get("is_binary", False):
                     file_context["files"].append({
                         "name": filename,
@@ -140,9 +147,26 @@ Always follow best practices, include comments, and consider error handling. Ref
             except Exception as e:
                 logger.debug(f"Could not read file {filename}: {e}")
 
+        # Fill the remaining slots with the most relevant indexed snippets
+        remaining = 3 - len(file_context["files"])
+        if remaining > 0:
+            try:
+                loaded = {f["name"] for f in file_context["files"]}
+                # Ranking reads candidate files from disk, so it runs in a worker thread
+                snippets = await asyncio.to_thread(code_index.retrieve, message, limit=remaining, exclude=loaded)
+                for snippet in snippets:
+                    file_context["files"].append({
+                        "name": f"{snippet['path']} (lines {snippet['start_line']}-{snippet['end_line']})",
+                        "content": snippet["content"],
+                        "language": snippet["language"]
+                    })
+            except Exception as e:
+                logger.debug(f"Could not retrieve workspace snippets: {e}")
+
         if not file_context["files"]:
             try:
-                tree = file_manager.get_file_tree("", max_depth=2)
+                # Served from the in-memory tree index; the prompt only shows 10 entries per directory
+                tree = file_manager.get_file_tree("", max_depth=2, max_children=10)
                 if not tree.get("error"):
                     file_context["project_structure"] = tree
             except Exception as e:
@@ -4,6 +4,7 @@ from typing import List, Dict, Any, Optional
 from .base import BaseAgent, AgentType, AgentContext, AgentResponse
 from .chat_agent import chat_agent
 from .code_agent import code_agent
+from .intent import IntentMatch, IntentRules, intent_classifier
 from ..inference.generator import text_generator
 from ..inference.sampler import SamplingConfig
 
@@ -51,37 +52,39 @@ You are the primary interface - users talk to you, and you manage the other agen
             "strategic_thinking"
         ]
     
-    def can_handle(self, message: str, context: AgentContext) -> float:
+    def _define_intent_rules(self) -> IntentRules:
+        return IntentRules(keywords={
+            # High confidence for coordination requests
+            "coordination": [
+                "help me", "plan", "strategy", "approach", "steps", "process",
+                "manage", "organize", "coordinate", "break down", "analyze",
+                "what should i", "how do i", "best way", "recommend"
+            ],
+            # High confidence for complex multi-part requests
+            "complex": [
+                "and", "then", "also", "plus", "additionally", "furthermore",
+                "first", "second", "finally", "step by step"
+            ],
+            # Request analysis indicators
+            "multiple_tasks": ["and", "then", "also", "plus"],
+            "planning_words": ["plan", "strategy", "approach", "steps"],
+            "coordination_needed": ["coordinate", "manage", "organize"],
+        })
+
+    def score_intent(self, match: IntentMatch) -> float:
         """CoDriver can handle anything, but with varying confidence"""
-        message_lower = message.lower()
-        
-        # High confidence for coordination requests
-        coordination_patterns = [
-            "help me", "plan", "strategy", "approach", "steps", "process",
-            "manage", "organize", "coordinate", "break down", "analyze",
-            "what should i", "how do i", "best way", "recommend"
-        ]
-        
-        # High confidence for complex multi-part requests
-        complex_patterns = [
-            "and", "then", "also", "plus", "additionally", "furthermore",
-            "first", "second", "finally", "step by step"
-        ]
-        
         # Detect if other agents might be more specialized
-        chat_score = chat_agent.can_handle(message, context)
-        code_score = code_agent.can_handle(message, context)
+        chat_score = chat_agent.score_intent(match)
+        code_score = code_agent.score_intent(match)
         
         base_confidence = 0.6
         
         # Boost for coordination language
-        coord_matches = sum(1 for pattern in coordination_patterns 
-                          if pattern in message_lower)
+        coord_matches = match.count(self.name, "coordination")
         base_confidence += min(coord_matches * 0.1, 0.2)
         
         # Boost for complex requests
-        complex_matches = sum(1 for pattern in complex_patterns 
-                            if pattern in message_lower)
+        complex_matches = match.count(self.name, "complex")
         base_confidence += min(complex_matches * 0.05, 0.15)
         
         # If other agents are highly confident, reduce CoDriver confidence
@@ -124,14 +127,15 @@ You are the primary interface - users talk to you, and you manage the other agen
     def _analyze_request(self, context: AgentContext) -> Dict[str, Any]:
         """Analyze the complexity and nature of the request"""
         message = context.message.lower()
+        match = intent_classifier.match(context.message)
         
         # Count complexity indicators
         complexity_indicators = {
-            "multiple_tasks": len([word for word in ["and", "then", "also", "plus"] if word in message]),
-            "planning_words": len([word for word in ["plan", "strategy", "approach", "steps"] if word in message]),
+            "multiple_tasks": match.count(self.name, "multiple_tasks"),
+            "planning_words": match.count(self.name, "planning_words"),
             "question_marks": message.count("?"),
             "sentence_count": len([s for s in message.split(".") if s.strip()]),
-            "coordination_needed": any(word in message for word in ["coordinate", "manage", "organize"])
+            "coordination_needed": match.has(self.name, "coordination_needed")
         }
         
         # Determine complexity
@@ -150,8 +154,8 @@ You are the primary interface - users talk to you, and you manage the other agen
             complexity = "complex"
         
         # Determine best specialist agents
-        chat_confidence = chat_agent.can_handle(context.message, context)
-        code_confidence = code_agent.can_handle(context.message, context)
+        chat_confidence = chat_agent.score_intent(match)
+        code_confidence = code_agent.score_intent(match)
         
         return {
             "complexity": complexity,
@@ -279,8 +283,9 @@ Provide a comprehensive response that:
         """Assign each step to the most appropriate agent"""
         assignments = {}
         for step in steps:
-            chat_score = chat_agent.can_handle(step, AgentContext(step))
-            code_score = code_agent.can_handle(step, AgentContext(step))
+            match = intent_classifier.match(step)
+            chat_score = chat_agent.score_intent(match)
+            code_score = code_agent.score_intent(match)
             if code_score > chat_score:
                 assignments[step] = "code"
             else:
@@ -9,9 +9,13 @@ from typing import List, Optional, AsyncGenerator
 import json
 
 from .base import BaseAgent, AgentType, AgentContext, AgentResponse
+from .intent import IntentMatch, IntentRules, intent_classifier
+from .health_monitor import get_health_monitor
 
 logger = logging.getLogger(__name__)
 
+OFFLINE_MESSAGE = "⚠️ Command Coordinator is offline. Please start the agency: ./start-agency.sh"
+
 class CoordinatorAgent(BaseAgent):
     """
     Agent that routes all requests through the Rust Command Coordinator.
@@ -24,6 +28,7 @@ class CoordinatorAgent(BaseAgent):
         super().__init__(AgentType.COORDINATOR, "CommandCoordinator")
         self.coordinator_url = coordinator_url
         self.client = httpx.AsyncClient(timeout=120.0)  # 2 min for complex generations
+        self.health = get_health_monitor(coordinator_url)
         logger.info(f"Coordinator Agent initialized: {coordinator_url}")
 
     async def close(self):
@@ -45,18 +50,22 @@ class CoordinatorAgent(BaseAgent):
             "multi_agent_orchestration"
         ]
 
-    def can_handle(self, message: str, context: AgentContext) -> float:
+    def _define_intent_rules(self) -> IntentRules:
+        """Keyword classes used by _select_model"""
+        return IntentRules(keywords={
+            "code": ["code", "function", "class", "implement", "create", "build", "develop"],
+            "advanced": ["complex", "advanced", "optimize", "refactor"],
+            "sql": ["sql", "query", "database", "select", "table"],
+            "quick": ["quick", "simple", "fast", "just"],
+        })
+
+    def score_intent(self, match: IntentMatch) -> float:
         """Coordinator can handle everything - it routes to specialists"""
         return 1.0  # Always confident - it delegates
 
     async def check_health(self) -> bool:
-        """Check if command-coordinator is available"""
-        try:
-            response = await self.client.get(f"{self.coordinator_url}/health")
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"Coordinator health check failed: {e}")
-            return False
+        """Check if command-coordinator is available (cached by the shared health monitor)"""
+        return await self.health.check()
 
     async def process_message(self, context: AgentContext) -> AgentResponse:
         """
@@ -68,26 +77,17 @@ class CoordinatorAgent(BaseAgent):
         3. Return consolidated results
         """
         try:
-            # Check if coordinator is available
-            is_healthy = await self.check_health()
-            if not is_healthy:
+            # Fail fast while the circuit is open (no per-request health probe)
+            if not self.health.is_available():
                 return AgentResponse(
-                    content="⚠️ Command Coordinator is offline. Please start the agency: ./start-agency.sh",
+                    content=OFFLINE_MESSAGE,
                     agent_type=self.agent_type,
                     confidence=0.0,
                     metadata={"error": "Coordinator offline"}
                 )
 
             # Prepare request for coordinator
-            request_data = {
-                "command": context.message,
-                "model": self._select_model(context.message),
-                "context": {
-                    "conversation_id": context.conversation_id,
-                    "user_id": context.user_id,
-                    "history": context.conversation_history[:500] if context.conversation_history else None
-                }
-            }
+            request_data = self._build_request(context)
 
             # Route through coordinator
             logger.info(f"Routing to coordinator: {context.message[:50]}...")
@@ -96,8 +96,11 @@ class CoordinatorAgent(BaseAgent):
                 json=request_data,
                 timeout=120.0
             )
+            if response.status_code >= 500:
+                self.health.record_failure()
             response.raise_for_status()
             result = response.json()
+            self.health.record_success()
 
             # Extract response
             if result.get("success"):
@@ -127,12 +130,22 @@ class CoordinatorAgent(BaseAgent):
 
         except httpx.TimeoutException:
             logger.error("Coordinator request timed out")
+            self.health.record_failure()
             return AgentResponse(
                 content="⏱️ Request timed out. The task may be complex - try breaking it into smaller steps.",
                 agent_type=self.agent_type,
                 confidence=0.0,
                 metadata={"error": "timeout"}
             )
+        except httpx.TransportError as e:
+            logger.error(f"Coordinator unreachable: {e}")
+            self.health.record_failure()
+            return AgentResponse(
+                content=OFFLINE_MESSAGE,
+                agent_type=self.agent_type,
+                confidence=0.0,
+                metadata={"error": "Coordinator offline"}
+            )
         except Exception as e:
             logger.error(f"Coordinator agent error: {e}")
             return AgentResponse(
@@ -142,6 +155,18 @@ class CoordinatorAgent(BaseAgent):
                 metadata={"error": str(e)}
             )
 
+    def _build_request(self, context: AgentContext) -> dict:
+        """Build the coordinator request payload"""
+        return {
+            "command": context.message,
+            "model": self._select_model(context.message),
+            "context": {
+                "conversation_id": context.conversation_id,
+                "user_id": context.user_id,
+                "history": context.conversation_history[:500] if context.conversation_history else None
+            }
+        }
+
     def _select_model(self, message: str) -> str:
         """
         Select appropriate Ollama model based on task type.
@@ -152,20 +177,20 @@ class CoordinatorAgent(BaseAgent):
         - deepcoder:14b - Advanced coding
         - smallthinker:3b - Fast simple tasks
         """
-        message_lower = message.lower()
+        match = intent_classifier.match(message)
 
         # Code generation tasks
-        if any(word in message_lower for word in ["code", "function", "class", "implement", "create", "build", "develop"]):
-            if any(word in message_lower for word in ["complex", "advanced", "optimize", "refactor"]):
+        if match.has(self.name, "code"):
+            if match.has(self.name, "advanced"):
                 return "deepcoder:14b"
             return "codellama:13b"
 
         # SQL generation
-        if any(word in message_lower for word in ["sql", "query", "database", "select", "table"]):
+        if match.has(self.name, "sql"):
             return "duckdb-nsql:7b"
 
         # Quick tasks
-        if any(word in message_lower for word in ["quick", "simple", "fast", "just"]):
+        if match.has(self.name, "quick"):
             return "smallthinker:3b"
 
         # Default: best general model
@@ -199,18 +224,88 @@ class CoordinatorAgent(BaseAgent):
 
     async def stream_message(self, context: AgentContext) -> AsyncGenerator[str, None]:
         """
-        Stream response from coordinator (not yet implemented in coordinator).
-        For now, we'll do a non-streaming request and yield chunks.
+        Stream response from coordinator as it is produced.
+
+        Reads newline-delimited JSON events (plain NDJSON or SSE "data:" lines)
+        from POST /command/stream:
+            {"type": "token", "content": "..."}
+            {"type": "agent_result", "agent": "...", "content": "..."}
+            {"type": "done", "actions_taken": [...], "execution_time_ms": 0}
+            {"type": "error", "error": "..."}
+
+        Closing the generator (e.g. when the websocket goes away) closes the
+        upstream connection, which cancels the coordinator task. Coordinators
+        without a streaming endpoint fall back to a single /command round trip.
         """
-        response = await self.process_message(context)
+        if not self.health.is_available():
+            yield OFFLINE_MESSAGE
+            return
 
-        # Yield in chunks for streaming effect
-        words = response.content.split()
-        chunk_size = 5
+        request_data = self._build_request(context)
+        logger.info(f"Streaming from coordinator: {context.message[:50]}...")
 
-        for i in range(0, len(words), chunk_size):
-            chunk = " ".join(words[i:i+chunk_size]) + " "
-            yield chunk
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.coordinator_url}/command/stream",
+                json=request_data,
+                timeout=httpx.Timeout(120.0, read=None)  # idle gaps between events are expected
+            ) as response:
+                if response.status_code not in (404, 405):
+                    if response.status_code >= 500:
+                        self.health.record_failure()
+                    response.raise_for_status()
+                    self.health.record_success()
+
+                    async for line in response.aiter_lines():
+                        event = self._parse_stream_line(line)
+                        if event is None:
+                            continue
+
+                        event_type = event.get("type")
+                        if event_type == "error":
+                            yield f"⚠️ Error: {event.get('error', 'Unknown error')}"
+                            return
+                        if event_type == "done":
+                            return
+
+                        text = event.get("content", "")
+                        if event_type == "agent_result" and text:
+                            text = f"{text}\n\n"
+                        if text:
+                            yield text
+                    return
+
+        except httpx.TransportError as e:
+            logger.error(f"Coordinator stream failed: {e}")
+            self.health.record_failure()
+            yield OFFLINE_MESSAGE
+            return
+        except Exception as e:
+            logger.error(f"Coordinator stream error: {e}")
+            yield f"❌ Error communicating with coordinator: {str(e)}"
+            return
+
+        # No streaming endpoint on this coordinator - deliver the full result at once.
+        # The coordinator did answer, so settle the breaker first: a half-open
+        # trial taken above would otherwise make process_message report offline
+        logger.debug("Coordinator has no /command/stream endpoint, falling back to /command")
+        self.health.record_success()
+        response = await self.process_message(context)
+        yield response.content
+
+    def _parse_stream_line(self, line: str) -> Optional[dict]:
+        """Decode one NDJSON/SSE line into an event dict"""
+        line = line.strip()
+        if line.startswith("data:"):
+            line = line[5:].strip()
+        if not line or line.startswith((":", "event:", "id:", "retry:")) or line == "[DONE]":
+            return None
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            return {"type": "token", "content": line}
+        return event if isinstance(event, dict) else None
 
     def get_debug_info(self) -> dict:
         """Get debug information about coordinator connection"""
@@ -219,8 +314,9 @@ class CoordinatorAgent(BaseAgent):
             "name": self.name,
             "coordinator_url": self.coordinator_url,
             "capabilities": self.capabilities,
-            "can_stream": False,  # Not yet implemented
-            "timeout": "120s"
+            "can_stream": True,
+            "timeout": "120s",
+            "health": self.health.get_status()
         }
 
 
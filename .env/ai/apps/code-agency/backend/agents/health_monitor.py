@@ -0,0 +1,175 @@
+"""
+Health Monitor - Cached service health with a circuit breaker
+Probes agency services in the background so request paths never pay for a
+health round trip, and fail fast while a service is known to be down.
+"""
+
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Dict, Any, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"        # Healthy - requests flow
+    OPEN = "open"            # Failing - requests rejected immediately
+    HALF_OPEN = "half_open"  # Cooling off over - one trial request allowed
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker fed by probes and real request outcomes"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent right now"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self._failures} failure(s)")
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout
+        }
+
+
+class HealthMonitor:
+    """Background /health prober for one service, sharing its breaker with callers"""
+
+    def __init__(self, base_url: str, interval: float = 10.0, timeout: float = 3.0,
+                 failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.base_url = base_url
+        self.health_url = f"{base_url}/health"
+        self.interval = interval
+        self.breaker = CircuitBreaker(base_url, failure_threshold, reset_timeout)
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self.healthy: Optional[bool] = None  # Unknown until the first probe
+        self.last_checked: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self) -> bool:
+        """Probe the service once and update the cached state"""
+        try:
+            response = await self.client.get(self.health_url)
+            healthy = response.status_code == 200
+        except Exception as e:
+            logger.debug(f"Health probe failed for {self.base_url}: {e}")
+            healthy = False
+
+        self.healthy = healthy
+        self.last_checked = time.monotonic()
+        if healthy:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return healthy
+
+    async def check(self, max_age: Optional[float] = None) -> bool:
+        """Cached health, probing only if the last result is older than max_age"""
+        max_age = self.interval if max_age is None else max_age
+        if self.last_checked is None or time.monotonic() - self.last_checked > max_age:
+            return await self.probe()
+        return bool(self.healthy)
+
+    def start(self):
+        """Start background probing (no-op if already running or no event loop)"""
+        if self._task and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+        except RuntimeError:
+            pass
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def is_available(self) -> bool:
+        """Fast, cached check used on request paths"""
+        self.start()
+        return self.breaker.allow_request()
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self.breaker.record_failure()
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.client.aclose()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "last_checked_ago": round(time.monotonic() - self.last_checked, 1) if self.last_checked else None,
+            "breaker": self.breaker.get_status()
+        }
+
+
+# Shared monitors, one per service base URL
+_monitors: Dict[str, HealthMonitor] = {}
+
+def get_health_monitor(base_url: str) -> HealthMonitor:
+    """Get or create the shared health monitor for a service"""
+    base_url = base_url.rstrip("/")
+    if base_url not in _monitors:
+        _monitors[base_url] = HealthMonitor(base_url)
+    return _monitors[base_url]
+
+async def close_health_monitors():
+    """Stop all background probes"""
+    for monitor in list(_monitors.values()):
+        await monitor.close()
+    _monitors.clear()
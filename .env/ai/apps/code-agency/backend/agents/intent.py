@@ -0,0 +1,170 @@
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that finds every keyword in a single pass over the text"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for keyword in set(keywords):
+            if keyword:
+                self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword: str):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = self._out[state] + (keyword,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> Set[str]:
+        """Return the distinct keywords occurring anywhere in text (overlaps included)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+@dataclass
+class IntentRules:
+    """Keyword classes and regex patterns an agent wants matched for routing"""
+    keywords: Dict[str, List[str]] = field(default_factory=dict)
+    patterns: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    """Result of one pass over a message, shared by every agent's scorer"""
+    keyword_hits: Dict[Tuple[str, str], FrozenSet[str]]
+    pattern_hits: FrozenSet[Tuple[str, str]]
+
+    def count(self, owner: str, keyword_class: str) -> int:
+        """Number of distinct keywords of a class found in the message"""
+        return len(self.keyword_hits.get((owner, keyword_class), ()))
+
+    def has(self, owner: str, keyword_class: str) -> bool:
+        return (owner, keyword_class) in self.keyword_hits
+
+    def matched(self, owner: str, pattern: str) -> bool:
+        return (owner, pattern) in self.pattern_hits
+
+    def pattern_count(self, owner: str) -> int:
+        return sum(1 for o, _ in self.pattern_hits if o == owner)
+
+
+class IntentClassifier:
+    """
+    Single-pass routing engine.
+
+    All registered agents' keyword classes are compiled into one Aho-Corasick
+    automaton and all regex patterns into one alternation, so scoring every
+    agent costs one scan of the message regardless of how many agents or
+    keywords exist. Matches are LRU-cached per lowercased message.
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._rules: Dict[str, IntentRules] = {}
+        self._dirty = True
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._keyword_labels: Dict[str, List[Tuple[str, str]]] = {}
+        self._regex: Optional[re.Pattern] = None
+        self._group_labels: Dict[str, Tuple[str, str]] = {}
+        self._cached_match = lru_cache(maxsize=self.cache_size)(self._match)
+
+    def register(self, owner: str, rules: IntentRules):
+        """Register (or replace) the rules for an agent"""
+        self._rules[owner] = rules
+        self._dirty = True
+
+    def compile(self):
+        """Rebuild the combined matchers from the registered rules"""
+        keyword_labels: Dict[str, List[Tuple[str, str]]] = {}
+        alternatives = []
+        group_labels = {}
+
+        for owner, rules in self._rules.items():
+            for keyword_class, keywords in rules.keywords.items():
+                for keyword in keywords:
+                    keyword_labels.setdefault(keyword.lower(), []).append((owner, keyword_class))
+            for name, pattern in rules.patterns.items():
+                group = f"p{len(group_labels)}"
+                group_labels[group] = (owner, name)
+                # Zero-width lookahead so one rule's match never consumes another's text
+                alternatives.append(f"(?=(?P<{group}>{pattern}))")
+
+        self._automaton = KeywordAutomaton(keyword_labels)
+        self._keyword_labels = keyword_labels
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+        self._group_labels = group_labels
+        self._cached_match.cache_clear()
+        self._dirty = False
+
+        logger.debug(f"Intent classifier compiled: {len(keyword_labels)} keywords, {len(alternatives)} patterns")
+
+    def match(self, message: str) -> IntentMatch:
+        """Scan a message once and return every keyword class and pattern hit"""
+        if self._dirty:
+            self.compile()
+        return self._cached_match(message.lower())
+
+    def _match(self, text: str) -> IntentMatch:
+        keyword_hits: Dict[Tuple[str, str], Set[str]] = {}
+        for keyword in self._automaton.search(text):
+            for label in self._keyword_labels[keyword]:
+                keyword_hits.setdefault(label, set()).add(keyword)
+
+        pattern_hits = set()
+        if self._regex is not None:
+            # Rules that can begin at the same character resolve in registration order
+            for m in self._regex.finditer(text):
+                pattern_hits.add(self._group_labels[m.lastgroup])
+                if len(pattern_hits) == len(self._group_labels):
+                    break
+
+        return IntentMatch(
+            keyword_hits={label: frozenset(hits) for label, hits in keyword_hits.items()},
+            pattern_hits=frozenset(pattern_hits)
+        )
+
+    def cache_info(self):
+        return self._cached_match.cache_info()
+
+
+# Global classifier shared by all agents
+intent_classifier = IntentClassifier()
@@ -27,6 +27,23 @@ CYAN = "\033[36m"
 GRAY = "\033[90m"
 
 
+def tail_lines(path, count, block_size=64 * 1024):
+    """Last `count` lines of a file, read backwards so log size doesn't matter"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    lines = data.decode('utf-8', errors='replace').split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines[-count:]
+
+
 def clear_screen():
     os.system('clear' if os.name != 'nt' else 'cls')
 
@@ -38,8 +55,7 @@ def get_agent_status():
     if not ping_file.exists():
         return {}
     
-    with open(ping_file) as f:
-        pings = f.readlines()[-100:]
+    pings = tail_lines(ping_file, 100)
     
     agent_pings = {}
     for line in pings:
@@ -80,8 +96,7 @@ def get_recent_errors():
     if not error_file.exists():
         return []
     
-    with open(error_file) as f:
-        errors = f.readlines()[-10:]
+    errors = tail_lines(error_file, 10)
     
     return [e.strip() for e in errors if e.strip()]
 
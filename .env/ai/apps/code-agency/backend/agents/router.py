@@ -6,6 +6,7 @@ from .chat_agent import chat_agent
 from .code_agent import code_agent
 from .codriver_agent import CoDriverAgent
 from .coordinator_agent import get_coordinator_agent
+from .intent import intent_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -78,18 +79,13 @@ class AgentRouter:
     
     def analyze_message(self, message: str, context: str = "") -> Dict[str, float]:
         """Analyze which agents can handle the message and their confidence scores"""
-        agent_context = AgentContext(
-            conversation_id="analysis",
-            user_id="system", 
-            message=message,
-            conversation_history=context,
-            agent_type=AgentType.CHAT
-        )
+        # One pass over the message, shared by every agent's scorer
+        match = intent_classifier.match(message)
         
         scores = {}
         for name, agent in self.agents.items():
             try:
-                scores[name] = agent.can_handle(message, agent_context)
+                scores[name] = agent.score_intent(match)
             except Exception as e:
                 logger.error(f"Error analyzing message for {name}: {e}")
                 scores[name] = 0.0
@@ -196,7 +192,8 @@ class AgentRouter:
             "router_config": {
                 "default_agent": self.default_agent,
                 "confidence_threshold": self.confidence_threshold,
-                "total_agents": len(self.agents)
+                "total_agents": len(self.agents),
+                "intent_cache": intent_classifier.cache_info()._asdict()
             },
             "agents": {}
         }
@@ -9,6 +9,7 @@ import json
 import yaml
 import signal
 import logging
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -23,6 +24,10 @@ LOGS_DIR = WORKSPACE / "logs"
 CHATS_DIR = WORKSPACE / "chats"
 JOBS_DIR = WORKSPACE / "jobs"
 
+# Streaming: partial output is flushed to the channel once either bound is hit
+STREAM_FLUSH_INTERVAL = 1.5  # seconds
+STREAM_FLUSH_CHARS = 400
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +40,26 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def fence_safe_cut(text: str, start: int) -> int:
+    """
+    End of the longest prefix of text[start:] that can go out as a partial:
+    whole lines only, and never inside a ``` block, since channel messages
+    are split on lines starting with ```
+    """
+    cut = start
+    in_fence = False
+    pos = start
+    while True:
+        newline = text.find('\n', pos)
+        if newline == -1:
+            return cut
+        if text.startswith('```', pos):
+            in_fence = not in_fence
+        pos = newline + 1
+        if not in_fence:
+            cut = pos
+
+
 class Agent:
     def __init__(self, agent_id: str):
         self.agent_id = agent_id
@@ -45,6 +70,9 @@ class Agent:
         self.last_positions = {}  # Track read positions in channels
         self.current_job = None
         
+        # Pooled HTTP session (keep-alive to the Ollama host)
+        self.session = requests.Session()
+        
         # Setup signal handlers
         signal.signal(signal.SIGINT, self.shutdown)
         signal.signal(signal.SIGTERM, self.shutdown)
@@ -75,6 +103,7 @@ class Agent:
         """Graceful shutdown"""
         logger.info(f"Agent {self.agent_id} shutting down...")
         self.running = False
+        self.session.close()
         sys.exit(0)
     
     def ping(self):
@@ -170,33 +199,87 @@ class Agent:
         except Exception as e:
             self.log_error(f"Failed to write to channel {channel}: {e}")
     
-    def call_ollama(self, prompt: str, context: str = "") -> str:
-        """Call Ollama API with prompt"""
+    def new_stream_id(self) -> str:
+        return uuid.uuid4().hex[:8]
+    
+    def call_ollama(
+        self,
+        prompt: str,
+        context: str = "",
+        channel: Optional[str] = None,
+        stream_id: Optional[str] = None
+    ) -> str:
+        """
+        Call Ollama API with prompt, streaming partial output to channel if given
+        
+        Partials are deltas tagged [SENDING <stream_id>]; the caller writes the
+        complete answer tagged [FINAL <stream_id>], which supersedes them.
+        If the call fails after partials went out, an interruption notice is
+        written as the FINAL instead and "" is returned.
+        """
         host = self.agent_config['host']
         model = self.agent_config['model']
         
         full_prompt = f"{context}\n\n{prompt}" if context else prompt
+        flushed = 0  # Length of text already sent as partials
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"http://{host}/api/generate",
                 json={
                     "model": model,
                     "prompt": full_prompt,
-                    "stream": False
+                    "stream": True
                 },
-                timeout=300
+                stream=True,
+                timeout=(10, 300)  # connect, per-chunk read
             )
             
-            if response.status_code == 200:
-                return response.json().get('response', '')
-            else:
-                self.log_error(f"Ollama API error: {response.status_code}")
-                return ""
+            with response:
+                if response.status_code != 200:
+                    self.log_error(f"Ollama API error: {response.status_code}")
+                    return ""
+                
+                text = ""
+                last_flush = time.time()
+                sending = f"SENDING {stream_id}" if stream_id else "SENDING"
+                
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        self.log_error(f"Ollama API error: {chunk['error']}")
+                        self.abandon_stream(channel, stream_id, flushed)
+                        return ""
+                    
+                    text += chunk.get('response', '')
+                    
+                    # Coalesce tokens into time/size bounded partial updates
+                    if channel and len(text) > flushed and (
+                        len(text) - flushed >= STREAM_FLUSH_CHARS
+                        or time.time() - last_flush >= STREAM_FLUSH_INTERVAL
+                    ):
+                        cut = fence_safe_cut(text, flushed)
+                        if cut > flushed:
+                            self.write_to_channel(channel, text[flushed:cut].rstrip('\n'), sending)
+                            flushed = cut
+                            last_flush = time.time()
+                    
+                    if chunk.get('done'):
+                        break
+                
+                return text
         except Exception as e:
             self.log_error(f"Failed to call Ollama: {e}")
+            self.abandon_stream(channel, stream_id, flushed)
             return ""
     
+    def abandon_stream(self, channel: Optional[str], stream_id: Optional[str], flushed: int):
+        """Supersede partials of a failed stream so readers don't take them for an answer"""
+        if channel and stream_id and flushed:
+            self.write_to_channel(channel, "⚠️ Response interrupted; partial output discarded", f"FINAL {stream_id}")
+    
     def check_jobs(self):
         """Check for assigned jobs"""
         queue_dir = JOBS_DIR / "queue"
@@ -244,14 +327,17 @@ class Agent:
         
         # Call Ollama
         self.write_to_channel('workflow', f"Processing job {job_id}...", "TYPING")
+        stream_id = self.new_stream_id()
         response = self.call_ollama(
             f"Complete this task and provide the deliverables:\n\n{job.get('deliverables', [])}",
-            context
+            context,
+            channel='workflow',
+            stream_id=stream_id
         )
         
         if response:
             # Write response to workflow
-            self.write_to_channel('workflow', f"Job {job_id} result:\n\n{response}")
+            self.write_to_channel('workflow', f"Job {job_id} result:\n\n{response}", f"FINAL {stream_id}")
             
             # Move job to completed
             job['status'] = 'completed'
@@ -290,7 +376,7 @@ class Agent:
             return
         
         # Ignore status messages
-        if '[TYPING]' in header or '[SENDING]' in header:
+        if '[TYPING]' in header or '[SENDING' in header:
             return
         
         # Check if mentioned or needs response
@@ -305,10 +391,12 @@ class Agent:
             
             # Generate response
             self.write_to_channel(channel, "Thinking...", "TYPING")
-            response = self.call_ollama(content)
+            stream_id = self.new_stream_id()
+            response = self.call_ollama(content, channel=channel, stream_id=stream_id)
             
             if response:
-                self.write_to_channel(channel, response)
+                # Complete message; supersedes the [SENDING <stream_id>] partials
+                self.write_to_channel(channel, response, f"FINAL {stream_id}")
     
     def run(self):
         """Main agent loop"""
@@ -48,10 +48,18 @@ async def check_agency_health():
     bridge = get_bridge()
     is_healthy = await bridge.check_gateway_health()
 
+    status = {
+        "gateway": bridge.gateway_url,
+        "circuits": {
+            "gateway": bridge.gateway_health.get_status(),
+            "coordinator": bridge.coordinator_health.get_status()
+        }
+    }
+
     if is_healthy:
-        return {"status": "online", "gateway": bridge.gateway_url}
+        return {"status": "online", **status}
     else:
-        return {"status": "offline", "gateway": bridge.gateway_url}
+        return {"status": "offline", **status}
 
 
 @router.get("/services")
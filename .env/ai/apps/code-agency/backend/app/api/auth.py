@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 
 from ..auth.auth_manager import auth_manager
-from ..auth.dependencies import require_auth, require_admin
+from ..auth.dependencies import require_auth, require_admin, get_session_token
 from ...memory.models import User
 
 router = APIRouter()
@@ -48,8 +48,8 @@ async def login_user(
     }
 
 @router.post("/logout")
-async def logout_user(current_user: User = Depends(require_auth)):
-    session_token = getattr(current_user, "session_token", None)
+async def logout_user(current_user: User = Depends(require_auth),
+                      session_token: Optional[str] = Depends(get_session_token)):
     success = await auth_manager.invalidate_session(session_token)
     if not success:
         raise HTTPException(
@@ -7,15 +7,20 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
+import re
 import subprocess
 import psutil
 import os
+import tempfile
 from pathlib import Path
 import json
 from datetime import datetime
 
 from .auth_api import get_current_user
 from ..auth.jwt_handler import User
+from ..services.metrics_sampler import AGENCY_SERVICES, MetricsSampler
+from ...utils.logtail import tail_lines, follow_log
 
 router = APIRouter(prefix="/api/control", tags=["control"], dependencies=[Depends(get_current_user)])
 
@@ -24,6 +29,11 @@ AGENCY_ROOT = Path("/home/admin/WORKSPACE/.ai/agency-forge")
 LOGS_DIR = AGENCY_ROOT / "logs"
 PIDS_DIR = AGENCY_ROOT / "pids"
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Uploads are written in pieces this size
+
+# Background sampler behind /services and /stats
+metrics_sampler = MetricsSampler(PIDS_DIR, AGENCY_SERVICES)
+
 
 class ServiceInfo(BaseModel):
     name: str
@@ -45,61 +55,29 @@ class LogRequest(BaseModel):
     lines: int = 100
 
 
+def _format_uptime(create_time: float) -> str:
+    uptime_seconds = (datetime.now() - datetime.fromtimestamp(create_time)).total_seconds()
+
+    if uptime_seconds < 60:
+        return f"{int(uptime_seconds)}s"
+    elif uptime_seconds < 3600:
+        return f"{int(uptime_seconds / 60)}m"
+    hours = int(uptime_seconds / 3600)
+    minutes = int((uptime_seconds % 3600) / 60)
+    return f"{hours}h {minutes}m"
+
+
 @router.get("/services", response_model=List[ServiceInfo])
 async def list_services(current_user: User = Depends(get_current_user)):
-    """List all agency services with their status"""
-
-    services_config = [
-        {"name": "api-gateway", "port": 9013, "pid_file": "api-gateway.pid"},
-        {"name": "command-coordinator", "port": 9015, "pid_file": "command-coordinator.pid"},
-        {"name": "file-ops", "port": 9014, "pid_file": "file-ops.pid"},
-        {"name": "web-search", "port": 9002, "pid_file": "web-search.pid"},
-        {"name": "web-scraper", "port": 9003, "pid_file": "web-scraper.pid"},
-        {"name": "trading-agent", "port": 9007, "pid_file": "trading-agent.pid"},
-        {"name": "data-collector", "port": 9006, "pid_file": "data-collector.pid"},
-        {"name": "openvino-vision", "port": 9017, "pid_file": "openvino-vision.pid"},
-        {"name": "ui-builder", "port": 9018, "pid_file": "ui-builder.pid"},
-        {"name": "codriver-ide", "port": 8001, "pid_file": "codriver-ide.pid"},
-    ]
+    """List all agency services with their status (from the latest sample)"""
 
+    sample = await metrics_sampler.latest()
     results = []
 
-    for svc in services_config:
-        pid_file = PIDS_DIR / svc["pid_file"]
-        service_info = ServiceInfo(name=svc["name"], port=svc["port"], status="stopped")
-
-        if pid_file.exists():
-            try:
-                pid = int(pid_file.read_text().strip())
-                if psutil.pid_exists(pid):
-                    process = psutil.Process(pid)
-                    service_info.status = "running"
-                    service_info.pid = pid
-
-                    # Get process stats
-                    try:
-                        service_info.memory_mb = round(process.memory_info().rss / 1024 / 1024, 2)
-                        service_info.cpu_percent = round(process.cpu_percent(interval=0.1), 2)
-
-                        # Calculate uptime
-                        create_time = datetime.fromtimestamp(process.create_time())
-                        uptime_seconds = (datetime.now() - create_time).total_seconds()
-
-                        if uptime_seconds < 60:
-                            service_info.uptime = f"{int(uptime_seconds)}s"
-                        elif uptime_seconds < 3600:
-                            service_info.uptime = f"{int(uptime_seconds / 60)}m"
-                        else:
-                            hours = int(uptime_seconds / 3600)
-                            minutes = int((uptime_seconds % 3600) / 60)
-                            service_info.uptime = f"{hours}h {minutes}m"
-
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-
-            except (ValueError, FileNotFoundError, psutil.NoSuchProcess):
-                service_info.status = "error"
-
+    for svc in sample["services"]:
+        service_info = ServiceInfo(**{k: svc[k] for k in ("name", "port", "status", "pid", "memory_mb", "cpu_percent")})
+        if svc["create_time"]:
+            service_info.uptime = _format_uptime(svc["create_time"])
         results.append(service_info)
 
     return results
@@ -157,20 +135,24 @@ async def control_service(action: ServiceAction, current_user: User = Depends(ge
         return {"success": False, "message": str(e)}
 
 
+def _log_path(service: str) -> Path:
+    if not service or "/" in service or "\\" in service or service.startswith("."):
+        raise HTTPException(status_code=400, detail="Invalid service name")
+    return LOGS_DIR / f"{service}.log"
+
+
 @router.post("/logs", response_model=Dict[str, Any])
 async def get_service_logs(request: LogRequest, current_user: User = Depends(get_current_user)):
     """Get logs for a specific service"""
 
-    log_file = LOGS_DIR / f"{request.service}.log"
+    log_file = _log_path(request.service)
 
     if not log_file.exists():
         return {"success": False, "message": "Log file not found", "logs": []}
 
     try:
         # Read last N lines
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-            last_lines = lines[-request.lines:] if len(lines) > request.lines else lines
+        last_lines = await asyncio.to_thread(tail_lines, log_file, request.lines)
 
         return {
             "success": True,
@@ -183,6 +165,38 @@ async def get_service_logs(request: LogRequest, current_user: User = Depends(get
         return {"success": False, "message": str(e), "logs": []}
 
 
+@router.get("/logs/{service}/follow")
+async def follow_service_logs(service: str, grep: Optional[str] = None, ignore_case: bool = False,
+                              current_user: User = Depends(get_current_user)):
+    """
+    Follow a service log as Server-Sent Events.
+
+    Each event carries a batch of new lines, filtered server-side by the
+    optional `grep` regex. The stream keeps going across log rotation.
+    """
+
+    log_file = _log_path(service)
+    pattern = None
+    if grep:
+        try:
+            pattern = re.compile(grep, re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid grep pattern: {e}")
+
+    async def stream_lines():
+        async for batch in follow_log(log_file, pattern):
+            yield f"data: {json.dumps(batch)}\n\n"
+
+    return StreamingResponse(
+        stream_lines(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.post("/file/upload")
 async def upload_file(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
     """Upload a file to the agency workspace"""
@@ -195,15 +209,24 @@ async def upload_file(file: UploadFile = File(...), current_user: User = Depends
 
     file_path = upload_dir / file.filename
 
-    # Save file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Stream to a temp file in chunks and move it into place once complete
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
 
     return {
         "success": True,
         "filename": file.filename,
-        "size_bytes": len(content),
+        "size_bytes": size,
         "path": str(file_path)
     }
 
@@ -226,18 +249,19 @@ async def download_file(filename: str, current_user: User = Depends(get_current_
 
 @router.get("/stats")
 async def get_system_stats(current_user: User = Depends(get_current_user)):
-    """Get system resource usage"""
+    """Get system resource usage (from the latest sample)"""
 
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
+    sample = await metrics_sampler.latest()
+    return {**sample["system"], "sampled_at": datetime.fromtimestamp(sample["timestamp"]).isoformat()}
 
-    return {
-        "cpu_percent": round(cpu_percent, 2),
-        "memory_percent": round(memory.percent, 2),
-        "memory_used_gb": round(memory.used / (1024**3), 2),
-        "memory_total_gb": round(memory.total / (1024**3), 2),
-        "disk_percent": round(disk.percent, 2),
-        "disk_used_gb": round(disk.used / (1024**3), 2),
-        "disk_total_gb": round(disk.total / (1024**3), 2),
-    }
+
+@router.get("/stats/history")
+async def get_stats_history(limit: Optional[int] = None, service: Optional[str] = None,
+                            current_user: User = Depends(get_current_user)):
+    """Recent system (or per-service) samples for sparklines, oldest first"""
+
+    if service and service not in {svc["name"] for svc in AGENCY_SERVICES}:
+        raise HTTPException(status_code=404, detail=f"Unknown service: {service}")
+
+    metrics_sampler.start()
+    return metrics_sampler.history(limit=limit, service=service)
@@ -2,16 +2,16 @@ import logging
 from datetime import datetime
 from typing import Dict, Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
 import psutil
-import torch
 
-from ...inference.model_manager import model_manager
+from ...inference.model_manager import model_manager, torch
 from ...memory.database import db_manager
 from ...memory.embeddings import embedding_manager
+from ..services.warmup import warmup
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,9 @@ router = APIRouter(prefix="/api/health", tags=["health"])
 
 class HealthResponse(BaseModel):
     status: str
+    ready: bool
     timestamp: str
+    warmup: Dict[str, Any]
     services: Dict[str, Any]
     system: Dict[str, Any]
 
@@ -46,20 +48,34 @@ async def health_check():
         "memory_percent": psutil.virtual_memory().percent,
         "disk_percent": psutil.disk_usage('/').percent,
         "python_executable": psutil.Process().exe(),
-        "gpu_available": torch.cuda.is_available(),
-        "gpu_count": torch.cuda.device_count() if torch.cuda.is_available() else 0
     }
+    # Only reported once something has imported torch; probing CUDA would import it
+    if torch.loaded:
+        system["gpu_available"] = torch.cuda.is_available()
+        system["gpu_count"] = torch.cuda.device_count() if system["gpu_available"] else 0
 
     all_healthy = all(service.get("healthy", False) for service in services.values())
-    status = "healthy" if all_healthy else "degraded"
+    if not warmup.ready:
+        status = "starting"
+    else:
+        status = "healthy" if all_healthy else "degraded"
 
     return HealthResponse(
         status=status,
+        ready=warmup.ready,
         timestamp=timestamp,
+        warmup=warmup.get_status()["stages"],
         services=services,
         system=system
     )
 
+@router.get("/ready")
+async def readiness(response: Response):
+    """Readiness probe: 503 until background warm-up has finished"""
+    if not warmup.ready:
+        response.status_code = 503
+    return warmup.get_status()
+
 @router.get("/model", response_model=ModelStatus)
 async def model_status():
     """Check AI model status"""
@@ -72,7 +88,7 @@ async def model_status():
         if is_loaded:
             model_name = model_manager.model_name or ""
             device = model_manager.device or ""
-            if torch.cuda.is_available():
+            if torch.loaded and torch.cuda.is_available():
                 memory_usage = torch.cuda.memory_allocated() / 1024**3  # GB
 
         return ModelStatus(
@@ -134,7 +150,7 @@ def check_model():
     try:
         is_loaded = model_manager.is_loaded()
         model_name = model_manager.model_name if model_manager.model_name else ""
-        device = model_manager.device if model_manager.device else ""
+        device = model_manager.device if is_loaded else ""
         return {
             "healthy": is_loaded,
             "loaded": is_loaded,
@@ -154,13 +170,16 @@ def check_embeddings():
 
         return {
             "healthy": healthy,
+            "state": embedding_manager.state,
+            "error": embedding_manager.error,
+            "load_seconds": embedding_manager.load_seconds,
             "model_loaded": healthy,
             "embedding_dim": embedding_dim,
             "index_size": index_size
         }
     except Exception as e:
         logger.error(f"Embeddings check error: {e}")
-        return {"healthy": False, "model_loaded": False, "embedding_dim": 0, "index_size": 0}
+        return {"healthy": False, "state": "failed", "model_loaded": False, "embedding_dim": 0, "index_size": 0}
 
 def check_system_memory():
     """Check system memory usage"""
@@ -4,19 +4,26 @@ from typing import List, Dict, Any, Optional
 import json
 import asyncio
 from pydantic import BaseModel
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 
 from ...ide.file_manager import file_manager
+from ...ide.code_index import code_index
 from ...ide.github_client import github_client
 from ...ide.terminal import terminal_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/ide", tags=["ide"])
+ws_router = APIRouter(prefix="/api/ide", tags=["ide"])  # Websockets, kept apart from HTTP-only dependencies
 
 # Models
 class FileReadRequest(BaseModel):
     path: str
     encoding: str = "utf-8"
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    offset: Optional[int] = None
+    length: Optional[int] = None
 
 class FileWriteRequest(BaseModel):
     path: str
@@ -57,17 +64,75 @@ class TerminalResizeRequest(BaseModel):
 
 # File Management Endpoints
 @router.get("/files/tree")
-async def get_file_tree(path: str = "", max_depth: int = 3):
+async def get_file_tree(request: Request, response: Response, path: str = "", max_depth: int = 3):
     try:
-        return file_manager.get_file_tree(path, max_depth)
+        # Taken before the tree is built, so a racing change can only make it stale, never wrong
+        etag = await asyncio.to_thread(file_manager.get_tree_etag, path, max_depth)
+        if etag and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        tree = await asyncio.to_thread(file_manager.get_file_tree, path, max_depth)
+        if etag and "error" not in tree:
+            response.headers["ETag"] = etag
+        return tree
     except Exception as e:
         logger.error(f"Error getting file tree: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@ws_router.websocket("/files/ws")
+async def file_tree_websocket(websocket: WebSocket):
+    """Push tree_delta frames as workspace files change"""
+    await websocket.accept()
+    index = file_manager.tree_index
+    queue = index.subscribe()
+
+    async def forward_deltas():
+        while True:
+            await websocket.send_text(json.dumps(await queue.get()))
+
+    sender = asyncio.create_task(forward_deltas())
+    try:
+        await websocket.send_text(json.dumps({"type": "subscribed", **index.get_status()}))
+        while True:
+            data = json.loads(await websocket.receive_text())
+            if data.get("type") == "ping":
+                await websocket.send_text(json.dumps({"type": "pong"}))
+    except WebSocketDisconnect:
+        logger.info("File tree WebSocket disconnected")
+    except Exception as e:
+        logger.error(f"File tree WebSocket error: {e}")
+    finally:
+        sender.cancel()
+        index.unsubscribe(queue)
+
+@router.get("/search")
+async def search_workspace(q: str, regex: bool = False, case_sensitive: bool = False,
+                           path: str = "", max_results: int = 100):
+    try:
+        # Scans file contents; keep it off the event loop
+        result = await asyncio.to_thread(code_index.search, q, regex, case_sensitive, path, max_results)
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching workspace: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/symbols")
+async def search_symbols(q: str, kind: Optional[str] = None, limit: int = 50):
+    try:
+        symbols = await asyncio.to_thread(code_index.find_symbols, q, kind, limit)
+        return {"query": q, "symbols": symbols, "index": code_index.get_status()}
+    except Exception as e:
+        logger.error(f"Error searching symbols: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/files/read")
 async def read_file(request: FileReadRequest):
     try:
-        result = file_manager.read_file(request.path, request.encoding)
+        result = await asyncio.to_thread(file_manager.read_file, request.path, request.encoding,
+                                         request.start_line, request.end_line, request.offset, request.length)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -75,6 +140,17 @@ async def read_file(request: FileReadRequest):
         logger.error(f"Error reading file: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/files/stream")
+async def stream_file(path: str, offset: int = 0, length: Optional[int] = None):
+    result = file_manager.stream_file(path, offset, length)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return StreamingResponse(
+        result["iterator"],
+        media_type="application/octet-stream",
+        headers={"Content-Length": str(result["length"]), "X-File-Size": str(result["size"])}
+    )
+
 @router.post("/files/write")
 async def write_file(request: FileWriteRequest):
     try:
@@ -126,7 +202,7 @@ async def rename_file_or_directory(request: FileRenameRequest):
 @router.get("/git/status")
 async def get_git_status(repo_path: str = ""):
     try:
-        result = github_client.get_git_status(repo_path)
+        result = await github_client.get_git_status(repo_path)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -137,7 +213,7 @@ async def get_git_status(repo_path: str = ""):
 @router.post("/git/clone")
 async def clone_repository(request: GitCloneRequest):
     try:
-        result = github_client.clone_repository(request.repo_url, request.target_dir)
+        result = await github_client.clone_repository(request.repo_url, request.target_dir)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -148,7 +224,7 @@ async def clone_repository(request: GitCloneRequest):
 @router.post("/git/commit")
 async def commit_changes(request: GitCommitRequest):
     try:
-        result = github_client.commit_changes(request.repo_path, request.message, request.files)
+        result = await github_client.commit_changes(request.repo_path, request.message, request.files)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -159,7 +235,7 @@ async def commit_changes(request: GitCommitRequest):
 @router.post("/git/push")
 async def push_changes(repo_path: str, branch: Optional[str] = None):
     try:
-        result = github_client.push_changes(repo_path, branch)
+        result = await github_client.push_changes(repo_path, branch)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -170,7 +246,7 @@ async def push_changes(repo_path: str, branch: Optional[str] = None):
 @router.post("/git/pull")
 async def pull_changes(repo_path: str):
     try:
-        result = github_client.pull_changes(repo_path)
+        result = await github_client.pull_changes(repo_path)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -181,7 +257,7 @@ async def pull_changes(repo_path: str):
 @router.get("/git/history")
 async def get_commit_history(repo_path: str, limit: int = 10):
     try:
-        result = github_client.get_commit_history(repo_path, limit)
+        result = await github_client.get_commit_history(repo_path, limit)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -192,7 +268,7 @@ async def get_commit_history(repo_path: str, limit: int = 10):
 @router.post("/git/branch/create")
 async def create_branch(repo_path: str, branch_name: str):
     try:
-        result = github_client.create_branch(repo_path, branch_name)
+        result = await github_client.create_branch(repo_path, branch_name)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -203,7 +279,7 @@ async def create_branch(repo_path: str, branch_name: str):
 @router.post("/git/branch/switch")
 async def switch_branch(repo_path: str, branch_name: str):
     try:
-        result = github_client.switch_branch(repo_path, branch_name)
+        result = await github_client.switch_branch(repo_path, branch_name)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -267,7 +343,7 @@ async def close_terminal_session(session_id: str):
 @router.post("/terminal/execute")
 async def execute_command(request: CommandRequest):
     try:
-        result = terminal_manager.execute_command(request.command, request.cwd, request.timeout)
+        result = await terminal_manager.execute_command(request.command, request.cwd, request.timeout)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
@@ -275,8 +351,17 @@ async def execute_command(request: CommandRequest):
         logger.error(f"Error executing command: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/terminal/execute/stream")
+async def execute_command_stream(request: CommandRequest):
+    """Run a command and stream its output as NDJSON; disconnecting kills it"""
+    async def events():
+        async for event in terminal_manager.stream_command(request.command, request.cwd, request.timeout):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 # Terminal WebSocket
-@router.websocket("/terminal/ws/{session_id}")
+@ws_router.websocket("/terminal/ws/{session_id}")
 async def terminal_websocket(websocket: WebSocket, session_id: str):
     await websocket.accept()
     session = terminal_manager.get_session(session_id)
@@ -284,15 +369,21 @@ async def terminal_websocket(websocket: WebSocket, session_id: str):
         await websocket.close(code=4004, reason="Session not found")
         return
 
-    async def send_output(data: str):
-        try:
-            await websocket.send_text(json.dumps({"type": "output", "data": data}))
-        except Exception as e:
-            logger.error(f"Error sending terminal output: {e}")
+    scrollback, frames = session.attach()
 
-    session.set_output_callback(lambda data: asyncio.create_task(send_output(data)))
+    async def forward_output():
+        # Replay what the client missed, then stream live frames as they are produced
+        if scrollback:
+            await websocket.send_text(json.dumps({"type": "output", "data": scrollback, "replay": True}))
+        while True:
+            data = await frames.get()
+            if data is None:
+                await websocket.send_text(json.dumps({"type": "exit", "message": "Terminal session ended"}))
+                break
+            await websocket.send_text(json.dumps({"type": "output", "data": data}))
+            session.frame_sent()
 
-    try:
+    async def receive_input():
         while True:
             message = await websocket.receive_text()
             data = json.loads(message)
@@ -302,13 +393,17 @@ async def terminal_websocket(websocket: WebSocket, session_id: str):
             elif data.get("type") == "resize":
                 session.resize(data.get("rows", 24), data.get("cols", 80))
 
-            if not session.is_alive():
-                await websocket.send_text(json.dumps({"type": "exit", "message": "Terminal session ended"}))
-                break
-
+    # Runs until the client disconnects or the shell exits
+    tasks = {asyncio.create_task(forward_output()), asyncio.create_task(receive_input())}
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
     except WebSocketDisconnect:
         logger.info(f"Terminal WebSocket disconnected: {session_id}")
     except Exception as e:
         logger.error(f"Terminal WebSocket error: {e}")
     finally:
-        session.set_output_callback(None)
+        for task in tasks:
+            task.cancel()
+        session.detach(frames)
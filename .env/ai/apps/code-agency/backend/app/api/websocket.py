@@ -7,27 +7,108 @@ import json
 from fastapi import WebSocket, WebSocketDisconnect, APIRouter
 
 from ...agents.router import agent_router
+from ...agents.base import AgentContext, AgentType
 from ...memory.storage import conversation_storage
 from ...memory.context import ContextManager
 from ...inference.model_manager import model_manager
 from ...inference.generator import text_generator
 from ...inference.sampler import SamplingConfig
+from ...utils.streaming import iterate_in_thread, coalesce
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+class ConnectionSender:
+    """
+    Bounded outbound queue for one websocket, drained by a single writer task.
+
+    Droppable frames (typing/status hints) are discarded when the queue is
+    full. Other frames wait for space; a client that stays full for longer
+    than the slow-consumer timeout is disconnected instead of letting its
+    backlog grow without bound.
+    """
+
+    def __init__(self, websocket: WebSocket, connection_id: str,
+                 maxsize: int = 64, slow_consumer_timeout: float = 5.0):
+        self.websocket = websocket
+        self.connection_id = connection_id
+        self.slow_consumer_timeout = slow_consumer_timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+        self.dropped = 0
+        self._writer = asyncio.create_task(self._drain())
+
+    async def send(self, message: dict, droppable: bool = False) -> bool:
+        if self.closed:
+            return False
+
+        data = json.dumps(message)
+        if droppable:
+            try:
+                self.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return False
+            return True
+
+        try:
+            await asyncio.wait_for(self.queue.put(data), self.slow_consumer_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Slow consumer {self.connection_id}: send queue full for "
+                           f"{self.slow_consumer_timeout}s, disconnecting")
+            await self.close(code=1013)  # Try again later
+            return False
+        return True
+
+    async def _drain(self):
+        try:
+            while True:
+                data = await self.queue.get()
+                await self.websocket.send_text(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Writer for {self.connection_id} stopped: {e}")
+            self.closed = True
+
+    def abort(self):
+        """Stop sending immediately, discarding anything still queued"""
+        self.closed = True
+        self._writer.cancel()
+
+    async def close(self, code: int = None):
+        self.abort()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code)
+            except Exception:
+                pass
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_connections: Dict[str, Set[str]] = {}
+        self.active_streams: Dict[str, asyncio.Task] = {}
+        self.senders: Dict[str, ConnectionSender] = {}
 
     async def connect(self, websocket: WebSocket, connection_id: str, user_id: str = "default"):
         await websocket.accept()
         self.active_connections[connection_id] = websocket
         self.user_connections.setdefault(user_id, set()).add(connection_id)
+        self.senders[connection_id] = ConnectionSender(
+            websocket,
+            connection_id,
+            maxsize=settings.ws_send_queue_size,
+            slow_consumer_timeout=settings.ws_slow_consumer_timeout
+        )
         logger.info(f"WebSocket connected: {connection_id} for user {user_id}")
 
     def disconnect(self, connection_id: str, user_id: str = "default"):
+        self.cancel_stream(connection_id)
+        sender = self.senders.pop(connection_id, None)
+        if sender:
+            sender.abort()
         if connection_id in self.active_connections:
             self.active_connections.pop(connection_id)
         if user_id in self.user_connections and connection_id in self.user_connections[user_id]:
@@ -36,18 +117,39 @@ class ConnectionManager:
                 del self.user_connections[user_id]
         logger.info(f"WebSocket disconnected: {connection_id}")
 
-    async def send_personal_message(self, message: dict, connection_id: str):
-        websocket = self.active_connections.get(connection_id)
-        if websocket:
+    async def send_personal_message(self, message: dict, connection_id: str, droppable: bool = False) -> bool:
+        sender = self.senders.get(connection_id)
+        if sender:
             try:
-                await websocket.send_text(json.dumps(message))
+                return await sender.send(message, droppable=droppable)
             except Exception as e:
                 logger.error(f"Error sending message to {connection_id}: {e}")
+        return False
 
     async def send_to_user(self, message: dict, user_id: str):
         for connection_id in self.user_connections.get(user_id, set()).copy():
             await self.send_personal_message(message, connection_id)
 
+    def start_stream(self, connection_id: str, coro) -> asyncio.Task:
+        """Run a streaming handler as a task so the receive loop stays responsive"""
+        self.cancel_stream(connection_id)  # A new request supersedes the previous one
+        task = asyncio.create_task(coro)
+        self.active_streams[connection_id] = task
+
+        def forget(finished: asyncio.Task):
+            if self.active_streams.get(connection_id) is finished:
+                del self.active_streams[connection_id]
+
+        task.add_done_callback(forget)
+        return task
+
+    def cancel_stream(self, connection_id: str) -> bool:
+        task = self.active_streams.pop(connection_id, None)
+        if task and not task.done():
+            task.cancel()
+            return True
+        return False
+
 manager = ConnectionManager()
 
 @router.websocket("/ws/chat-user/{user_id}")
@@ -70,16 +172,29 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             msg_type = message_data.get("type", "chat")
 
             if msg_type == "load_model":
-                await handle_load_model(websocket, message_data)
+                await handle_load_model(websocket, connection_id, message_data)
 
             elif msg_type == "chat":
-                await handle_chat_message(websocket, connection_id, user_id, message_data)
+                if message_data.get("agent_type") == "coordinator":
+                    manager.start_stream(
+                        connection_id,
+                        handle_coordinator_message(websocket, connection_id, user_id, message_data)
+                    )
+                else:
+                    manager.start_stream(
+                        connection_id,
+                        handle_chat_message(websocket, connection_id, user_id, message_data)
+                    )
+
+            elif msg_type == "cancel":
+                if manager.cancel_stream(connection_id):
+                    await manager.send_personal_message({"type": "cancelled"}, connection_id)
 
             elif msg_type == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                await manager.send_personal_message({"type": "pong"}, connection_id)
 
             else:
-                await websocket.send_text(json.dumps({"type": "error", "message": "Unknown message type"}))
+                await manager.send_personal_message({"type": "error", "message": "Unknown message type"}, connection_id)
 
     except WebSocketDisconnect as e:
         logger.warning(f"User {user_id} disconnected: {e}")
@@ -93,51 +208,51 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             logger.error(f"Error closing WebSocket for user {user_id}: {e}")
         manager.disconnect(connection_id, user_id)
 
-async def handle_load_model(websocket: WebSocket, message_data: dict):
+async def handle_load_model(websocket: WebSocket, connection_id: str, message_data: dict):
     model_json = message_data.get("model_json")
     if not model_json:
-        await websocket.send_text(json.dumps({"type": "error", "message": "No model_json provided"}))
+        await manager.send_personal_message({"type": "error", "message": "No model_json provided"}, connection_id)
         return
 
-    await websocket.send_text(json.dumps({"type": "status", "message": "Preparing to load model..."}))
+    await manager.send_personal_message({"type": "status", "message": "Preparing to load model..."}, connection_id)
 
     # Send initial progress
-    await websocket.send_text(json.dumps({"type": "model_progress", "progress": 10, "status": "Checking model file..."}))
+    await manager.send_personal_message({"type": "model_progress", "progress": 10, "status": "Checking model file..."}, connection_id)
 
     try:
         # Load model in a thread to avoid blocking
         loop = asyncio.get_event_loop()
 
         # Progress updates during loading
-        await websocket.send_text(json.dumps({"type": "model_progress", "progress": 30, "status": "Loading model into memory..."}))
+        await manager.send_personal_message({"type": "model_progress", "progress": 30, "status": "Loading model into memory..."}, connection_id)
 
         # Run the load in a thread
         success = await asyncio.to_thread(model_manager.load_model, model_json, None)
 
         if success:
-            await websocket.send_text(json.dumps({"type": "model_progress", "progress": 90, "status": "Initializing model..."}))
+            await manager.send_personal_message({"type": "model_progress", "progress": 90, "status": "Initializing model..."}, connection_id)
             await asyncio.sleep(0.5)  # Small delay for UI
-            await websocket.send_text(json.dumps({"type": "model_progress", "progress": 100, "status": "Model loaded!"}))
+            await manager.send_personal_message({"type": "model_progress", "progress": 100, "status": "Model loaded!"}, connection_id)
             await asyncio.sleep(0.3)
-            await websocket.send_text(json.dumps({
+            await manager.send_personal_message({
                 "type": "status",
                 "message": f"✓ Model loaded: {model_manager.model_name}",
                 "model_name": model_manager.model_name,
                 "device": model_manager.device
-            }))
+            }, connection_id)
         else:
-            await websocket.send_text(json.dumps({"type": "error", "message": "Failed to load model"}))
+            await manager.send_personal_message({"type": "error", "message": "Failed to load model"}, connection_id)
 
     except Exception as e:
         logger.error(f"Error loading model: {e}")
-        await websocket.send_text(json.dumps({"type": "error", "message": f"Error: {str(e)}"}))
+        await manager.send_personal_message({"type": "error", "message": f"Error: {str(e)}"}, connection_id)
 
 async def handle_codriver_message(websocket: WebSocket, connection_id: str, user_id: str, message_data: dict):
     try:
         message_content = message_data.get("message", "")
         conversation_id = message_data.get("conversation_id")
 
-        await websocket.send_text(json.dumps({"type": "message_received", "message": message_content}))
+        await manager.send_personal_message({"type": "message_received", "message": message_content}, connection_id)
 
         if not conversation_id:
             conversation_id = await conversation_storage.create_conversation(user_id=user_id, agent_type="codriver")
@@ -150,7 +265,7 @@ async def handle_codriver_message(websocket: WebSocket, connection_id: str, user
         context_manager.set_conversation(conversation_id)
         context_manager.add_message(content=message_content, role="user", message_id=user_message_id)
 
-        await websocket.send_text(json.dumps({"type": "typing", "agent_type": "codriver"}))
+        await manager.send_personal_message({"type": "typing", "agent_type": "codriver"}, connection_id, droppable=True)
 
         start_time = datetime.utcnow()
         context = context_manager.get_context_for_prompt()
@@ -164,7 +279,7 @@ async def handle_codriver_message(websocket: WebSocket, connection_id: str, user
             generation_time=generation_time
         )
 
-        await websocket.send_text(json.dumps({
+        await manager.send_personal_message({
             "type": "response",
             "message": response.content,
             "conversation_id": conversation_id,
@@ -173,13 +288,87 @@ async def handle_codriver_message(websocket: WebSocket, connection_id: str, user
             "generation_time": generation_time,
             "suggestions": response.suggestions,
             "metadata": response.metadata
-        }))
+        }, connection_id)
 
     except Exception as e:
         logger.error(f"Error handling CoDriver message: {e}")
-        await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        await manager.send_personal_message({"type": "error", "message": str(e)}, connection_id)
+
+async def stream_frames(connection_id: str, chunks) -> str:
+    """Send coalesced token frames through the connection's send queue; return the full text"""
+    parts = []
+    frames = coalesce(
+        chunks,
+        interval=settings.ws_flush_interval_ms / 1000,
+        max_chars=settings.ws_flush_max_chars
+    )
+    try:
+        async for text in frames:
+            parts.append(text)
+            if not await manager.send_personal_message({"type": "token", "content": text}, connection_id):
+                # Connection gone or dropped as a slow consumer - stop generating
+                break
+    finally:
+        await frames.aclose()
+    return "".join(parts)
+
+async def handle_coordinator_message(websocket: WebSocket, connection_id: str, user_id: str, message_data: dict):
+    """Relay coordinator output to the socket as the coordinator produces it"""
+    try:
+        message_content = message_data.get("message", "")
+        conversation_id = message_data.get("conversation_id")
+
+        await manager.send_personal_message({"type": "message_received", "message": message_content}, connection_id)
+
+        if not conversation_id:
+            conversation_id = await conversation_storage.create_conversation(user_id=user_id, agent_type="coordinator")
+
+        user_message_id = await conversation_storage.save_message(conversation_id=conversation_id, role="user", content=message_content)
+
+        context_manager = ContextManager()
+        context_manager.set_conversation(conversation_id)
+        context_manager.add_message(content=message_content, role="user", message_id=user_message_id)
+
+        await manager.send_personal_message({"type": "typing", "agent_type": "coordinator"}, connection_id, droppable=True)
+
+        start_time = datetime.utcnow()
+        agent_context = AgentContext(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            message=message_content,
+            conversation_history=context_manager.get_context_for_prompt(),
+            agent_type=AgentType.COORDINATOR
+        )
+
+        # Closing the stream (on cancel/disconnect) closes the upstream request,
+        # cancelling the coordinator task
+        content = await stream_frames(connection_id, agent_router.coordinator.stream_message(agent_context))
+
+        generation_time = (datetime.utcnow() - start_time).total_seconds()
+        assistant_message_id = await conversation_storage.save_message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=content,
+            generation_time=generation_time
+        )
+
+        await manager.send_personal_message({
+            "type": "done",
+            "conversation_id": conversation_id,
+            "message_id": assistant_message_id,
+            "agent_type": "coordinator",
+            "generation_time": generation_time
+        }, connection_id)
+
+    except asyncio.CancelledError:
+        logger.info(f"Coordinator stream cancelled for {connection_id}")
+        raise
+    except Exception as e:
+        logger.error(f"Error handling coordinator message: {e}")
+        await manager.send_personal_message({"type": "error", "message": str(e)}, connection_id)
 
 async def handle_chat_message(websocket: WebSocket, connection_id: str, user_id: str, message_data: dict):
+    """Stream a local-model reply; generation runs in a worker thread, never on the event loop"""
     try:
         message_content = message_data.get("message", "")
         conversation_id = message_data.get("conversation_id")
@@ -187,13 +376,13 @@ async def handle_chat_message(websocket: WebSocket, connection_id: str, user_id:
 
         # Check if model is loaded
         if not model_manager.is_loaded():
-            await websocket.send_text(json.dumps({
+            await manager.send_personal_message({
                 "type": "error",
                 "message": "No model loaded. Please select and load a model first from the dropdown above."
-            }))
+            }, connection_id)
             return
 
-        await websocket.send_text(json.dumps({"type": "message_received", "message": message_content}))
+        await manager.send_personal_message({"type": "message_received", "message": message_content}, connection_id)
 
         if not conversation_id:
             conversation_id = await conversation_storage.create_conversation(user_id=user_id, agent_type=agent_type)
@@ -204,42 +393,42 @@ async def handle_chat_message(websocket: WebSocket, connection_id: str, user_id:
         context_manager.set_conversation(conversation_id)
         context_manager.add_message(content=message_content, role="user", message_id=user_message_id)
 
-        await websocket.send_text(json.dumps({"type": "typing", "agent_type": agent_type}))
+        await manager.send_personal_message({"type": "typing", "agent_type": agent_type}, connection_id, droppable=True)
 
         start_time = datetime.utcnow()
-        context = context_manager.get_context_for_prompt()
-
-        async def stream_tokens():
-            try:
-                for token in text_generator.stream_response(
-                    message_content,
-                    **SamplingConfig.for_chat().to_dict()
-                ):
-                    await websocket.send_text(json.dumps({"type": "token", "content": token}))
-            except WebSocketDisconnect:
-                logger.info(f"Client disconnected while streaming tokens for user {user_id}")
-            except Exception as e:
-                logger.error(f"Streaming error: {e}")
-                await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        sampling = SamplingConfig.for_chat().to_dict()
 
-        await stream_tokens()
+        try:
+            content = await stream_frames(
+                connection_id,
+                iterate_in_thread(lambda: text_generator.stream_response(message_content, **sampling))
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming error: {e}")
+            await manager.send_personal_message({"type": "error", "message": str(e)}, connection_id)
+            return
 
         generation_time = (datetime.utcnow() - start_time).total_seconds()
         assistant_message_id = await conversation_storage.save_message(
             conversation_id=conversation_id,
             role="assistant",
-            content="(streamed content)",
+            content=content,
             generation_time=generation_time
         )
 
-        await websocket.send_text(json.dumps({
+        await manager.send_personal_message({
             "type": "done",
             "conversation_id": conversation_id,
             "message_id": assistant_message_id,
             "agent_type": agent_type,
             "generation_time": generation_time
-        }))
+        }, connection_id)
 
+    except asyncio.CancelledError:
+        logger.info(f"Chat stream cancelled for {connection_id}")
+        raise
     except Exception as e:
         logger.error(f"Error handling chat message: {e}")
-        await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+        await manager.send_personal_message({"type": "error", "message": str(e)}, connection_id)
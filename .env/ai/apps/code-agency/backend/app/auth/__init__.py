@@ -1,7 +1,14 @@
 from .auth_manager import AuthManager
 from .dependencies import RequireRoles
+from .session_cache import CachedSession,SessionCache
+from .rate_limiter import TokenBucketLimiter,RedisTokenBucketLimiter,create_rate_limiter
 
 __all__ = [
     'AuthManager',
     'RequireRoles',
+    'CachedSession',
+    'SessionCache',
+    'TokenBucketLimiter',
+    'RedisTokenBucketLimiter',
+    'create_rate_limiter',
 ]
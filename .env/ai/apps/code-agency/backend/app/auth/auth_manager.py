@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -7,12 +8,19 @@ from sqlalchemy import select, update
 
 from ...memory.models import User, UserSession, UserInvitation
 from ...memory.database import db_manager
+from .session_cache import CachedSession, SessionCache
 
 logger = logging.getLogger(__name__)
 
+LAST_USED_FLUSH_INTERVAL = 30.0  # Seconds between batched last_used writes
+
 class AuthManager:
     def __init__(self):
         self.session_duration_days = 30
+        self.session_cache = SessionCache()
+        self._lookups: Dict[str, asyncio.Future] = {}     # In-flight database lookups by token
+        self._last_used: Dict[Any, datetime] = {}          # Session id -> latest use, not yet written
+        self._flush_task: Optional[asyncio.Task] = None
     
     async def create_user(self, username: str, email: str, password: str, 
                         full_name: str = None, is_admin: bool = False) -> Optional[User]:
@@ -100,6 +108,32 @@ class AuthManager:
             await session.close()
     
     async def get_user_by_session(self, session_token: str) -> Optional[User]:
+        """
+        Resolve a session token to its active user.
+
+        Served from the session cache when possible; concurrent misses for the
+        same token share one database lookup. last_used is recorded in memory
+        and written in batches by a background task.
+        """
+        entry = self.session_cache.get(session_token)
+        if entry is None:
+            lookup = self._lookups.get(session_token)
+            if lookup is None:
+                lookup = asyncio.ensure_future(self._load_session(session_token))
+                self._lookups[session_token] = lookup
+                lookup.add_done_callback(lambda _: self._lookups.pop(session_token, None))
+            entry = await asyncio.shield(lookup)
+            if entry is None:
+                return None
+
+        if datetime.utcnow() > entry.expires_at:
+            self.session_cache.invalidate(session_token)
+            return None
+
+        self._touch(entry.session_id)
+        return entry.user
+    
+    async def _load_session(self, session_token: str) -> Optional[CachedSession]:
         session = await db_manager.get_postgres_session()
         
         try:
@@ -111,14 +145,18 @@ class AuthManager:
             user_session = result.scalar_one_or_none()
             
             if user_session and not user_session.is_expired():
-                user_session.refresh_last_used()
-                await session.commit()
-                
                 user_result = await session.execute(
                     select(User).where(User.id == user_session.user_id)
                     .where(User.is_active == True)
                 )
-                return user_result.scalar_one_or_none()
+                user = user_result.scalar_one_or_none()
+                if user is None:
+                    return None
+
+                entry = CachedSession(user=user, session_id=user_session.id,
+                                      expires_at=user_session.expires_at)
+                self.session_cache.put(session_token, entry)
+                return entry
             
             return None
             
@@ -128,6 +166,57 @@ class AuthManager:
         finally:
             await session.close()
     
+    def _touch(self, session_id):
+        self._last_used[session_id] = datetime.utcnow()
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                pass
+    
+    async def _flush_loop(self):
+        while self._last_used:
+            await asyncio.sleep(LAST_USED_FLUSH_INTERVAL)
+            await self.flush_last_used()
+    
+    async def flush_last_used(self) -> int:
+        """Write pending last_used times in one transaction; returns sessions updated"""
+        pending, self._last_used = self._last_used, {}
+        if not pending:
+            return 0
+
+        session = await db_manager.get_postgres_session()
+        
+        try:
+            for session_id, last_used in pending.items():
+                await session.execute(
+                    update(UserSession).where(UserSession.id == session_id)
+                    .values(last_used=last_used)
+                )
+            await session.commit()
+            return len(pending)
+            
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Error updating session last_used: {e}")
+            # Keep the times for the next flush unless newer ones arrived meanwhile
+            for session_id, last_used in pending.items():
+                self._last_used.setdefault(session_id, last_used)
+            return 0
+        finally:
+            await session.close()
+    
+    async def close(self):
+        """Stop the write-behind task and flush what is pending"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_last_used()
+    
     async def invalidate_session(self, session_token: str) -> bool:
         session = await db_manager.get_postgres_session()
         
@@ -143,6 +232,11 @@ class AuthManager:
             logger.error(f"Error invalidating session: {e}")
             return False
         finally:
+            # Also drop whatever a lookup racing the logout is about to cache
+            self.session_cache.invalidate(session_token)
+            lookup = self._lookups.get(session_token)
+            if lookup is not None:
+                lookup.add_done_callback(lambda _: self.session_cache.invalidate(session_token))
             await session.close()
     
     async def get_all_users(self) -> list[User]:
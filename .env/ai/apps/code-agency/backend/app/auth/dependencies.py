@@ -1,16 +1,25 @@
 import logging
+import math
 from typing import Optional, Union
 
 from fastapi import Depends, HTTPException, status, Cookie, Request, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from ...memory.models import User
+from ..config import settings
 from .auth_manager import auth_manager
+from .rate_limiter import create_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
 
+USER_RATE_LIMIT = 1000       # Requests per window for signed-in users
+ANONYMOUS_RATE_LIMIT = 100   # Requests per window per IP address
+RATE_LIMIT_WINDOW = 60.0     # Seconds
+
+rate_limiter = create_rate_limiter(settings.rate_limit_redis_url)
+
 async def get_session_token(
     request: Request,
     session_token: Optional[str] = Cookie(None, alias="session_token"),
@@ -141,12 +150,22 @@ async def check_rate_limit(
 ) -> bool:
     if current_user:
         client_id = f"user_{current_user.id}"
-        max_requests = 1000
+        max_requests = USER_RATE_LIMIT
     else:
         client_ip = request.client.host if request.client else "unknown"
         client_id = f"ip_{client_ip}"
-        max_requests = 100
-    logger.debug(f"Rate limit check for {client_id}: allowed")
+        max_requests = ANONYMOUS_RATE_LIMIT
+    allowed, retry_after = await rate_limiter.acquire(client_id, max_requests, RATE_LIMIT_WINDOW)
+    if not allowed:
+        logger.warning(f"Rate limit exceeded for {client_id}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "rate_limited",
+                "message": f"Too many requests; limit is {max_requests} per {int(RATE_LIMIT_WINDOW)} seconds"
+            },
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
     return True
 
 async def get_user_context(
@@ -0,0 +1,106 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Shared backend is optional
+    redis_asyncio = None
+
+MAX_BUCKETS = 100000  # Clients tracked in-process; idle ones are evicted first
+
+# KEYS[1] bucket; ARGV capacity, refill/sec, now, cost. Returns {allowed, retry_after_ms}
+TOKEN_BUCKET_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, retry_after}
+"""
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets, one per client key.
+
+    A bucket holds up to `capacity` requests and refills at capacity/period
+    per second, so short bursts are allowed while the sustained rate stays
+    at `capacity` per `period`.
+    """
+
+    def __init__(self, max_buckets: int = MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # key -> [tokens, updated]
+
+    def allow(self, key: str, capacity: int, period: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take `cost` tokens; returns (allowed, seconds until it would be)"""
+        now = time.monotonic()
+        rate = capacity / period
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+        return False, (cost - bucket[0]) / rate
+
+    async def acquire(self, key: str, capacity: int, period: float, cost: float = 1.0) -> Tuple[bool, float]:
+        return self.allow(key, capacity, period, cost)
+
+
+class RedisTokenBucketLimiter:
+    """
+    Token buckets kept in Redis so limits hold across workers.
+
+    Falls back to in-process buckets if Redis is unreachable, rather than
+    failing requests or letting them through unlimited.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        self.prefix = prefix
+        self.client = redis_asyncio.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.fallback = TokenBucketLimiter()
+
+    async def acquire(self, key: str, capacity: int, period: float, cost: float = 1.0) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after_ms = await self.script(
+                keys=[self.prefix + key], args=[capacity, capacity / period, time.time(), cost]
+            )
+            return bool(allowed), retry_after_ms / 1000
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable, using local buckets: {e}")
+            return self.fallback.allow(key, capacity, period, cost)
+
+
+def create_rate_limiter(redis_url: Optional[str] = None):
+    """Redis-backed limiter when a URL is configured and redis is installed"""
+    if redis_url:
+        if redis_asyncio is not None:
+            return RedisTokenBucketLimiter(redis_url)
+        logger.warning("RATE_LIMIT_REDIS_URL is set but redis is not installed; using local buckets")
+    return TokenBucketLimiter()
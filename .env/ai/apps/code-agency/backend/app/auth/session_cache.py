@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+SESSION_CACHE_TTL = 60.0     # Seconds before a cached session is re-read from the database
+SESSION_CACHE_SIZE = 10000   # Most sessions kept in memory
+
+
+@dataclass
+class CachedSession:
+    user: Any                 # Detached User row
+    session_id: Any           # UserSession primary key, for last_used updates
+    expires_at: datetime      # Session expiry (UTC)
+    cached_at: float = 0.0    # time.monotonic() when stored
+
+
+class SessionCache:
+    """
+    TTL + LRU cache of session token -> authenticated user.
+
+    Entries are re-validated against the database after `ttl` seconds, so
+    deactivated users and revoked sessions stop working within that window
+    even on other workers; logout invalidates the local entry immediately.
+    """
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL, maxsize: int = SESSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CachedSession]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[CachedSession]:
+        entry = self._entries.get(token)
+        if entry is None or time.monotonic() - entry.cached_at > self.ttl:
+            if entry is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry
+
+    def put(self, token: str, entry: CachedSession):
+        entry.cached_at = time.monotonic()
+        self._entries[token] = entry
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id) -> int:
+        """Drop every cached session of a user; returns how many were dropped"""
+        tokens = [t for t, e in self._entries.items() if str(e.user.id) == str(user_id)]
+        for token in tokens:
+            del self._entries[token]
+        return len(tokens)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
@@ -47,6 +47,7 @@ class Settings(BaseSettings):
     secret_key: str = Field(env="SECRET_KEY")
     keep_data_local_only: bool = Field(default=True, env="KEEP_DATA_LOCAL_ONLY")
     require_authentication: bool = Field(default=False, env="REQUIRE_AUTHENTICATION")
+    rate_limit_redis_url: Optional[str] = Field(default=None, env="RATE_LIMIT_REDIS_URL")
     
     # Logging settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -58,6 +59,12 @@ class Settings(BaseSettings):
     enable_codriver_agent: bool = Field(default=True, env="ENABLE_CODRIVER_AGENT")
     auto_agent_routing: bool = Field(default=True, env="AUTO_AGENT_ROUTING")
     
+    # Websocket streaming settings
+    ws_flush_interval_ms: int = Field(default=50, env="WS_FLUSH_INTERVAL_MS")
+    ws_flush_max_chars: int = Field(default=1024, env="WS_FLUSH_MAX_CHARS")
+    ws_send_queue_size: int = Field(default=64, env="WS_SEND_QUEUE_SIZE")
+    ws_slow_consumer_timeout: float = Field(default=5.0, env="WS_SLOW_CONSUMER_TIMEOUT")
+    
     # GitHub integration
     github_token: Optional[str] = Field(default=None, env="GITHUB_TOKEN")
 
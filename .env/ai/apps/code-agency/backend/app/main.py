@@ -10,7 +10,7 @@ from contextlib import asynccontextmanager
 from .api.chat import router as chat_router
 from .api.websocket import router as websocket_router
 from .api.health import router as health_router
-from .api.ide import router as ide_router
+from .api.ide import router as ide_router, ws_router as ide_ws_router
 from .api.models import router as models_router
 from .api.auth import router as auth_router
 from .api.agency import router as agency_router
@@ -18,11 +18,13 @@ from .api.agency import router as agency_router
 # Agency Control Center APIs
 from .api.auth_api import router as auth_control_router
 from .api.control_api import router as control_router
+from .auth.dependencies import check_rate_limit
 
 from ..memory.database import db_manager
 from ..memory.embeddings import embedding_manager
 from ..inference.model_manager import model_manager
 from .config import settings
+from .services.warmup import warmup
 
 logging.basicConfig(
     level=logging.INFO,
@@ -53,21 +55,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(models_router, prefix="/api", tags=["models"])
-app.include_router(chat_router)  # Already has /api/chat prefix
+# Per-user/per-IP request limits for HTTP APIs; health probes and websockets are exempt
+rate_limited = [Depends(check_rate_limit)]
+
+app.include_router(models_router, prefix="/api", tags=["models"], dependencies=rate_limited)
+app.include_router(chat_router, dependencies=rate_limited)  # Already has /api/chat prefix
 app.include_router(websocket_router, tags=["websocket"])
 app.include_router(health_router)  # Already has /api/health prefix
-app.include_router(ide_router)  # Already has /api/ide prefix
-app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
-app.include_router(agency_router, tags=["agency"])  # Agency integration
+app.include_router(ide_router, dependencies=rate_limited)  # Already has /api/ide prefix
+app.include_router(ide_ws_router)
+app.include_router(auth_router, prefix="/api/auth", tags=["auth"], dependencies=rate_limited)
+app.include_router(agency_router, tags=["agency"], dependencies=rate_limited)  # Agency integration
 
 # Agency Control Center
-app.include_router(auth_control_router)  # Already has /api/auth prefix
-app.include_router(control_router)  # Already has /api/control prefix
+app.include_router(auth_control_router, dependencies=rate_limited)  # Already has /api/auth prefix
+app.include_router(control_router, dependencies=rate_limited)  # Already has /api/control prefix
 
 # Ollama Integration
 from .api.ollama_api import router as ollama_router
-app.include_router(ollama_router)  # Already has /api/ollama prefix
+app.include_router(ollama_router, dependencies=rate_limited)  # Already has /api/ollama prefix
 
 
 @asynccontextmanager
@@ -87,16 +93,30 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"DuckDB initialization failed (continuing without it): {e}")
 
-    try:
-        embedding_manager.initialize()
-        logger.info("Embeddings initialized successfully")
-    except Exception as e:
-        logger.warning(f"Embeddings initialization failed (continuing without it): {e}")
+    # Slow model loads run in the background; /api/health reports progress
+    if settings.enable_embeddings:
+        warmup.add("embeddings", embedding_manager.initialize)
+    warmup.start()
 
     logger.info("AI Assistant started successfully")
     yield
 
     logger.info("Shutting down AI Assistant...")
+    await warmup.close()
+
+    # Write pending session activity and buffered messages before the database goes away
+    try:
+        from .auth.auth_manager import auth_manager
+        await auth_manager.close()
+    except Exception as e:
+        logger.warning(f"Error flushing session activity: {e}")
+
+    try:
+        from ..memory.storage import conversation_storage
+        await conversation_storage.close()
+    except Exception as e:
+        logger.warning(f"Error flushing buffered messages: {e}")
+
     try:
         await db_manager.close_connections()
     except Exception as e:
@@ -118,6 +138,29 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Error closing coordinator agent: {e}")
 
+    # Stop background health probes
+    try:
+        from ..agents.health_monitor import close_health_monitors
+        await close_health_monitors()
+    except Exception as e:
+        logger.warning(f"Error closing health monitors: {e}")
+
+    # Stop workspace file watching
+    try:
+        from ..ide.file_manager import file_manager
+        file_manager.tree_index.stop()
+        from ..ide.code_index import code_index
+        code_index.stop()
+    except Exception as e:
+        logger.warning(f"Error stopping file tree watcher: {e}")
+
+    # Stop control API metrics sampling
+    try:
+        from .api.control_api import metrics_sampler
+        await metrics_sampler.close()
+    except Exception as e:
+        logger.warning(f"Error stopping metrics sampler: {e}")
+
     logger.info("AI Assistant stopped")
 
 app.router.lifespan_context = lifespan
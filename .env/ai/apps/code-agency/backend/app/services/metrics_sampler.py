@@ -0,0 +1,167 @@
+"""
+Metrics Sampler
+Collects agency service and system stats in the background at a fixed
+cadence, so control endpoints serve the latest snapshot instantly and can
+chart recent history from a ring buffer.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 5.0  # Seconds between samples
+HISTORY_SIZE = 120     # Samples kept (10 minutes at the default interval)
+
+AGENCY_SERVICES = [
+    {"name": "api-gateway", "port": 9013, "pid_file": "api-gateway.pid"},
+    {"name": "command-coordinator", "port": 9015, "pid_file": "command-coordinator.pid"},
+    {"name": "file-ops", "port": 9014, "pid_file": "file-ops.pid"},
+    {"name": "web-search", "port": 9002, "pid_file": "web-search.pid"},
+    {"name": "web-scraper", "port": 9003, "pid_file": "web-scraper.pid"},
+    {"name": "trading-agent", "port": 9007, "pid_file": "trading-agent.pid"},
+    {"name": "data-collector", "port": 9006, "pid_file": "data-collector.pid"},
+    {"name": "openvino-vision", "port": 9017, "pid_file": "openvino-vision.pid"},
+    {"name": "ui-builder", "port": 9018, "pid_file": "ui-builder.pid"},
+    {"name": "codriver-ide", "port": 8001, "pid_file": "codriver-ide.pid"},
+]
+
+
+class MetricsSampler:
+    """
+    Background sampler for service processes and host resources.
+
+    CPU figures are measured between consecutive samples (psutil's
+    non-blocking mode), so no request ever waits on a measurement window.
+    """
+
+    def __init__(self, pids_dir: Path, services: List[Dict[str, Any]] = AGENCY_SERVICES,
+                 interval: float = SAMPLE_INTERVAL, history_size: int = HISTORY_SIZE):
+        self.pids_dir = pids_dir
+        self.services = services
+        self.interval = interval
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._processes: Dict[int, psutil.Process] = {}  # Kept so cpu_percent has a previous reading
+        self._task: Optional[asyncio.Task] = None
+        self._first_sample: Optional[asyncio.Event] = None  # Set once the loop has tried its first sample
+        psutil.cpu_percent(interval=None)  # Prime the system-wide CPU counter
+
+    def _process(self, pid: int) -> psutil.Process:
+        process = self._processes.get(pid)
+        if process is None or not process.is_running():
+            process = psutil.Process(pid)
+            process.cpu_percent(interval=None)
+            self._processes[pid] = process
+        return process
+
+    def _sample_service(self, svc: Dict[str, Any]) -> Dict[str, Any]:
+        info = {"name": svc["name"], "port": svc["port"], "status": "stopped", "pid": None,
+                "memory_mb": None, "cpu_percent": None, "create_time": None}
+        pid_file = self.pids_dir / svc["pid_file"]
+        if not pid_file.exists():
+            return info
+
+        try:
+            pid = int(pid_file.read_text().strip())
+            if psutil.pid_exists(pid):
+                process = self._process(pid)
+                info.update(status="running", pid=pid)
+                try:
+                    info["memory_mb"] = round(process.memory_info().rss / 1024 / 1024, 2)
+                    info["cpu_percent"] = round(process.cpu_percent(interval=None), 2)
+                    info["create_time"] = process.create_time()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        except (ValueError, FileNotFoundError, psutil.NoSuchProcess):
+            info["status"] = "error"
+        return info
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample and append it to the history"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        services = [self._sample_service(svc) for svc in self.services]
+
+        live = {s["pid"] for s in services if s["pid"]}
+        for pid in [p for p in self._processes if p not in live]:
+            del self._processes[pid]
+
+        sample = {
+            "timestamp": time.time(),
+            "system": {
+                "cpu_percent": round(psutil.cpu_percent(interval=None), 2),
+                "memory_percent": round(memory.percent, 2),
+                "memory_used_gb": round(memory.used / (1024**3), 2),
+                "memory_total_gb": round(memory.total / (1024**3), 2),
+                "disk_percent": round(disk.percent, 2),
+                "disk_used_gb": round(disk.used / (1024**3), 2),
+                "disk_total_gb": round(disk.total / (1024**3), 2),
+            },
+            "services": services
+        }
+        self._history.append(sample)
+        return sample
+
+    def start(self):
+        """Start background sampling (no-op if already running or no event loop)"""
+        if self._task and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._first_sample is None:
+            self._first_sample = asyncio.Event()
+        self._task = loop.create_task(self._sample_loop())
+
+    async def _sample_loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sample)
+            except Exception as e:
+                logger.error(f"Error sampling metrics: {e}")
+            self._first_sample.set()
+            await asyncio.sleep(self.interval)
+
+    async def latest(self) -> Dict[str, Any]:
+        """Most recent sample, waiting for the loop's first one if none exists yet"""
+        self.start()
+        if not self._history:
+            # The loop is the only sampler; sampling here too would race it
+            # on the shared process table and CPU counters
+            await self._first_sample.wait()
+            if not self._history:
+                raise RuntimeError("Metrics sampling failed, no sample available")
+        return self._history[-1]
+
+    def history(self, limit: Optional[int] = None, service: Optional[str] = None) -> Dict[str, Any]:
+        """System (or one service's) metrics over the retained window, oldest first"""
+        samples = list(self._history)
+        if limit:
+            samples = samples[-limit:]
+
+        points = []
+        for sample in samples:
+            if service is None:
+                point = sample["system"]
+            else:
+                point = next((s for s in sample["services"] if s["name"] == service), None)
+                if point is None:
+                    continue
+                point = {k: point[k] for k in ("status", "cpu_percent", "memory_mb")}
+            points.append({"timestamp": sample["timestamp"], **point})
+        return {"interval": self.interval, "service": service, "points": points}
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,74 @@
+"""
+Startup Warm-up
+Runs slow initialization steps (model loads, heavy imports) in the
+background after the server starts accepting requests, and tracks each
+stage so /api/health can report readiness.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Ordered background warm-up stages with per-stage state"""
+
+    def __init__(self):
+        self._stages: List[Tuple[str, Callable[[], Any]]] = []
+        self.status: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, step: Callable[[], Any]):
+        """
+        Register a blocking step; it runs in a worker thread. A step that
+        raises or returns False is reported as failed.
+        """
+        self._stages.append((name, step))
+        self.status[name] = {"state": "pending", "seconds": None, "error": None}
+
+    @property
+    def ready(self) -> bool:
+        """True once every stage has finished, successfully or not"""
+        return all(stage["state"] in ("ready", "failed") for stage in self.status.values())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        for name, step in self._stages:
+            stage = self.status[name]
+            stage["state"] = "running"
+            started = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(step)
+                stage["state"] = "failed" if result is False else "ready"
+            except Exception as e:
+                stage["state"] = "failed"
+                stage["error"] = str(e)
+                logger.warning(f"Warm-up stage {name} failed (continuing without it): {e}")
+            stage["seconds"] = round(time.perf_counter() - started, 2)
+            logger.info(f"Warm-up stage {name} {stage['state']} in {stage['seconds']}s")
+
+    async def wait(self):
+        if self._task:
+            await asyncio.shield(self._task)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "stages": self.status}
+
+    async def close(self):
+        # A step already running in its thread finishes on its own
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global instance
+warmup = Warmup()
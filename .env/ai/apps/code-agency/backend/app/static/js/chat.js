@@ -71,6 +71,20 @@ class ChatInterface {
                 this.showTypingIndicator();
                 break;
                 
+            case 'token':
+                this.hideTypingIndicator();
+                this.appendStreamingToken(data.content);
+                break;
+
+            case 'done':
+                this.finishStreamingMessage(data);
+                this.updateGenerationStats(data.generation_time);
+                break;
+
+            case 'cancelled':
+                this.finishStreamingMessage({});
+                break;
+
             case 'response':
                 this.hideTypingIndicator();
                 this.addMessage(data.message, 'assistant', {
@@ -82,7 +96,7 @@ class ChatInterface {
                 break;
                 
             case 'error':
-                this.hideTypingIndicator();
+                this.finishStreamingMessage({});
                 window.aiAssistant.showToast(`Chat error: ${data.message}`, 'error');
                 break;
                 
@@ -91,6 +105,41 @@ class ChatInterface {
         }
     }
 
+    appendStreamingToken(token) {
+        if (!this.streamingMessage) {
+            this.addMessage('', 'assistant', { agentType: 'coordinator' });
+            const messages = document.querySelectorAll('#chat-messages .message.assistant');
+            this.streamingMessage = {
+                element: messages[messages.length - 1].querySelector('.message-text'),
+                text: ''
+            };
+        }
+        this.streamingMessage.text += token;
+        this.streamingMessage.element.innerHTML = this.formatMessage(this.streamingMessage.text, 'assistant');
+        if (this.settings.autoScroll) {
+            this.scrollToBottom();
+        }
+    }
+
+    finishStreamingMessage(data) {
+        if (data.conversation_id) {
+            this.currentConversationId = data.conversation_id;
+        }
+        this.streamingMessage = null;
+        this.hideTypingIndicator();
+        this.setStreaming(false);
+    }
+
+    setStreaming(active) {
+        document.getElementById('stop-btn')?.classList.toggle('hidden', !active);
+    }
+
+    cancelStreaming() {
+        if (this.websocket && this.websocket.readyState === WebSocket.OPEN) {
+            this.websocket.send(JSON.stringify({ type: 'cancel' }));
+        }
+    }
+
     updateConnectionStatus(connected) {
         const statusDot = document.getElementById('chat-status-dot');
         const statusText = document.getElementById('chat-status-text');
@@ -113,6 +162,11 @@ class ChatInterface {
             this.sendMessage();
         });
 
+        // Stop the reply being streamed
+        document.getElementById('stop-btn')?.addEventListener('click', () => {
+            this.cancelStreaming();
+        });
+
         // Input handling
         const chatInput = document.getElementById('chat-input');
         chatInput?.addEventListener('input', () => {
@@ -124,6 +178,8 @@ class ChatInterface {
             if ((e.ctrlKey || e.metaKey) && e.key === 'Enter') {
                 e.preventDefault();
                 this.sendMessage();
+            } else if (e.key === 'Escape') {
+                this.cancelStreaming();
             }
         });
 
@@ -232,6 +288,7 @@ class ChatInterface {
                 temperature: this.settings.temperature,
                 max_tokens: this.settings.maxTokens
             }));
+            this.setStreaming(true);
         } else {
             window.aiAssistant.showToast('Connection lost. Please wait...', 'warning');
         }
@@ -1,6 +1,8 @@
 from .file_manager import FileManager
 from .github_client import GitStatus,GitCommit,GitHubClient
 from .terminal import TerminalSession,TerminalManager
+from .tree_index import TreeNode,TreeIndex
+from .code_index import Symbol,IndexedFile,CodeIndex
 
 __all__ = [
     'FileManager',
@@ -9,4 +11,9 @@ __all__ = [
     'GitHubClient',
     'TerminalSession',
     'TerminalManager',
+    'TreeNode',
+    'TreeIndex',
+    'Symbol',
+    'IndexedFile',
+    'CodeIndex',
 ]
@@ -0,0 +1,493 @@
+"""
+Code Index - Workspace content search and symbol table
+Keeps a trigram index over workspace file contents plus a per-file symbol
+table, updated from the file tree's change notifications, so searches and
+CodeAgent context retrieval only open files that can actually match.
+"""
+
+import ast
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from .file_manager import FileManager, file_manager
+
+logger = logging.getLogger(__name__)
+
+MAX_FILE_SIZE = 1024 * 1024  # Larger files are not indexed
+RESCAN_INTERVAL = 30.0       # Seconds between full sweeps when file events are unavailable
+UPDATE_DEBOUNCE = 0.2        # Seconds to gather a burst of changes before reindexing
+IGNORED_DIRS = {"node_modules", "__pycache__", "venv", "target", "dist"}
+
+IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]{2,}')
+FILENAME_RE = re.compile(r'[\w\-/]+\.\w+')
+RETRIEVAL_STOPWORDS = {
+    "the", "and", "for", "with", "this", "that", "from", "what", "how", "can", "you", "please",
+    "write", "make", "create", "add", "fix", "change", "update", "use", "using", "into", "does",
+    "code", "file", "files", "function", "class", "method", "should", "would", "could", "there",
+    "why", "where", "when", "which", "need", "want", "help", "about", "some", "all", "not", "are",
+    "get", "set", "new", "def", "return", "import", "self", "true", "false", "none", "null"
+}
+
+# Declarations recognised per language when no parser is available
+_JS_SYMBOLS = [
+    ("function", r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)'),
+    ("class", r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)'),
+    ("function", r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*=>'),
+    ("interface", r'^\s*(?:export\s+)?interface\s+([A-Za-z_$][\w$]*)'),
+    ("type", r'^\s*(?:export\s+)?type\s+([A-Za-z_$][\w$]*)\s*='),
+]
+SYMBOL_PATTERNS: Dict[str, List[Tuple[str, re.Pattern]]] = {
+    language: [(kind, re.compile(pattern, re.MULTILINE)) for kind, pattern in patterns]
+    for language, patterns in {
+        "python": [
+            ("function", r'^\s*(?:async\s+)?def\s+(\w+)'),
+            ("class", r'^\s*class\s+(\w+)'),
+        ],
+        "javascript": _JS_SYMBOLS,
+        "javascriptreact": _JS_SYMBOLS,
+        "typescript": _JS_SYMBOLS,
+        "typescriptreact": _JS_SYMBOLS,
+        "rust": [
+            ("function", r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(\w+)'),
+            ("struct", r'^\s*(?:pub(?:\([^)]*\))?\s+)?struct\s+(\w+)'),
+            ("enum", r'^\s*(?:pub(?:\([^)]*\))?\s+)?enum\s+(\w+)'),
+            ("trait", r'^\s*(?:pub(?:\([^)]*\))?\s+)?trait\s+(\w+)'),
+        ],
+        "go": [
+            ("function", r'^func\s+(?:\([^)]*\)\s*)?(\w+)'),
+            ("struct", r'^type\s+(\w+)\s+struct\b'),
+            ("interface", r'^type\s+(\w+)\s+interface\b'),
+        ],
+        "java": [
+            ("class", r'^\s*(?:(?:public|private|protected|abstract|final|static)\s+)*class\s+(\w+)'),
+            ("interface", r'^\s*(?:(?:public|private|protected)\s+)*interface\s+(\w+)'),
+            ("enum", r'^\s*(?:(?:public|private|protected)\s+)*enum\s+(\w+)'),
+        ],
+    }.items()
+}
+
+
+@dataclass
+class Symbol:
+    name: str
+    kind: str        # function, method, class, struct, enum, trait, interface or type
+    path: str
+    line: int
+    end_line: int
+    language: str
+    container: Optional[str] = None
+
+
+@dataclass
+class IndexedFile:
+    path: str
+    language: str
+    mtime_ns: int
+    size: int
+    trigrams: FrozenSet[str]
+    symbols: List[Symbol]
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _python_symbols(path: str, source: str) -> List[Symbol]:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return _pattern_symbols(path, "python", source)
+
+    symbols = []
+
+    def visit(node, container: Optional[str], in_class: bool):
+        # Definitions only live in statement blocks, so expressions are never walked
+        children = [c for name in ("body", "handlers", "orelse", "finalbody", "cases")
+                    for c in getattr(node, name, None) or () if isinstance(c, ast.AST)]
+        for child in children:
+            if isinstance(child, ast.ClassDef):
+                kind = "class"
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            else:
+                visit(child, container, in_class)
+                continue
+            symbols.append(Symbol(child.name, kind, path, child.lineno,
+                                  getattr(child, "end_lineno", None) or child.lineno, "python", container))
+            visit(child, f"{container}.{child.name}" if container else child.name, kind == "class")
+
+    visit(tree, None, False)
+    return symbols
+
+
+def _pattern_symbols(path: str, language: str, source: str) -> List[Symbol]:
+    symbols = []
+    for kind, pattern in SYMBOL_PATTERNS.get(language, []):
+        for match in pattern.finditer(source):
+            line = source.count("\n", 0, match.start(1)) + 1
+            symbols.append(Symbol(match.group(1), kind, path, line, line, language))
+    return sorted(symbols, key=lambda s: s.line)
+
+
+def extract_symbols(path: str, language: str, source: str) -> List[Symbol]:
+    """Functions, classes and similar declarations defined in a source file"""
+    if language == "python":
+        return _python_symbols(path, source)
+    return _pattern_symbols(path, language, source)
+
+
+class CodeIndex:
+    """
+    Trigram and symbol index over a FileManager workspace.
+
+    The first use starts a background build; until it finishes, searches
+    cover whatever has been indexed so far and report `indexing: true`.
+    Afterwards files are reindexed as the tree index reports changes, or by
+    periodic mtime sweeps when file events are unavailable.
+    """
+
+    def __init__(self, manager: FileManager):
+        self.file_manager = manager
+        self.root = manager.workspace_root
+        self._lock = threading.RLock()
+        self._files: Dict[str, IndexedFile] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._symbols: Dict[str, List[Symbol]] = {}
+        self._names: Dict[str, Set[str]] = {}  # Lowercased file names and stems -> paths
+        self._ready = False
+        self._pending: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        manager.tree_index.add_listener(self._on_paths)
+
+    # Indexing
+
+    def _walk(self, rel: str = ""):
+        """Yield relative paths of indexable files under rel"""
+        for dirpath, dirnames, filenames in os.walk(self.root / rel):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in IGNORED_DIRS]
+            base = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            for name in filenames:
+                if not name.startswith('.'):
+                    yield name if base == "." else f"{base}/{name}"
+
+    def _indexable(self, rel: str) -> bool:
+        return not any(part.startswith('.') or part in IGNORED_DIRS for part in rel.split("/"))
+
+    def build(self):
+        """Index every file in the workspace (unchanged files are skipped)"""
+        started = time.monotonic()
+        seen = set()
+        for rel in self._walk():
+            seen.add(rel)
+            self._index_file(rel)
+        with self._lock:
+            for rel in [p for p in self._files if p not in seen]:
+                self._remove(rel)
+            self._ready = True
+        logger.info(f"Code index built: {len(seen)} files in {time.monotonic() - started:.1f}s")
+
+    def _index_file(self, rel: str):
+        full_path = self.root / rel
+        try:
+            stat = full_path.stat()
+        except OSError:
+            with self._lock:
+                self._remove(rel)
+            return
+
+        existing = self._files.get(rel)
+        if existing and (existing.mtime_ns, existing.size) == (stat.st_mtime_ns, stat.st_size):
+            return
+        if not full_path.is_file() or stat.st_size > MAX_FILE_SIZE or self.file_manager._is_binary_file(full_path):
+            with self._lock:
+                self._remove(rel)
+            return
+
+        try:
+            source = full_path.read_text(encoding="utf-8", errors="replace")
+        except OSError as e:
+            logger.debug(f"Could not index {rel}: {e}")
+            return
+
+        language = self.file_manager._detect_language(full_path)
+        indexed = IndexedFile(rel, language, stat.st_mtime_ns, stat.st_size,
+                              frozenset(_trigrams(source.lower())), extract_symbols(rel, language, source))
+
+        with self._lock:
+            self._remove(rel)
+            self._files[rel] = indexed
+            for gram in indexed.trigrams:
+                self._postings.setdefault(gram, set()).add(rel)
+            for symbol in indexed.symbols:
+                self._symbols.setdefault(symbol.name.lower(), []).append(symbol)
+            for name in self._name_keys(rel):
+                self._names.setdefault(name, set()).add(rel)
+
+    def _remove(self, rel: str):
+        indexed = self._files.pop(rel, None)
+        if indexed is None:
+            return
+        for gram in indexed.trigrams:
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(rel)
+                if not paths:
+                    del self._postings[gram]
+        for name in {s.name.lower() for s in indexed.symbols}:
+            remaining = [s for s in self._symbols.get(name, []) if s.path != rel]
+            if remaining:
+                self._symbols[name] = remaining
+            else:
+                self._symbols.pop(name, None)
+        for name in self._name_keys(rel):
+            paths = self._names.get(name)
+            if paths is not None:
+                paths.discard(rel)
+                if not paths:
+                    del self._names[name]
+
+    @staticmethod
+    def _name_keys(rel: str) -> Set[str]:
+        name = rel.rsplit("/", 1)[-1].lower()
+        return {name, name.split(".", 1)[0]}
+
+    # Change tracking
+
+    def _on_paths(self, paths: List[str]):
+        with self._lock:
+            self._pending.update(p for p in paths if p not in ("", ".") and self._indexable(p))
+        self._wake.set()
+
+    def flush(self):
+        """Reindex paths reported as changed"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        for rel in sorted(pending):
+            full_path = self.root / rel
+            if full_path.is_dir():
+                for child in self._walk(rel):
+                    self._index_file(child)
+            elif full_path.exists():
+                self._index_file(rel)
+            else:
+                # Gone - drop the file or everything that was under the directory
+                prefix = rel + "/"
+                with self._lock:
+                    for path in [p for p in self._files if p == rel or p.startswith(prefix)]:
+                        self._remove(path)
+
+    def start(self):
+        """Start the background build and updates (no-op if already running)"""
+        if self._worker and self._worker.is_alive():
+            return
+        self.file_manager.tree_index.start()
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="code-index", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        try:
+            self.build()
+        except Exception as e:
+            logger.error(f"Error building code index: {e}")
+        last_sweep = time.monotonic()
+
+        while not self._stop.is_set():
+            if self._wake.wait(RESCAN_INTERVAL):
+                self._wake.clear()
+                self._stop.wait(UPDATE_DEBOUNCE)
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+                if not self.file_manager.tree_index.watching and time.monotonic() - last_sweep >= RESCAN_INTERVAL:
+                    self.build()
+                    last_sweep = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error updating code index: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=2)
+            self._worker = None
+
+    # Queries
+
+    def _candidates(self, text: str) -> Set[str]:
+        """Files whose contents contain every trigram of text (a superset of the real matches)"""
+        grams = _trigrams(text.lower())
+        if not grams:
+            return set(self._files)
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        result = set(postings[0])
+        for paths in postings[1:]:
+            if not result:
+                break
+            result &= paths
+        return result
+
+    def _read_lines(self, rel: str) -> Optional[List[str]]:
+        try:
+            with open(self.root / rel, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().splitlines()
+        except OSError:
+            return None
+
+    def search(self, query: str, regex: bool = False, case_sensitive: bool = False,
+               path: str = "", max_results: int = 100) -> Dict[str, Any]:
+        """Find matching lines across the workspace"""
+        if not query:
+            return {"error": "Empty query"}
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            matcher = re.compile(query if regex else re.escape(query), flags)
+        except re.error as e:
+            return {"error": f"Invalid regex: {e}"}
+
+        self.start()
+        prefix = path.strip("/")
+        with self._lock:
+            # Regexes have no literal to narrow by, so they check every indexed file
+            candidates = set(self._files) if regex else self._candidates(query)
+            ready = self._ready
+        if prefix:
+            candidates = {p for p in candidates if p == prefix or p.startswith(prefix + "/")}
+
+        results = []
+        files_matched = 0
+        for rel in sorted(candidates):
+            lines = self._read_lines(rel)
+            if lines is None:
+                continue
+            matched = False
+            for number, line in enumerate(lines, 1):
+                match = matcher.search(line)
+                if match:
+                    matched = True
+                    results.append({"path": rel, "line": number, "column": match.start() + 1, "text": line[:300]})
+                    if len(results) >= max_results:
+                        break
+            files_matched += matched
+            if len(results) >= max_results:
+                break
+
+        return {
+            "query": query,
+            "results": results,
+            "files_searched": len(candidates),
+            "files_matched": files_matched,
+            "truncated": len(results) >= max_results,
+            "indexing": not ready
+        }
+
+    def find_symbols(self, query: str, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Symbols whose name contains query, exact and prefix matches first"""
+        self.start()
+        needle = query.lower()
+        with self._lock:
+            exact = list(self._symbols.get(needle, []))
+            partial = [s for name, symbols in self._symbols.items() if name != needle and needle in name for s in symbols]
+        partial.sort(key=lambda s: (not s.name.lower().startswith(needle), len(s.name), s.path, s.line))
+        ranked = [s for s in exact + partial if kind is None or s.kind == kind]
+        return [asdict(s) for s in ranked[:limit]]
+
+    def retrieve(self, message: str, limit: int = 3, context_lines: int = 20,
+                 max_chars: int = 2000, exclude: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Pick the workspace snippets most relevant to a message.
+
+        Files score for defining a symbol the message names, for matching a
+        file name it mentions, and for containing its identifiers (rarer
+        terms weigh more). Each file contributes one snippet: the named
+        symbol's body, or the lines around its first term hit.
+        """
+        self.start()
+        exclude = exclude or set()
+        terms = []
+        for term in IDENTIFIER_RE.findall(message):
+            if term.lower() not in RETRIEVAL_STOPWORDS and term.lower() not in (t.lower() for t in terms):
+                terms.append(term)
+        terms = terms[:12]
+        filenames = {f.rsplit("/", 1)[-1].lower() for f in FILENAME_RE.findall(message)}
+
+        scores: Counter = Counter()
+        anchors: Dict[str, Tuple[int, int]] = {}
+        with self._lock:
+            total = len(self._files)
+            if not total:
+                return []
+            for name in filenames:
+                for rel in self._names.get(name, ()):
+                    scores[rel] += 3.0
+            for term in terms:
+                for symbol in self._symbols.get(term.lower(), [])[:20]:
+                    scores[symbol.path] += 5.0
+                    anchors.setdefault(symbol.path, (symbol.line, symbol.end_line))
+                candidates = self._candidates(term)
+                if len(candidates) > total / 2:
+                    continue  # Too common to tell files apart
+                weight = math.log(1 + total / len(candidates)) if candidates else 0.0
+                for rel in candidates:
+                    scores[rel] += weight
+
+        pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE) if terms else None
+        snippets = []
+        for rel, score in scores.most_common(limit * 4):
+            if rel in exclude:
+                continue
+            lines = self._read_lines(rel)
+            if not lines:
+                continue
+
+            if rel in anchors:
+                start, end = anchors[rel]
+                end = min(max(end, start + context_lines // 2), start + context_lines * 2)
+                reason = "symbol"
+            else:
+                hit = next((i for i, line in enumerate(lines, 1) if pattern and pattern.search(line)), None)
+                if hit is not None:
+                    start, end = max(1, hit - context_lines // 2), hit + context_lines // 2
+                    reason = "content"
+                elif rel.rsplit("/", 1)[-1].lower() in filenames:
+                    start, end = 1, context_lines * 2
+                    reason = "filename"
+                else:
+                    continue  # Trigram false positive
+
+            end = min(end, len(lines))
+            snippets.append({
+                "path": rel,
+                "language": self._files[rel].language if rel in self._files else "plaintext",
+                "start_line": start,
+                "end_line": end,
+                "content": "\n".join(lines[start - 1:end])[:max_chars],
+                "score": round(score, 3),
+                "reason": reason
+            })
+            if len(snippets) >= limit:
+                break
+        return snippets
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self._ready,
+                "files": len(self._files),
+                "trigrams": len(self._postings),
+                "symbols": sum(len(s) for s in self._symbols.values())
+            }
+
+
+# Global instance
+code_index = CodeIndex(file_manager)
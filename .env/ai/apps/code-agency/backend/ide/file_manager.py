@@ -1,18 +1,32 @@
 import os
 import shutil
+import tempfile
 import mimetypes
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, Optional
 from datetime import datetime
 
+from .line_index import LineIndex
+from .tree_index import TreeIndex
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_LINES = 2000  # Line range size when only start_line is given
+DEFAULT_CHUNK_BYTES = 256 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+LINE_INDEX_CACHE_SIZE = 16
+
 class FileManager:
     def __init__(self, workspace_root: str = "workspace"):
         self.workspace_root = Path(workspace_root).resolve()
         self.workspace_root.mkdir(exist_ok=True)
         self.allowed_path = self.workspace_root
+        self.tree_index = TreeIndex(self.workspace_root, self._detect_language, self._is_binary_file)
+        self._line_indexes: OrderedDict = OrderedDict()
+        self._line_index_lock = threading.Lock()
 
     def _validate_path(self, path: str) -> Path:
         full_path = (self.workspace_root / path.lstrip('/')).resolve()
@@ -20,16 +34,29 @@ class FileManager:
             raise ValueError("Path outside workspace not allowed")
         return full_path
 
-    def get_file_tree(self, path: str = "", max_depth: int = 3) -> Dict:
+    def _relative(self, full_path: Path) -> str:
+        return full_path.relative_to(self.workspace_root).as_posix()
+
+    def get_file_tree(self, path: str = "", max_depth: int = 3, max_children: Optional[int] = None) -> Dict:
         try:
             full_path = self._validate_path(path)
             if not full_path.exists():
                 return {"error": "Path not found"}
-            return self._build_tree_node(full_path, 0, max_depth)
+            tree = self.tree_index.get_tree(self._relative(full_path), max_depth, max_children)
+            if tree is None:
+                # Hidden paths are not indexed
+                tree = self._build_tree_node(full_path, 0, max_depth)
+            return tree
         except Exception as e:
             logger.error(f"Error building file tree: {e}")
             return {"error": str(e)}
 
+    def get_tree_etag(self, path: str = "", max_depth: int = 3) -> Optional[str]:
+        try:
+            return self.tree_index.etag(self._relative(self._validate_path(path)), max_depth)
+        except Exception:
+            return None
+
     def _build_tree_node(self, path: Path, current_depth: int, max_depth: int) -> Dict:
         try:
             stat = path.stat()
@@ -61,44 +88,140 @@ class FileManager:
             logger.error(f"Error processing {path}: {e}")
             return {"name": path.name, "path": str(path.relative_to(self.workspace_root)), "type": "error", "error": str(e)}
 
-    def read_file(self, path: str, encoding: str = 'utf-8') -> Dict:
+    def _line_index(self, full_path: Path, stat) -> LineIndex:
+        """Cached line index for the current version of a file"""
+        key = str(full_path)
+        with self._line_index_lock:
+            index = self._line_indexes.get(key)
+            if index is not None and index.is_current(stat):
+                self._line_indexes.move_to_end(key)
+                return index
+        index = LineIndex(full_path)
+        with self._line_index_lock:
+            self._line_indexes[key] = index
+            self._line_indexes.move_to_end(key)
+            while len(self._line_indexes) > LINE_INDEX_CACHE_SIZE:
+                self._line_indexes.popitem(last=False)
+        return index
+
+    def read_file(self, path: str, encoding: str = 'utf-8', start_line: Optional[int] = None,
+                  end_line: Optional[int] = None, offset: Optional[int] = None,
+                  length: Optional[int] = None) -> Dict:
+        """
+        Read a text file, whole or by range.
+
+        Without a range the whole file is returned, whatever its size, since
+        callers may save that content back over the file. Ranges are served
+        through a line index: by 1-based inclusive line range, or by byte
+        offset/length (multi-byte characters cut at the edges are replaced).
+        """
         try:
             full_path = self._validate_path(path)
             if not full_path.exists(): return {"error": "File not found"}
             if not full_path.is_file(): return {"error": "Path is not a file"}
             if self._is_binary_file(full_path): return {"error": "Cannot read binary file", "is_binary": True}
 
-            with open(full_path, 'r', encoding=encoding) as f:
-                content = f.read()
             stat = full_path.stat()
-            return {
-                "content": content,
+            result = {
                 "path": path,
                 "size": stat.st_size,
                 "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
                 "language": self._detect_language(full_path),
-                "encoding": encoding,
-                "lines": len(content.splitlines())
+                "encoding": encoding
             }
+
+            ranged = any(v is not None for v in (start_line, end_line, offset, length))
+            if not ranged:
+                with open(full_path, 'r', encoding=encoding) as f:
+                    content = f.read()
+                result.update({"content": content, "lines": len(content.splitlines())})
+                return result
+
+            index = self._line_index(full_path, stat)
+            result["lines"] = index.line_count
+            if offset is not None or length is not None:
+                offset = max(0, offset or 0)
+                data = index.read_bytes(offset, DEFAULT_CHUNK_BYTES if length is None else max(0, length))
+                end = offset + len(data)
+                result.update({
+                    "content": data.decode(encoding, errors='replace'),
+                    "offset": offset,
+                    "length": len(data),
+                    "start_line": index.line_at(offset),
+                    "truncated": offset > 0 or end < index.size
+                })
+            else:
+                start = max(1, start_line or 1)
+                end = end_line if end_line is not None else start + DEFAULT_PAGE_LINES - 1
+                end = min(end, index.line_count)
+                data = index.read_lines(start, end)
+                result.update({
+                    "content": data.decode(encoding, errors='replace'),
+                    "start_line": start,
+                    "end_line": end,
+                    "truncated": start > 1 or end < index.line_count
+                })
+            return result
         except Exception as e:
             logger.error(f"Error reading file {path}: {e}")
             return {"error": str(e)}
 
+    def stream_file(self, path: str, offset: int = 0, length: Optional[int] = None) -> Dict:
+        """Validate a file and return an iterator over its raw bytes (from offset, for length)"""
+        try:
+            full_path = self._validate_path(path)
+            if not full_path.exists(): return {"error": "File not found"}
+            if not full_path.is_file(): return {"error": "Path is not a file"}
+            size = full_path.stat().st_size
+            offset = min(max(0, offset), size)
+            length = size - offset if length is None else min(max(0, length), size - offset)
+            return {"path": path, "size": size, "offset": offset, "length": length,
+                    "iterator": self._iter_bytes(full_path, offset, length)}
+        except Exception as e:
+            logger.error(f"Error streaming file {path}: {e}")
+            return {"error": str(e)}
+
+    def _iter_bytes(self, full_path: Path, offset: int, length: int) -> Iterator[bytes]:
+        with open(full_path, 'rb') as f:
+            f.seek(offset)
+            while length > 0:
+                chunk = f.read(min(STREAM_CHUNK_BYTES, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
     def write_file(self, path: str, content: str, encoding: str = 'utf-8') -> Dict:
         try:
             full_path = self._validate_path(path)
             full_path.parent.mkdir(parents=True, exist_ok=True)
             if full_path.exists():
-                backup_path = full_path.with_suffix(full_path.suffix + '.bak')
-                shutil.copy2(full_path, backup_path)
-            with open(full_path, 'w', encoding=encoding) as f:
-                f.write(content)
+                self._replace_atomically(full_path, content, encoding)
+            else:
+                with open(full_path, 'w', encoding=encoding) as f:
+                    f.write(content)
+            self.tree_index.invalidate(self._relative(full_path))
             stat = full_path.stat()
             return {"success": True, "path": path, "size": stat.st_size, "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(), "lines": len(content.splitlines())}
         except Exception as e:
             logger.error(f"Error writing file {path}: {e}")
             return {"error": str(e)}
 
+    def _replace_atomically(self, full_path: Path, content: str, encoding: str):
+        """Write to a hidden temp file beside the target, then rename it over the target"""
+        fd, temp_path = tempfile.mkstemp(dir=full_path.parent, prefix=f".{full_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding=encoding) as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            shutil.copymode(full_path, temp_path)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
     def create_file(self, path: str, content: str = "") -> Dict:
         try:
             full_path = self._validate_path(path)
@@ -112,6 +235,7 @@ class FileManager:
         try:
             full_path = self._validate_path(path)
             full_path.mkdir(parents=True, exist_ok=True)
+            self.tree_index.invalidate(self._relative(full_path))
             return {"success": True, "path": path, "type": "directory"}
         except Exception as e:
             logger.error(f"Error creating directory {path}: {e}")
@@ -123,6 +247,7 @@ class FileManager:
             if not full_path.exists(): return {"error": "Path not found"}
             if full_path.is_file(): full_path.unlink()
             elif full_path.is_dir(): shutil.rmtree(full_path)
+            self.tree_index.invalidate(self._relative(full_path))
             return {"success": True, "path": path}
         except Exception as e:
             logger.error(f"Error deleting {path}: {e}")
@@ -136,6 +261,7 @@ class FileManager:
             if not old_full_path.exists(): return {"error": "Path not found"}
             if new_full_path.exists(): return {"error": "Target path already exists"}
             old_full_path.rename(new_full_path)
+            self.tree_index.invalidate(self._relative(old_full_path), self._relative(new_full_path))
             return {"success": True, "old_path": old_path, "new_path": str(new_full_path.relative_to(self.workspace_root))}
         except Exception as e:
             logger.error(f"Error renaming {old_path}: {e}")
@@ -1,13 +1,25 @@
 import os
+import re
+import time
+import asyncio
 import requests
-import subprocess
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 
+from .file_manager import file_manager
+from ..utils.process import process_runner
+
 logger = logging.getLogger(__name__)
 
+GIT_TIMEOUT = 30
+STATUS_MAX_AGE = 30.0        # Seconds a cached status is trusted while file events are watched
+STATUS_MAX_AGE_POLLING = 2.0  # Without file events, workspace edits are only noticed by expiry
+GIT_STATE_FILES = ("index", "HEAD", "FETCH_HEAD", "packed-refs")
+
+BRANCH_HEADER_RE = re.compile(r'^## (?:No commits yet on |Initial commit on )?(?P<branch>.+?)(?:\.\.\.(?P<upstream>\S+))?(?: \[(?P<track>[^\]]+)\])?$')
+
 @dataclass
 class GitStatus:
     branch: str
@@ -33,55 +45,123 @@ class GitHubClient:
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "AI-Assistant-IDE/1.0"
         }
+        # Status cache: work dir -> (git state fingerprint, workspace generation, time, result)
+        self._status_cache: Dict[str, Tuple[tuple, int, float, Dict]] = {}
+        self._status_inflight: Dict[str, asyncio.Future] = {}
+        self._workspace_generation = 0
+        file_manager.tree_index.add_listener(self._on_workspace_change)
 
-    def git_command(self, args: List[str], cwd: str = None) -> Dict:
+    async def git_command(self, args: List[str], cwd: str = None) -> Dict:
         try:
             work_dir = Path(cwd) if cwd else self.workspace_root
             if not str(work_dir.resolve()).startswith(str(self.workspace_root)):
                 return {"error": "Path outside workspace not allowed"}
-            result = subprocess.run(
-                ["git"] + args,
-                cwd=work_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            result = await process_runner.run(["git"] + args, cwd=work_dir, timeout=GIT_TIMEOUT)
             return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout.strip(),
-                "stderr": result.stderr.strip(),
-                "returncode": result.returncode
+                "success": result["returncode"] == 0,
+                "stdout": result["stdout"].strip(),
+                "stderr": result["stderr"].strip(),
+                "returncode": result["returncode"]
             }
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {"error": "Git command timed out"}
         except Exception as e:
             logger.error(f"Git command failed: {e}")
             return {"error": str(e)}
 
-    def get_git_status(self, repo_path: str = "") -> Dict:
+    def _on_workspace_change(self, paths: List[str]):
+        # Any file change may alter a status; the next request re-checks
+        self._workspace_generation += 1
+
+    def invalidate_status(self, work_dir: Path = None):
+        if work_dir is None:
+            self._status_cache.clear()
+        else:
+            self._status_cache.pop(str(work_dir), None)
+
+    @staticmethod
+    def _git_state(work_dir: Path) -> tuple:
+        """Fingerprint of the git metadata that commits, staging, checkouts and fetches touch"""
+        state = []
+        for name in GIT_STATE_FILES:
+            try:
+                state.append((work_dir / ".git" / name).stat().st_mtime_ns)
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
+    async def get_git_status(self, repo_path: str = "") -> Dict:
+        """
+        Git status, served from cache while nothing relevant has changed.
+
+        A cached status is reused until the repository's index, HEAD or refs
+        change, the file watcher reports a workspace change, or it expires.
+        Concurrent requests for the same repository share one git run.
+        """
+        work_dir = self.workspace_root / repo_path.lstrip('/')
+        key = str(work_dir)
+        state = self._git_state(work_dir)
+        max_age = STATUS_MAX_AGE if file_manager.tree_index.watching else STATUS_MAX_AGE_POLLING
+
+        cached = self._status_cache.get(key)
+        if cached:
+            cached_state, generation, checked_at, result = cached
+            if (cached_state, generation) == (state, self._workspace_generation) and time.monotonic() - checked_at < max_age:
+                return result
+
+        inflight = self._status_inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        generation = self._workspace_generation
+        future = asyncio.get_running_loop().create_future()
+        self._status_inflight[key] = future
+        try:
+            result = await self._read_git_status(work_dir)
+            if result.get("success"):
+                # Fingerprint taken before running git, so changes made meanwhile still invalidate
+                self._status_cache[key] = (state, generation, time.monotonic(), result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Consumed here; waiters re-raise it
+            raise
+        finally:
+            del self._status_inflight[key]
+
+    async def _read_git_status(self, work_dir: Path) -> Dict:
         try:
-            work_dir = self.workspace_root / repo_path.lstrip('/')
             if not (work_dir / ".git").exists():
                 return {"error": "Not a git repository"}
 
-            branch_result = self.git_command(["branch", "--show-current"], cwd=work_dir)
-            if not branch_result["success"]:
-                return {"error": "Failed to get current branch"}
-            branch = branch_result["stdout"] or "HEAD"
-
-            status_result = self.git_command(["status", "--porcelain"], cwd=work_dir)
-            if not status_result["success"]:
+            # One git run yields the branch, upstream tracking and file states
+            status_result = await self.git_command(["status", "--porcelain", "--branch"], cwd=work_dir)
+            if not status_result.get("success"):
                 return {"error": "Failed to get git status"}
 
+            lines = status_result["stdout"].splitlines()
+            branch, ahead, behind, upstream = "HEAD", 0, 0, None
+            if lines and lines[0].startswith("## "):
+                header = BRANCH_HEADER_RE.match(lines.pop(0))
+                if header:
+                    if not header.group("branch").startswith("HEAD (no branch)"):
+                        branch = header.group("branch")
+                    upstream = header.group("upstream")
+                    for part in (header.group("track") or "").split(", "):
+                        if part.startswith("ahead "): ahead = int(part[6:])
+                        elif part.startswith("behind "): behind = int(part[7:])
+
             staged, modified, untracked = [], [], []
-            for line in status_result["stdout"].splitlines():
+            for line in lines:
                 if len(line) < 3: continue
                 status_code, filename = line[:2], line[3:]
                 if status_code[0] in "MARC": staged.append(filename)
                 if status_code[1] in "M": modified.append(filename)
                 if status_code == "??": untracked.append(filename)
 
-            ahead, behind = self._get_ahead_behind(work_dir, branch)
+            if upstream is None and branch != "HEAD":
+                ahead, behind = await self._get_ahead_behind(work_dir, branch)
             return {
                 "success": True,
                 "status": {
@@ -98,7 +178,7 @@ class GitHubClient:
             logger.error(f"Error getting git status: {e}")
             return {"error": str(e)}
 
-    def clone_repository(self, repo_url: str, target_dir: str = None) -> Dict:
+    async def clone_repository(self, repo_url: str, target_dir: str = None) -> Dict:
         try:
             if not target_dir:
                 repo_name = repo_url.split("/")[-1].replace(".git", "")
@@ -106,7 +186,7 @@ class GitHubClient:
             target_path = self.workspace_root / target_dir
             if target_path.exists():
                 return {"error": f"Directory {target_dir} already exists"}
-            result = self.git_command(["clone", repo_url, target_dir])
+            result = await self.git_command(["clone", repo_url, target_dir])
             if result["success"]:
                 return {"success": True, "path": target_dir, "message": f"Repository cloned to {target_dir}"}
             return {"error": f"Clone failed: {result['stderr']}"}
@@ -114,7 +194,7 @@ class GitHubClient:
             logger.error(f"Error cloning repository: {e}")
             return {"error": str(e)}
 
-    def commit_changes(self, repo_path: str, message: str, files: List[str] = None) -> Dict:
+    async def commit_changes(self, repo_path: str, message: str, files: List[str] = None) -> Dict:
         try:
             work_dir = self.workspace_root / repo_path.lstrip('/')
             if not (work_dir / ".git").exists():
@@ -122,15 +202,16 @@ class GitHubClient:
 
             if files:
                 for file in files:
-                    result = self.git_command(["add", file], cwd=work_dir)
+                    result = await self.git_command(["add", file], cwd=work_dir)
                     if not result["success"]:
                         return {"error": f"Failed to stage {file}: {result['stderr']}"}
             else:
-                result = self.git_command(["add", "."], cwd=work_dir)
+                result = await self.git_command(["add", "."], cwd=work_dir)
                 if not result["success"]:
                     return {"error": f"Failed to stage changes: {result['stderr']}"}
 
-            result = self.git_command(["commit", "-m", message], cwd=work_dir)
+            result = await self.git_command(["commit", "-m", message], cwd=work_dir)
+            self.invalidate_status(work_dir)
             if result["success"]:
                 return {"success": True, "message": "Changes committed successfully"}
             return {"error": f"Commit failed: {result['stderr']}"}
@@ -138,10 +219,11 @@ class GitHubClient:
             logger.error(f"Error committing changes: {e}")
             return {"error": str(e)}
 
-    def push_changes(self, repo_path: str, branch: str = None) -> Dict:
+    async def push_changes(self, repo_path: str, branch: str = None) -> Dict:
         try:
             work_dir = self.workspace_root / repo_path.lstrip('/')
-            result = self.git_command(["push", "origin", branch] if branch else ["push"], cwd=work_dir)
+            result = await self.git_command(["push", "origin", branch] if branch else ["push"], cwd=work_dir)
+            self.invalidate_status(work_dir)
             if result["success"]:
                 return {"success": True, "message": "Changes pushed successfully"}
             return {"error": f"Push failed: {result['stderr']}"}
@@ -149,10 +231,11 @@ class GitHubClient:
             logger.error(f"Error pushing changes: {e}")
             return {"error": str(e)}
 
-    def pull_changes(self, repo_path: str) -> Dict:
+    async def pull_changes(self, repo_path: str) -> Dict:
         try:
             work_dir = self.workspace_root / repo_path.lstrip('/')
-            result = self.git_command(["pull"], cwd=work_dir)
+            result = await self.git_command(["pull"], cwd=work_dir)
+            self.invalidate_status(work_dir)
             if result["success"]:
                 return {"success": True, "message": "Changes pulled successfully", "output": result["stdout"]}
             return {"error": f"Pull failed: {result['stderr']}"}
@@ -160,10 +243,10 @@ class GitHubClient:
             logger.error(f"Error pulling changes: {e}")
             return {"error": str(e)}
 
-    def get_commit_history(self, repo_path: str, limit: int = 10) -> Dict:
+    async def get_commit_history(self, repo_path: str, limit: int = 10) -> Dict:
         try:
             work_dir = self.workspace_root / repo_path.lstrip('/')
-            result = self.git_command([
+            result = await self.git_command([
                 "log", f"--max-count={limit}", "--pretty=format:%H|%s|%an|%ad", "--date=iso"
             ], cwd=work_dir)
             if not result["success"]:
@@ -178,10 +261,11 @@ class GitHubClient:
             logger.error(f"Error getting commit history: {e}")
             return {"error": str(e)}
 
-    def create_branch(self, repo_path: str, branch_name: str) -> Dict:
+    async def create_branch(self, repo_path: str, branch_name: str) -> Dict:
         try:
             work_dir = self.workspace_root / repo_path.lstrip('/')
-            result = self.git_command(["checkout", "-b", branch_name], cwd=work_dir)
+            result = await self.git_command(["checkout", "-b", branch_name], cwd=work_dir)
+            self.invalidate_status(work_dir)
             if result["success"]:
                 return {"success": True, "branch": branch_name, "message": f"Created and switched to branch {branch_name}"}
             return {"error": f"Failed to create branch: {result['stderr']}"}
@@ -189,10 +273,11 @@ class GitHubClient:
             logger.error(f"Error creating branch: {e}")
             return {"error": str(e)}
 
-    def switch_branch(self, repo_path: str, branch_name: str) -> Dict:
+    async def switch_branch(self, repo_path: str, branch_name: str) -> Dict:
         try:
             work_dir = self.workspace_root / repo_path.lstrip('/')
-            result = self.git_command(["checkout", branch_name], cwd=work_dir)
+            result = await self.git_command(["checkout", branch_name], cwd=work_dir)
+            self.invalidate_status(work_dir)
             if result["success"]:
                 return {"success": True, "branch": branch_name, "message": f"Switched to branch {branch_name}"}
             return {"error": f"Failed to switch branch: {result['stderr']}"}
@@ -200,9 +285,9 @@ class GitHubClient:
             logger.error(f"Error switching branch: {e}")
             return {"error": str(e)}
 
-    def _get_ahead_behind(self, work_dir: Path, branch: str) -> tuple:
+    async def _get_ahead_behind(self, work_dir: Path, branch: str) -> tuple:
         try:
-            result = self.git_command(["rev-list", "--left-right", "--count", f"{branch}...origin/{branch}"], cwd=work_dir)
+            result = await self.git_command(["rev-list", "--left-right", "--count", f"{branch}...origin/{branch}"], cwd=work_dir)
             if result["success"] and result["stdout"]:
                 parts = result["stdout"].split()
                 if len(parts) == 2:
@@ -0,0 +1,94 @@
+"""
+Line Index - Random access to large text files
+Records the line number at a checkpoint every few KB of a file, so any line
+or byte range is served through mmap by touching only the pages it covers,
+however large the file is.
+"""
+
+import logging
+import mmap
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_BYTES = 64 * 1024  # Distance between recorded line starts
+
+
+class LineIndex:
+    """Sparse line-offset index for one version (size + mtime) of a file"""
+
+    def __init__(self, path: Path):
+        stat = path.stat()
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self._offsets = array('Q', [0])  # Byte offset of a line start...
+        self._lines = array('Q', [0])    # ...and its 0-based line number
+        self.line_count = 0
+        with self._map() as mm:
+            self._build(mm)
+
+    def is_current(self, stat) -> bool:
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    @contextmanager
+    def _map(self):
+        if self.size == 0:
+            yield b""  # Empty files cannot be mapped
+            return
+        with open(self.path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mm
+            finally:
+                mm.close()
+
+    def _build(self, mm):
+        pos = line = 0
+        while True:
+            nl = mm.find(b"\n", pos + CHECKPOINT_BYTES) if pos + CHECKPOINT_BYTES < self.size else -1
+            if nl == -1:
+                line += mm[pos:self.size].count(b"\n")
+                break
+            line += mm[pos:nl + 1].count(b"\n")
+            pos = nl + 1
+            self._offsets.append(pos)
+            self._lines.append(line)
+
+        # Same count as str.splitlines() for \n and \r\n files
+        ends_open = self.size > 0 and mm[self.size - 1:self.size] != b"\n"
+        self.line_count = line + (1 if ends_open else 0)
+
+    def _line_start(self, mm, line: int) -> int:
+        """Byte offset where 0-based `line` starts (file size past the end)"""
+        if line >= self.line_count:
+            return self.size
+        i = bisect_right(self._lines, line) - 1
+        pos, current = self._offsets[i], self._lines[i]
+        while current < line:
+            pos = mm.find(b"\n", pos) + 1
+            current += 1
+        return pos
+
+    def line_at(self, offset: int) -> int:
+        """1-based line number containing a byte offset"""
+        offset = min(max(offset, 0), self.size)
+        i = bisect_right(self._offsets, offset) - 1
+        with self._map() as mm:
+            return self._lines[i] + mm[self._offsets[i]:offset].count(b"\n") + 1
+
+    def read_lines(self, start_line: int, end_line: int) -> bytes:
+        """Raw bytes of lines start_line..end_line (1-based, inclusive)"""
+        if end_line < start_line:
+            return b""
+        with self._map() as mm:
+            begin = self._line_start(mm, start_line - 1)
+            stop = self._line_start(mm, end_line)
+            return mm[begin:stop]
+
+    def read_bytes(self, offset: int, length: int) -> bytes:
+        with self._map() as mm:
+            return mm[offset:offset + length]
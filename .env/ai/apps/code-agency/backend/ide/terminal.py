@@ -1,23 +1,64 @@
 import os
+import asyncio
+import codecs
 import logging
 import signal
-import select
 import termios
 import struct
 import fcntl
 import uuid
 import subprocess
-import threading
-import queue
 import pty
-from typing import Dict, Optional, Callable
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
 from pathlib import Path
 
+from ..utils.process import process_runner
+
 
 
 logger = logging.getLogger(__name__)
 
+READ_CHUNK = 64 * 1024          # Bytes read from the PTY per readiness event
+FRAME_INTERVAL = 0.02           # Seconds output may wait to be merged into a larger frame
+FRAME_MAX_CHARS = 32 * 1024     # Frames are sent early once they reach this size
+SCROLLBACK_CHARS = 256 * 1024   # Output kept for clients that attach later
+HIGH_WATER_FRAMES = 8           # Unsent frames per client before PTY reads pause
+LOW_WATER_FRAMES = 2            # Unsent frames per client before PTY reads resume
+
+
+class ScrollbackBuffer:
+    """Ring buffer of recent terminal output, trimmed from the oldest end"""
+
+    def __init__(self, max_chars: int = SCROLLBACK_CHARS):
+        self.max_chars = max_chars
+        self._chunks: Deque[str] = deque()
+        self._size = 0
+
+    def append(self, data: str):
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size > self.max_chars and len(self._chunks) > 1:
+            self._size -= len(self._chunks.popleft())
+        if self._size > self.max_chars:
+            self._chunks[0] = self._chunks[0][-self.max_chars:]
+            self._size = len(self._chunks[0])
+
+    def snapshot(self) -> str:
+        return "".join(self._chunks)
+
+
 class TerminalSession:
+    """
+    A shell on a PTY whose output is read on the event loop.
+
+    The PTY master is registered with `add_reader`, output is merged into
+    frames bounded by time and size, and every frame is kept in a scrollback
+    ring and queued for each attached client. When a client falls behind,
+    reading pauses so the kernel buffer fills and the program blocks, rather
+    than the backend buffering without limit.
+    """
+
     def __init__(self, session_id: str, cwd: str, shell: str = "/bin/bash"):
         self.session_id = session_id
         self.cwd = Path(cwd).resolve()
@@ -25,13 +66,20 @@ class TerminalSession:
         self.process = None
         self.master_fd = None
         self.slave_fd = None
-        self.output_queue = queue.Queue()
-        self.input_queue = queue.Queue()
         self.running = False
-        self.output_callback: Optional[Callable[[str], None]] = None
-        
+        self.scrollback = ScrollbackBuffer()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._reading = False
+        self._clients: List[asyncio.Queue] = []
+
     def start(self) -> bool:
+        """Spawn the shell; must be called from the event loop that will serve it"""
         try:
+            self._loop = asyncio.get_running_loop()
             self.master_fd, self.slave_fd = pty.openpty()
             self._set_winsize(24, 80)
             env = os.environ.copy()
@@ -55,10 +103,7 @@ class TerminalSession:
             fcntl.fcntl(self.master_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
 
             self.running = True
-
-            self.output_thread = threading.Thread(target=self._output_loop)
-            self.output_thread.daemon = True
-            self.output_thread.start()
+            self._resume_reading()
             logger.info(f"Terminal session {self.session_id} started")
             return True
         except Exception as e:
@@ -73,8 +118,29 @@ class TerminalSession:
             except Exception as e:
                 logger.error(f"Error writing to terminal: {e}")
 
-    def set_output_callback(self, callback: Callable[[str], None]):
-        self.output_callback = callback
+    def attach(self) -> Tuple[str, asyncio.Queue]:
+        """
+        Attach a client: returns the scrollback so far and a queue of new frames.
+
+        The queue yields output strings and finally None when the shell exits.
+        Call `frame_sent` after delivering each frame so paused output resumes.
+        """
+        frames: asyncio.Queue = asyncio.Queue()
+        if not self.running:
+            frames.put_nowait(None)
+        self._clients.append(frames)
+        return self.scrollback.snapshot(), frames
+
+    def detach(self, frames: asyncio.Queue):
+        if frames in self._clients:
+            self._clients.remove(frames)
+        self.frame_sent()
+
+    def frame_sent(self):
+        """Resume reading once every client has caught up"""
+        if self.running and not self._reading and all(q.qsize() <= LOW_WATER_FRAMES for q in self._clients):
+            self._flush()
+            self._resume_reading()
 
     def resize(self, rows: int, cols: int):
         if self.master_fd:
@@ -87,31 +153,71 @@ class TerminalSession:
         except Exception as e:
             logger.error(f"Error setting window size: {e}")
 
-    def _output_loop(self):
-        while self.running:
-            try:
-                if self.master_fd:
-                    ready, _, _ = select.select([self.master_fd], [], [], 0.1)
-                    if ready:
-                        data = os.read(self.master_fd, 4096)
-                        if data:
-                            output = data.decode('utf-8', errors='ignore')
-                            if self.output_callback:
-                                self.output_callback(output)
-                        else:
-                            break
-            except OSError:
-                break
-            except Exception as e:
-                logger.error(f"Error in output loop: {e}")
-                break
+    def _resume_reading(self):
+        if not self._reading and self.master_fd is not None:
+            self._loop.add_reader(self.master_fd, self._on_readable)
+            self._reading = True
+
+    def _pause_reading(self):
+        if self._reading and self.master_fd is not None:
+            self._loop.remove_reader(self.master_fd)
+        self._reading = False
+
+    def _backlogged(self) -> bool:
+        return any(q.qsize() >= HIGH_WATER_FRAMES for q in self._clients)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.master_fd, READ_CHUNK)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""  # EIO once the shell has exited
+
+        if not data:
+            self._on_exit()
+            return
+
+        text = self._decoder.decode(data)
+        if text:
+            self._pending.append(text)
+            self._pending_size += len(text)
+        if self._pending_size >= FRAME_MAX_CHARS:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(FRAME_INTERVAL, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending:
+            frame = "".join(self._pending)
+            self._pending.clear()
+            self._pending_size = 0
+            self.scrollback.append(frame)
+            for frames in self._clients:
+                frames.put_nowait(frame)
+        if self._backlogged():
+            self._pause_reading()
+
+    def _on_exit(self):
+        self._pause_reading()
+        self._pending.append(self._decoder.decode(b"", final=True))
+        self._flush()
         self.running = False
+        for frames in self._clients:
+            frames.put_nowait(None)
 
     def is_alive(self) -> bool:
         return self.process and self.process.poll() is None
 
     def cleanup(self):
         self.running = False
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pause_reading()
         if self.process:
             try:
                 os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
@@ -130,6 +236,9 @@ class TerminalSession:
             try: os.close(self.slave_fd)
             except: pass
             self.slave_fd = None
+        for frames in self._clients:
+            frames.put_nowait(None)
+        self._clients.clear()
         logger.info(f"Terminal session {self.session_id} cleaned up")
 
 
@@ -159,19 +268,36 @@ class TerminalManager:
     def get_session(self, session_id: str) -> Optional[TerminalSession]:
         return self.sessions.get(session_id)
 
-    def execute_command(self, command: str, cwd: str = "", timeout: int = 30) -> Dict:
+    def _work_dir(self, cwd: str) -> Path:
+        work_dir = self.workspace_root / cwd.lstrip('/') if cwd else self.workspace_root
+        return work_dir if work_dir.exists() else self.workspace_root
+
+    async def execute_command(self, command: str, cwd: str = "", timeout: int = 30) -> Dict:
         try:
-            work_dir = self.workspace_root / cwd.lstrip('/') if cwd else self.workspace_root
-            if not work_dir.exists():
-                work_dir = self.workspace_root
-            result = subprocess.run(command, shell=True, cwd=work_dir, capture_output=True, text=True, timeout=timeout)
-            return {"success": result.returncode == 0, "stdout": result.stdout, "stderr": result.stderr, "returncode": result.returncode, "command": command, "cwd": str(work_dir.relative_to(self.workspace_root))}
-        except subprocess.TimeoutExpired:
+            work_dir = self._work_dir(cwd)
+            result = await process_runner.run(command, cwd=work_dir, timeout=timeout)
+            return {"success": result["returncode"] == 0, "stdout": result["stdout"], "stderr": result["stderr"], "returncode": result["returncode"], "command": command, "cwd": str(work_dir.relative_to(self.workspace_root))}
+        except asyncio.TimeoutError:
             return {"error": f"Command timed out after {timeout} seconds", "command": command}
         except Exception as e:
             logger.error(f"Error executing command: {e}")
             return {"error": str(e), "command": command}
 
+    async def stream_command(self, command: str, cwd: str = "", timeout: int = 300) -> AsyncIterator[Dict]:
+        """Run a command, yielding output lines as they arrive and then its exit status"""
+        work_dir = self._work_dir(cwd)
+        try:
+            async for stream, data in process_runner.stream(command, cwd=work_dir, timeout=timeout):
+                if stream == "exit":
+                    yield {"type": "exit", "returncode": data, "success": data == 0}
+                else:
+                    yield {"type": stream, "data": data}
+        except asyncio.TimeoutError:
+            yield {"type": "error", "error": f"Command timed out after {timeout} seconds"}
+        except Exception as e:
+            logger.error(f"Error streaming command: {e}")
+            yield {"type": "error", "error": str(e)}
+
     def send_input(self, session_id: str, data: str) -> Dict:
         session = self.sessions.get(session_id)
         if not session: return {"error": "Session not found"}
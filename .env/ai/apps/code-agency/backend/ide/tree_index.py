@@ -0,0 +1,434 @@
+"""
+Tree Index - In-memory workspace file tree
+Directories are scanned once, on first access, and then kept current from
+filesystem events (watchdog when installed, polling otherwise). Tree requests
+are served from memory, with per-subtree versions for ETags and change deltas
+pushed to live subscribers.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional - fall back to polling
+    Observer = None
+    FileSystemEventHandler = object
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0          # Seconds between rescans of loaded directories without watchdog
+EVENT_DEBOUNCE = 0.1         # Seconds to gather a burst of watchdog events into one delta
+SUBSCRIBER_QUEUE_SIZE = 256  # Pending delta frames per subscriber before it must resync
+
+
+@dataclass
+class TreeNode:
+    name: str
+    path: str        # Relative to the workspace root with "/" separators, "." for the root
+    is_dir: bool
+    size: int
+    mtime: float
+    mtime_ns: int
+    version: int = 0
+    children: Optional[Dict[str, "TreeNode"]] = None  # None until the directory is scanned
+    info: Optional[Dict[str, Any]] = None             # Serialized fields, built on first use
+    file_info: Optional[Dict[str, Any]] = None        # Language and binary sniff, filled in outside the lock
+    order: Optional[List["TreeNode"]] = None          # Children in display order, built on first use
+
+
+def _parent(rel: str) -> str:
+    return rel.rsplit("/", 1)[0] if "/" in rel else "."
+
+
+class _WatchHandler(FileSystemEventHandler):
+    """Forward watchdog events to the index"""
+
+    def __init__(self, index: "TreeIndex"):
+        self.index = index
+
+    def on_any_event(self, event):
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path:
+                self.index._mark(os.fsdecode(path), event.is_directory)
+
+
+class TreeIndex:
+    """
+    Lazily expanded, watched file tree for one workspace root.
+
+    Only directories that have been requested are held in memory and watched
+    for changes; everything else is scanned the first time it is needed.
+    Hidden entries are skipped, matching the tree served by FileManager.
+    """
+
+    def __init__(self, root: Path, detect_language: Callable[[Path], str],
+                 is_binary: Callable[[Path], bool]):
+        self.root = root
+        self._detect_language = detect_language
+        self._is_binary = is_binary
+        self._lock = threading.RLock()
+        self._root_node: Optional[TreeNode] = None
+        self._version = 0
+        self._epoch = format(time.time_ns(), "x")  # Keeps ETags from colliding across restarts
+        self._pending: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._observer = None
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    # Lookup and serialization
+
+    def get_tree(self, rel: str, max_depth: int, max_children: Optional[int] = None) -> Optional[Dict]:
+        """Serialize the subtree at rel, or None if it is hidden or missing"""
+        self.start()
+        pending = []
+        with self._lock:
+            node = self._lookup(rel)
+            if node is None:
+                return None
+            tree = self._serialize(node, 0, max_depth, max_children, pending)
+        self._complete(pending)
+        return tree
+
+    def etag(self, rel: str, max_depth: int) -> Optional[str]:
+        """ETag for a subtree request; changes whenever anything below rel changes"""
+        with self._lock:
+            node = self._lookup(rel)
+            if node is None:
+                return None
+            return f'W/"{self._epoch}-{node.version}-{max_depth}"'
+
+    def _abs(self, rel: str) -> Path:
+        return self.root if rel == "." else self.root / rel
+
+    def _root(self) -> TreeNode:
+        if self._root_node is None:
+            stat = self.root.stat()
+            self._root_node = TreeNode(self.root.name, ".", True, stat.st_size, stat.st_mtime, stat.st_mtime_ns)
+        return self._root_node
+
+    def _lookup(self, rel: str) -> Optional[TreeNode]:
+        """Find a node, scanning directories along the way as needed"""
+        node = self._root()
+        for part in rel.split("/"):
+            if part in ("", "."):
+                continue
+            self._ensure_loaded(node)
+            node = node.children.get(part) if node.children is not None else None
+            if node is None:
+                return None
+        return node
+
+    def _find_loaded(self, rel: str) -> Optional[TreeNode]:
+        """Find a node without scanning anything new"""
+        node = self._root_node
+        for part in rel.split("/"):
+            if node is None:
+                return None
+            if part in ("", "."):
+                continue
+            node = node.children.get(part) if node.children is not None else None
+        return node
+
+    def _ensure_loaded(self, node: TreeNode):
+        if node.is_dir and node.children is None:
+            try:
+                node.children = self._scan(node)
+            except OSError as e:
+                logger.debug(f"Could not scan {node.path}: {e}")
+                node.children = {}
+
+    def _scan(self, node: TreeNode) -> Dict[str, TreeNode]:
+        children = {}
+        with os.scandir(self._abs(node.path)) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    stat = entry.stat()
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue  # Removed mid-scan or dangling symlink
+                rel = entry.name if node.path == "." else f"{node.path}/{entry.name}"
+                children[entry.name] = TreeNode(entry.name, rel, is_dir, stat.st_size,
+                                                stat.st_mtime, stat.st_mtime_ns, self._version)
+        return children
+
+    def _info(self, node: TreeNode) -> Dict[str, Any]:
+        if node.info is None:
+            info = {
+                "name": node.name,
+                "path": node.path,
+                "type": "directory" if node.is_dir else "file",
+                "size": node.size,
+                "modified": datetime.fromtimestamp(node.mtime).isoformat()
+            }
+            if not node.is_dir:
+                info["extension"] = Path(node.name).suffix
+            node.info = info
+        return node.info
+
+    def _complete(self, pending: List[tuple]):
+        """
+        Add language and binary fields to serialized files. Runs without the
+        lock, since the binary check reads from disk; results are kept on the
+        node unless the file changed in the meantime.
+        """
+        for data, node in pending:
+            mtime_ns = node.mtime_ns
+            full_path = self._abs(node.path)
+            file_info = {
+                "language": self._detect_language(full_path),
+                "is_binary": self._is_binary(full_path)
+            }
+            if node.mtime_ns == mtime_ns:
+                node.file_info = file_info
+            data.update(file_info)
+
+    def _serialize(self, node: TreeNode, depth: int, max_depth: int, max_children: Optional[int],
+                   pending: List[tuple]) -> Dict:
+        data = dict(self._info(node))
+        if not node.is_dir:
+            if node.file_info is not None:
+                data.update(node.file_info)
+            else:
+                pending.append((data, node))
+        data["children"] = []
+
+        if node.is_dir and depth < max_depth:
+            self._ensure_loaded(node)
+            if node.order is None:
+                node.order = sorted(node.children.values(), key=lambda c: (not c.is_dir, c.name.lower()))
+            children = node.order
+            if max_children is not None and len(children) > max_children:
+                children = children[:max_children]
+                data["truncated"] = True
+            data["children"] = [self._serialize(c, depth + 1, max_depth, max_children, pending) for c in children]
+        return data
+
+    # Change tracking
+
+    def _refresh(self, rel: str, pending: List[tuple]) -> List[Dict[str, Any]]:
+        """Rescan one loaded directory and return what changed in it"""
+        node = self._find_loaded(rel)
+        if node is None or node.children is None:
+            return []
+        try:
+            fresh = self._scan(node)
+        except OSError:
+            fresh = {}  # Directory is gone; its parent's refresh drops it
+
+        old = node.children
+        changes = []
+        for name, child in old.items():
+            if name not in fresh or fresh[name].is_dir != child.is_dir:
+                changes.append({"op": "remove", "path": child.path})
+
+        changed_nodes = []
+        for name, child in fresh.items():
+            prev = old.get(name)
+            if prev is None or prev.is_dir != child.is_dir:
+                changed_nodes.append(("add", child))
+                continue
+            if (prev.size, prev.mtime_ns) != (child.size, child.mtime_ns):
+                prev.size, prev.mtime, prev.mtime_ns = child.size, child.mtime, child.mtime_ns
+                prev.info = None
+                prev.file_info = None
+                changed_nodes.append(("change", prev))
+            fresh[name] = prev  # Keep already loaded subtrees
+
+        node.children = fresh
+        node.order = None
+        if not changes and not changed_nodes:
+            return []
+
+        self._version += 1
+        for op, child in changed_nodes:
+            child.version = self._version
+            changes.append({"op": op, "path": child.path, "node": self._serialize(child, 0, 0, None, pending)})
+        self._bump(rel)
+        return changes
+
+    def _bump(self, rel: str):
+        """Stamp a node and all its ancestors with the current version"""
+        node = self._root_node
+        node.version = self._version
+        for part in rel.split("/"):
+            if part in ("", "."):
+                continue
+            node = node.children.get(part)
+            node.version = self._version
+
+    def _loaded_dirs(self) -> List[str]:
+        loaded = []
+        stack = [self._root_node] if self._root_node else []
+        while stack:
+            node = stack.pop()
+            if node.children is not None:
+                loaded.append(node.path)
+                stack.extend(c for c in node.children.values() if c.is_dir)
+        return loaded
+
+    def _mark(self, path: str, is_dir: bool):
+        """Queue the directories affected by an event on an absolute path"""
+        try:
+            rel = Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        if any(part.startswith('.') for part in rel.split("/") if part != "."):
+            return
+        with self._lock:
+            if rel != ".":
+                self._pending.add(_parent(rel))
+            if is_dir:
+                self._pending.add(rel)
+        self._wake.set()
+        self._notify([rel])
+
+    def flush(self):
+        """Apply queued directory refreshes and notify subscribers"""
+        incomplete = []
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            # Parents first, so directories that vanished are dropped before their own refresh
+            changes = [c for rel in sorted(pending, key=lambda p: (p.count("/"), p))
+                       for c in self._refresh(rel, incomplete)]
+            version = self._version
+        self._complete(incomplete)
+        if changes:
+            self._publish(changes, version)
+
+    def invalidate(self, *paths: str):
+        """Re-sync the directories holding paths immediately (used after our own writes)"""
+        self._notify(list(paths))
+        incomplete = []
+        with self._lock:
+            if self._root_node is None:
+                return
+            changes = []
+            for rel in paths:
+                # Refresh the nearest directory we actually hold, so new parents appear too
+                target = _parent(rel) if rel not in ("", ".") else "."
+                while target != "." and self._find_loaded(target) is None:
+                    target = _parent(target)
+                changes.extend(self._refresh(target, incomplete))
+            version = self._version
+        self._complete(incomplete)
+        if changes:
+            self._publish(changes, version)
+
+    # Watching
+
+    @property
+    def watching(self) -> bool:
+        """Whether every change is reported by file events (otherwise only loaded directories are polled)"""
+        return self._observer is not None
+
+    def add_listener(self, callback: Callable[[List[str]], None]):
+        """Call back with the relative paths of every reported change, loaded or not"""
+        self._listeners.append(callback)
+
+    def _notify(self, paths: List[str]):
+        for callback in self._listeners:
+            try:
+                callback(paths)
+            except Exception as e:
+                logger.error(f"File change listener failed: {e}")
+
+    def start(self):
+        """Start watching (no-op if already running)"""
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        if Observer is not None and self._observer is None:
+            try:
+                observer = Observer()
+                observer.schedule(_WatchHandler(self), str(self.root), recursive=True)
+                observer.start()
+                self._observer = observer
+            except Exception as e:
+                logger.warning(f"File watching unavailable, polling instead: {e}")
+        self._worker = threading.Thread(target=self._run, name="tree-index", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._observer is not None:
+                self._wake.wait()
+                self._wake.clear()
+                self._stop.wait(EVENT_DEBOUNCE)
+            else:
+                if self._stop.wait(POLL_INTERVAL):
+                    break
+                with self._lock:
+                    self._pending.update(self._loaded_dirs())
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error refreshing file tree: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._worker is not None:
+            self._worker.join(timeout=2)
+            self._worker = None
+
+    # Subscribers
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving tree_delta frames on the calling event loop"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        self.start()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def _publish(self, changes: List[Dict[str, Any]], version: int):
+        message = {"type": "tree_delta", "version": version, "changes": changes}
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:  # Event loop closed
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, message: Dict[str, Any]):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Subscriber fell behind; replace the backlog with a request to refetch
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync", "version": message["version"]})
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": "watchdog" if self._observer is not None else "polling",
+                "running": bool(self._worker and self._worker.is_alive()),
+                "version": self._version,
+                "loaded_directories": len(self._loaded_dirs()),
+                "subscribers": len(self._subscribers)
+            }
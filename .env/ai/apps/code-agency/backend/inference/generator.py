@@ -1,9 +1,7 @@
 import logging
 from typing import Generator, Any, Callable
 
-import torch
-
-from .model_manager import model_manager
+from .model_manager import model_manager, torch
 from .sampler import SamplingConfig
 
 logger = logging.getLogger(__name__)
@@ -5,12 +5,15 @@ import requests.exceptions
 import shutil
 import json
 
-import torch
 from threading import Lock
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from llama_cpp import Llama
 
 from ..app.config import settings
+from ..utils.lazy import LazyModule
+
+# Imported on first model load rather than at startup
+torch = LazyModule("torch")
+transformers = LazyModule("transformers")
+llama_cpp = LazyModule("llama_cpp")
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +21,18 @@ class ModelManager:
     def __init__(self):
         self.model = None
         self.tokenizer = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._device = None
         self.model_name = None
         self.loaded_model_path = None
         self.lock = Lock()
 
+    @property
+    def device(self) -> str:
+        # Resolved on first use, since asking CUDA means importing torch
+        if self._device is None:
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        return self._device
+
     def download_model(self, model_json_path: str, progress_callback=None) -> Path:
         try:
             meta_file = Path(model_json_path)
@@ -83,7 +93,7 @@ class ModelManager:
                 return False
 
     def load_gguf_model(self, model_path: Path):
-        self.model = Llama(
+        self.model = llama_cpp.Llama(
             model_path=str(model_path),
             n_ctx=4096,
             n_threads=8,
@@ -91,8 +101,8 @@ class ModelManager:
         self.tokenizer = None 
 
     def load_huggingface_model(self, model_path: Path):
-        self.tokenizer = AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
-        self.model = AutoModelForCausalLM.from_pretrained(
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
+        self.model = transformers.AutoModelForCausalLM.from_pretrained(
             model_path,
             torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
             device_map="auto" if self.device == "cuda" else None,
@@ -113,7 +123,8 @@ class ModelManager:
             self.tokenizer = None
         self.model_name = None
         self.loaded_model_path = None
-        torch.cuda.empty_cache()
+        if torch.loaded and torch.cuda.is_available():
+            torch.cuda.empty_cache()
         logger.info("Model unloaded")
 
     def is_loaded(self) -> bool:
@@ -3,37 +3,51 @@ from typing import List, Dict
 from pathlib import Path
 
 import hashlib
+import time
 import numpy as np
-import faiss
 import pickle
 
-from sentence_transformers import SentenceTransformer
-
 from ..app.config import settings
+from ..utils.lazy import LazyModule
+
+# Imported when the embedding model is initialized rather than at startup
+faiss = LazyModule("faiss")
+sentence_transformers = LazyModule("sentence_transformers")
 
 logger = logging.getLogger(__name__)
 
 class EmbeddingManager:
     def __init__(self, similarity_threshold: float = 0.7):
         self.similarity_threshold = similarity_threshold
-        self.model: SentenceTransformer | None = None
-        self.index: faiss.Index | None = None
+        self.model = None  # SentenceTransformer once initialized
+        self.index = None  # faiss.Index once initialized
         self.id_to_metadata: Dict[int, Dict] = {}
         self.embedding_dim: int = settings.embedding_dim
         self.index_path = Path("data/embeddings/faiss_index.bin")
         self.metadata_path = Path("data/embeddings/metadata.pkl")
+        self.state = "idle"  # idle, loading, ready, failed
+        self.error: str | None = None
+        self.load_seconds: float | None = None
         
     def initialize(self) -> bool:
         """Initialize embedding model and FAISS index"""
+        self.state = "loading"
+        started = time.perf_counter()
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.model = sentence_transformers.SentenceTransformer('all-MiniLM-L6-v2')
             self.embedding_dim = self.model.get_sentence_embedding_dimension()
             self._load_or_create_index()
+            self.state = "ready"
+            self.error = None
             logger.info(f"Embedding manager initialized with dim={self.embedding_dim}")
             return True
         except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
             logger.error(f"Failed to initialize embeddings: {e}")
             return False
+        finally:
+            self.load_seconds = round(time.perf_counter() - started, 2)
     
     def _load_or_create_index(self):
         """Load existing FAISS index or create a new one"""
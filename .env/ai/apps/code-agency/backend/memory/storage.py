@@ -1,9 +1,12 @@
+import asyncio
+import threading
 import uuid
 import logging
+from collections import OrderedDict
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
-from sqlalchemy import select, desc, and_
+from sqlalchemy import select, desc, and_, insert, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .database import db_manager
@@ -12,6 +15,28 @@ from .embeddings import embedding_manager
 
 logger = logging.getLogger(__name__)
 
+WRITE_BATCH_SIZE = 200         # Most messages in one multi-row INSERT
+WRITE_FLUSH_DELAY = 0.02       # Seconds a message may wait for others to share its INSERT
+CONVERSATION_CACHE_SIZE = 128  # Conversations whose full message list is kept in memory
+MAX_CACHED_MESSAGES = 500      # Longer conversations are always read from the database
+
+
+def _estimate_tokens(content: str) -> int:
+    # Rough token count estimation
+    return int(len(content.split()) * 1.3)
+
+
+def _message_dict(msg: Dict) -> Dict:
+    return {
+        'id': str(msg['id']),
+        'role': msg['role'],
+        'content': msg['content'],
+        'timestamp': msg['timestamp'].isoformat(),
+        'token_count': msg['token_count'],
+        'model_name': msg['model_name'],
+        'generation_time': msg['generation_time']
+    }
+
 
 class InMemoryStorage:
     """Fallback in-memory storage when database is unavailable"""
@@ -47,42 +72,31 @@ class InMemoryStorage:
             'conversation_id': conversation_id,
             'role': role,
             'content': content,
-            'token_count': int(len(content.split()) * 1.3),
+            'token_count': _estimate_tokens(content),
             'model_name': model_name,
             'generation_time': generation_time,
             'temperature': temperature,
             'timestamp': datetime.utcnow()
         }
+        self.add_message(message)
 
-        if conversation_id not in self.messages:
-            self.messages[conversation_id] = []
+        logger.debug(f"Saved in-memory message {msg_id}")
+        return msg_id
 
-        self.messages[conversation_id].append(message)
+    def add_message(self, message: Dict):
+        """Append a prepared message row and update its conversation's counters"""
+        conversation_id = str(message['conversation_id'])
+        self.messages.setdefault(conversation_id, []).append(message)
 
-        # Update conversation stats
         if conversation_id in self.conversations:
-            total_tokens = sum(msg['token_count'] for msg in self.messages[conversation_id])
-            self.conversations[conversation_id]['context_length'] = total_tokens
-            self.conversations[conversation_id]['updated_at'] = datetime.utcnow()
-
-        logger.debug(f"Saved in-memory message {msg_id}")
-        return msg_id
+            conversation = self.conversations[conversation_id]
+            conversation['context_length'] += message['token_count'] or 0
+            conversation['updated_at'] = datetime.utcnow()
 
     async def get_conversation_messages(self, conversation_id: str, limit: int = 50) -> List[Dict]:
         """Get messages from memory"""
         messages = self.messages.get(conversation_id, [])
-        return [
-            {
-                'id': msg['id'],
-                'role': msg['role'],
-                'content': msg['content'],
-                'timestamp': msg['timestamp'].isoformat(),
-                'token_count': msg['token_count'],
-                'model_name': msg['model_name'],
-                'generation_time': msg['generation_time']
-            }
-            for msg in messages[-limit:]
-        ]
+        return [_message_dict(msg) for msg in messages[-limit:]]
 
     async def get_user_conversations(self, user_id: str, limit: int = 20) -> List[Dict]:
         """Get user's conversations from memory"""
@@ -105,10 +119,45 @@ class InMemoryStorage:
 
 
 class ConversationStorage:
+    """
+    Conversation persistence with write-behind message inserts.
+
+    save_message returns as soon as the message is buffered; a background
+    flush writes everything buffered by concurrent requests as one multi-row
+    INSERT plus one counter UPDATE per conversation. Recently used
+    conversations keep their message list in memory, so reads see buffered
+    writes without waiting for them.
+    """
+
     def __init__(self):
         self.current_session: Optional[AsyncSession] = None
         self.fallback = InMemoryStorage()
         self.use_database = True  # Try database first, fall back to memory if needed
+        self._buffer: List[Dict] = []       # Message rows not yet written
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._cache: "OrderedDict[str, List[Dict]]" = OrderedDict()  # Conversation id -> all its messages
+        self._embedding_tasks: set = set()
+        self._embedding_lock = threading.Lock()  # FAISS index updates are not thread-safe
+        self._writes = 0  # Messages saved so far; a read overlapping a save is not cached
+
+    def _cache_get(self, conversation_id: str) -> Optional[List[Dict]]:
+        messages = self._cache.get(conversation_id)
+        if messages is not None:
+            self._cache.move_to_end(conversation_id)
+        return messages
+
+    def _cache_put(self, conversation_id: str, messages: List[Dict]):
+        if len(messages) > MAX_CACHED_MESSAGES:
+            self._cache.pop(conversation_id, None)
+            return
+        self._cache[conversation_id] = messages
+        self._cache.move_to_end(conversation_id)
+        while len(self._cache) > CONVERSATION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _pending_for(self, conversation_id: str) -> bool:
+        return any(str(row['conversation_id']) == conversation_id for row in self._buffer)
 
     async def create_conversation(self, user_id: str, title: str = None, agent_type: str = "chat") -> str:
         """Create a new conversation"""
@@ -133,6 +182,7 @@ class ConversationStorage:
 
             logger.info(f"Created conversation {conversation.id} for user {user_id}")
             await session.close()
+            self._cache_put(str(conversation.id), [])
             return str(conversation.id)
 
         except Exception as e:
@@ -144,47 +194,94 @@ class ConversationStorage:
     async def save_message(self, conversation_id: str, role: str, content: str,
                             model_name: str = None, generation_time: float = None,
                             temperature: float = None) -> str:
-        """Save a message to the conversation"""
+        """Save a message to the conversation (written in the next batch)"""
         # Use in-memory if database is unavailable
         if not self.use_database:
             return await self.fallback.save_message(conversation_id, role, content, model_name, generation_time, temperature)
 
+        message = {
+            'id': uuid.uuid4(),
+            'conversation_id': uuid.UUID(conversation_id),
+            'role': role,
+            'content': content,
+            'token_count': _estimate_tokens(content),
+            'model_name': model_name,
+            'generation_time': generation_time,
+            'temperature': temperature,
+            'timestamp': datetime.utcnow()
+        }
+        self._buffer.append(message)
+        self._writes += 1
+
+        cached = self._cache_get(conversation_id)
+        if cached is not None:
+            cached.append(message)
+            if len(cached) > MAX_CACHED_MESSAGES:
+                self._cache.pop(conversation_id, None)
+
+        self._schedule_flush()
+        self._schedule_embedding(str(message['id']), content, conversation_id, role)
+
+        logger.debug(f"Buffered message {message['id']} for conversation {conversation_id}")
+        return str(message['id'])
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_soon())
+
+    async def _flush_soon(self):
+        while self._buffer:
+            if len(self._buffer) < WRITE_BATCH_SIZE:
+                await asyncio.sleep(WRITE_FLUSH_DELAY)
+            await self.flush()
+
+    async def flush(self):
+        """Write buffered messages now"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:WRITE_BATCH_SIZE]
+                try:
+                    await self._write_batch(batch)
+                except Exception as e:
+                    logger.warning(f"Database unavailable, using in-memory storage: {e}")
+                    self.use_database = False
+                    pending, self._buffer = self._buffer, []
+                    for message in pending:
+                        self.fallback.add_message(message)
+                    return
+                del self._buffer[:len(batch)]
+
+    async def _write_batch(self, batch: List[Dict]):
+        tokens: Dict[uuid.UUID, int] = {}
+        for message in batch:
+            tokens[message['conversation_id']] = tokens.get(message['conversation_id'], 0) + message['token_count']
+
+        session = await db_manager.get_postgres_session()
         try:
-            session = await db_manager.get_postgres_session()
-
-            # Rough token count estimation
-            token_count = int(len(content.split()) * 1.3)
-
-            message = Message(
-                id=uuid.uuid4(),
-                conversation_id=uuid.UUID(conversation_id),
-                role=role,
-                content=content,
-                token_count=token_count,
-                model_name=model_name,
-                generation_time=generation_time,
-                temperature=temperature,
-                timestamp=datetime.utcnow()
-            )
-
-            session.add(message)
+            await session.execute(insert(Message).values(batch))
+            now = datetime.utcnow()
+            for conversation_id, count in tokens.items():
+                await session.execute(
+                    update(Conversation).where(Conversation.id == conversation_id)
+                    .values(context_length=func.coalesce(Conversation.context_length, 0) + count,
+                            updated_at=now)
+                )
             await session.commit()
-            await session.refresh(message)
-
-            # Update conversation context length
-            await self._update_conversation_stats(session, conversation_id)
-
-            # Generate embeddings for the message asynchronously
-            await self._generate_message_embedding(str(message.id), content, conversation_id, role)
-
-            logger.debug(f"Saved message {message.id} to conversation {conversation_id}")
+            logger.debug(f"Wrote {len(batch)} messages for {len(tokens)} conversations")
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
             await session.close()
-            return str(message.id)
 
-        except Exception as e:
-            logger.warning(f"Database unavailable, using in-memory storage: {e}")
-            self.use_database = False
-            return await self.fallback.save_message(conversation_id, role, content, model_name, generation_time, temperature)
+    async def close(self):
+        """Write anything still buffered and wait for pending embeddings"""
+        await self.flush()
+        if self._embedding_tasks:
+            await asyncio.gather(*self._embedding_tasks, return_exceptions=True)
     
     async def get_conversation_messages(self, conversation_id: str, limit: int = 50) -> List[Dict]:
         """Get messages from a conversation"""
@@ -192,30 +289,46 @@ class ConversationStorage:
         if not self.use_database:
             return await self.fallback.get_conversation_messages(conversation_id, limit)
 
+        cached = self._cache_get(conversation_id)
+        if cached is not None:
+            return [_message_dict(msg) for msg in cached[:limit]]
+
+        # Not cached: make sure buffered messages are in the database first
+        if self._pending_for(conversation_id):
+            await self.flush()
+            if not self.use_database:
+                return await self.fallback.get_conversation_messages(conversation_id, limit)
+
         try:
+            writes = self._writes
             session = await db_manager.get_postgres_session()
 
+            # One row past the limit tells whether this is the whole conversation
             stmt = select(Message).where(
                 Message.conversation_id == uuid.UUID(conversation_id)
-            ).order_by(Message.timestamp).limit(limit)
+            ).order_by(Message.timestamp).limit(limit + 1)
 
             result = await session.execute(stmt)
-            messages = result.scalars().all()
-
-            await session.close()
-            return [
+            messages = [
                 {
-                    'id': str(msg.id),
+                    'id': msg.id,
+                    'conversation_id': msg.conversation_id,
                     'role': msg.role,
                     'content': msg.content,
-                    'timestamp': msg.timestamp.isoformat(),
+                    'timestamp': msg.timestamp,
                     'token_count': msg.token_count,
                     'model_name': msg.model_name,
-                    'generation_time': msg.generation_time
+                    'generation_time': msg.generation_time,
+                    'temperature': msg.temperature
                 }
-                for msg in messages
+                for msg in result.scalars().all()
             ]
 
+            await session.close()
+            if len(messages) <= limit and writes == self._writes:
+                self._cache_put(conversation_id, messages)
+            return [_message_dict(msg) for msg in messages[:limit]]
+
         except Exception as e:
             logger.warning(f"Database unavailable, using in-memory storage: {e}")
             self.use_database = False
@@ -227,6 +340,12 @@ class ConversationStorage:
         if not self.use_database:
             return await self.fallback.get_user_conversations(user_id, limit)
 
+        # Counters of buffered messages are applied when they are written
+        if self._buffer:
+            await self.flush()
+            if not self.use_database:
+                return await self.fallback.get_user_conversations(user_id, limit)
+
         try:
             session = await db_manager.get_postgres_session()
 
@@ -278,46 +397,29 @@ class ConversationStorage:
         
         return results[:limit]
     
-    async def _update_conversation_stats(self, session: AsyncSession, conversation_id: str):
-        """Update conversation statistics"""
-        try:
-            # Count total tokens in conversation
-            stmt = select(Message).where(Message.conversation_id == uuid.UUID(conversation_id))
-            result = await session.execute(stmt)
-            messages = result.scalars().all()
-            
-            total_tokens = sum(msg.token_count or 0 for msg in messages)
-            
-            # Update conversation
-            conv_stmt = select(Conversation).where(Conversation.id == uuid.UUID(conversation_id))
-            conv_result = await session.execute(conv_stmt)
-            conversation = conv_result.scalar_one()
-            
-            conversation.context_length = total_tokens
-            conversation.updated_at = datetime.utcnow()
-            
-            await session.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to update conversation stats: {e}")
+    def _schedule_embedding(self, message_id: str, content: str, conversation_id: str, role: str):
+        if embedding_manager.model is None:
+            return  # Not warmed up (or disabled); nothing to index with
+        task = asyncio.ensure_future(asyncio.to_thread(
+            self._generate_message_embedding, message_id, content, conversation_id, role
+        ))
+        self._embedding_tasks.add(task)
+        task.add_done_callback(self._embedding_tasks.discard)
     
-    async def _generate_message_embedding(self, message_id: str, content: str, 
-                                        conversation_id: str, role: str):
-        """Generate and store embedding for a message"""
+    def _generate_message_embedding(self, message_id: str, content: str, 
+                                  conversation_id: str, role: str):
+        """Generate and store embedding for a message (runs in a worker thread)"""
         try:
-            # Generate embedding
-            embeddings = embedding_manager.encode_text([content])
+            # Store embedding with metadata
+            metadata = [{
+                'message_id': message_id,
+                'conversation_id': conversation_id,
+                'role': role,
+                'timestamp': datetime.utcnow().isoformat(),
+                'token_count': _estimate_tokens(content)
+            }]
             
-            if len(embeddings) > 0:
-                # Store embedding with metadata
-                metadata = [{
-                    'message_id': message_id,
-                    'conversation_id': conversation_id,
-                    'role': role,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'token_count': int(len(content.split()) * 1.3)
-                }]
-                
+            with self._embedding_lock:
                 embedding_manager.add_embeddings([content], metadata)
                 
         except Exception as e:
@@ -1,6 +1,10 @@
 from .helpers import truncate_string,clean_string,extract_code_blocks,count_tokens_rough,sanitize_filename,generate_id,hash_string,hash_dict,now_iso,parse_iso_time,time_ago,ensure_directory,get_file_size_human,is_text_file,deep_merge,flatten_dict,chunk_list,async_timer,sync_timer,validate_email,validate_url,validate_path_safe,SafeDict,safe_json_loads,safe_int,safe_float,ProgressTracker,load_config,save_config
 from .logger import ColoredFormatter,JSONFormatter,LoggerManager,setup_logging,get_logger,temporary_log_level,log_performance
 from .migrations import MigrationRunner
+from .streaming import iterate_in_thread,coalesce
+from .process import ProcessRunner
+from .logtail import tail_lines,LogFollower,follow_log
+from .lazy import LazyModule,import_timings
 
 __all__ = [
     'truncate_string',
@@ -40,4 +44,12 @@ __all__ = [
     'temporary_log_level',
     'log_performance',
     'MigrationRunner',
+    'iterate_in_thread',
+    'coalesce',
+    'ProcessRunner',
+    'tail_lines',
+    'LogFollower',
+    'follow_log',
+    'LazyModule',
+    'import_timings',
 ]
@@ -0,0 +1,46 @@
+import importlib
+import logging
+import sys
+import time
+from types import ModuleType
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+import_timings: Dict[str, float] = {}  # Module name -> seconds its deferred import took
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is imported on first attribute access.
+
+    `torch = LazyModule("torch")` at module level keeps `torch.cuda...` call
+    sites unchanged while moving the import cost from startup to first use.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    @property
+    def loaded(self) -> bool:
+        """True once the module is imported (by this proxy or anyone else)"""
+        return self._module is not None or self._name in sys.modules
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(self._name)
+            elapsed = time.perf_counter() - started
+            if self._name not in import_timings:
+                import_timings[self._name] = elapsed
+                logger.info(f"Imported {self._name} in {elapsed:.2f}s")
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+import re
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TAIL_BLOCK_SIZE = 64 * 1024     # Bytes read per backwards seek
+FOLLOW_READ_SIZE = 256 * 1024   # Most bytes read per follow poll
+FOLLOW_POLL_INTERVAL = 0.5      # Seconds between checks of an idle log
+MAX_PARTIAL_LINE = 64 * 1024    # Longer unterminated lines are emitted as-is
+
+
+def _decode(line: bytes, encoding: str) -> str:
+    return line.rstrip(b"\r").decode(encoding, errors='replace')
+
+
+def tail_lines(path: Path, lines: int, encoding: str = 'utf-8') -> List[str]:
+    """
+    Last `lines` lines of a file, without line terminators.
+
+    Reads backwards from the end in blocks, so the cost depends on the size
+    of the lines returned rather than the size of the file.
+    """
+    if lines <= 0:
+        return []
+
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        blocks: List[bytes] = []
+        newlines = 0
+        # One newline more than requested guarantees the first line is whole
+        # (a trailing newline ends the last line rather than starting one)
+        while pos > 0 and newlines <= lines:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+
+    data = b"".join(reversed(blocks))
+    parts = data.split(b"\n")
+    if parts and parts[-1] == b"":
+        parts.pop()
+    return [_decode(line, encoding) for line in parts[-lines:]]
+
+
+class LogFollower:
+    """
+    Incrementally read lines appended to a log file.
+
+    Survives rotation: when the path is replaced by a new file (different
+    inode) or truncated, the rest of the old file is drained and reading
+    restarts at the beginning of the new one.
+    """
+
+    def __init__(self, path: Path, pattern: Optional[re.Pattern] = None,
+                 encoding: str = 'utf-8', from_end: bool = True):
+        self.path = path
+        self.pattern = pattern
+        self.encoding = encoding
+        self._file = None
+        self._inode: Optional[int] = None
+        self._partial = b""
+        self._from_end = from_end
+
+    def _open(self, from_end: bool) -> bool:
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        self._file = f
+        self._inode = os.fstat(f.fileno()).st_ino
+        self._partial = b""
+        if from_end:
+            f.seek(0, os.SEEK_END)
+        return True
+
+    def _read(self) -> Tuple[List[bytes], bool]:
+        """Complete lines read from the current file, and whether more is pending"""
+        data = self._file.read(FOLLOW_READ_SIZE)
+        more = len(data) == FOLLOW_READ_SIZE
+        parts = (self._partial + data).split(b"\n")
+        self._partial = parts.pop()
+        if len(self._partial) > MAX_PARTIAL_LINE:
+            parts.append(self._partial)
+            self._partial = b""
+        return parts, more
+
+    def _rotated(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False  # Keep draining the old file until a new one appears
+        return stat.st_ino != self._inode or stat.st_size < self._file.tell()
+
+    def poll(self) -> Dict:
+        """
+        Read what was appended since the last poll.
+
+        Returns {"lines": [...], "rotated": bool, "more": bool}; `more` means
+        the read was capped and the caller should poll again right away.
+        """
+        rotated = False
+        if self._file is None:
+            opened = self._open(self._from_end)
+            self._from_end = False  # A file appearing later is read from its start
+            if not opened:
+                return {"lines": [], "rotated": False, "more": False}
+
+        raw, more = self._read()
+        if not more and self._rotated():
+            if self._partial:
+                raw.append(self._partial)
+            self.close()
+            rotated = self._open(from_end=False)
+            if rotated:
+                lines, more = self._read()
+                raw.extend(lines)
+
+        lines = [_decode(line, self.encoding) for line in raw]
+        if self.pattern is not None:
+            lines = [line for line in lines if self.pattern.search(line)]
+        return {"lines": lines, "rotated": rotated, "more": more}
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+async def follow_log(path: Path, pattern: Optional[re.Pattern] = None,
+                     poll_interval: float = FOLLOW_POLL_INTERVAL) -> AsyncIterator[Dict]:
+    """
+    Yield batches of new log lines as {"lines": [...], "rotated": bool}.
+
+    Reads happen in a worker thread; an idle log is re-checked every
+    poll_interval seconds. Closing the iterator releases the file.
+    """
+    follower = LogFollower(path, pattern)
+    try:
+        while True:
+            batch = await asyncio.to_thread(follower.poll)
+            if batch["lines"] or batch["rotated"]:
+                yield {"lines": batch["lines"], "rotated": batch["rotated"]}
+            if not batch["more"]:
+                await asyncio.sleep(poll_interval)
+    finally:
+        follower.close()
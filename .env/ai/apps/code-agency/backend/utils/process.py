@@ -0,0 +1,132 @@
+import asyncio
+import codecs
+import logging
+import os
+import signal
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_PROCESSES = 4
+STREAM_READ_SIZE = 8192
+
+
+class ProcessRunner:
+    """
+    Run subprocesses without blocking the event loop.
+
+    At most `max_concurrency` processes run at once; further calls wait for
+    a slot. A timeout or cancellation kills the process's whole process
+    group before the exception propagates, so nothing is left behind.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_PROCESSES):
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.running = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it belongs to the serving event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _spawn(self, command: Union[str, List[str]], cwd=None, env=None) -> asyncio.subprocess.Process:
+        kwargs = dict(cwd=cwd, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                      stdin=asyncio.subprocess.DEVNULL, start_new_session=True)
+        if isinstance(command, str):
+            return await asyncio.create_subprocess_shell(command, **kwargs)
+        return await asyncio.create_subprocess_exec(*command, **kwargs)
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        except Exception as e:
+            logger.error(f"Error killing process {process.pid}: {e}")
+        await process.wait()
+
+    async def run(self, command: Union[str, List[str]], cwd=None, timeout: Optional[float] = None,
+                  env: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Run a command to completion and capture its output.
+
+        A string runs through the shell, a list is executed directly.
+        Raises asyncio.TimeoutError if it does not finish within timeout.
+        """
+        async with self.semaphore:
+            process = await self._spawn(command, cwd, env)
+            self.running += 1
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except BaseException:
+                await self._kill(process)
+                raise
+            finally:
+                self.running -= 1
+
+        return {
+            "returncode": process.returncode,
+            "stdout": stdout.decode('utf-8', errors='replace'),
+            "stderr": stderr.decode('utf-8', errors='replace')
+        }
+
+    async def stream(self, command: Union[str, List[str]], cwd=None, timeout: Optional[float] = None,
+                     env: Optional[Dict[str, str]] = None) -> AsyncIterator[Tuple[str, Union[str, int]]]:
+        """
+        Run a command, yielding ("stdout" | "stderr", text) as output
+        arrives and finally ("exit", returncode).
+
+        Closing the iterator early kills the process.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        async with self.semaphore:
+            process = await self._spawn(command, cwd, env)
+            self.running += 1
+            chunks: asyncio.Queue = asyncio.Queue()
+
+            async def pump(name: str, reader: asyncio.StreamReader):
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                try:
+                    while True:
+                        data = await reader.read(STREAM_READ_SIZE)
+                        text = decoder.decode(data, final=not data)
+                        if text:
+                            await chunks.put((name, text))
+                        if not data:
+                            break
+                finally:
+                    await chunks.put((name, None))
+
+            pumps = [asyncio.ensure_future(pump("stdout", process.stdout)),
+                     asyncio.ensure_future(pump("stderr", process.stderr))]
+            try:
+                open_streams = 2
+                while open_streams:
+                    remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                    name, text = await asyncio.wait_for(chunks.get(), remaining)
+                    if text is None:
+                        open_streams -= 1
+                    else:
+                        yield name, text
+                remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                yield "exit", await asyncio.wait_for(process.wait(), remaining)
+            finally:
+                for task in pumps:
+                    task.cancel()
+                await self._kill(process)
+                self.running -= 1
+
+    def get_status(self) -> Dict:
+        return {"running": self.running, "max_concurrency": self.max_concurrency}
+
+
+# Global runner shared by the IDE API
+process_runner = ProcessRunner()
@@ -0,0 +1,123 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterator[Any]], maxsize: int = 256) -> AsyncIterator[Any]:
+    """
+    Run a blocking iterator in a worker thread and consume it asynchronously.
+
+    Items flow through a bounded asyncio.Queue, so a slow consumer pauses the
+    producer thread instead of buffering without limit. Closing the async
+    iterator (or cancelling its consumer) stops the producer at the next item.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        try:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        except RuntimeError:  # Event loop already closed
+            return False
+        while not stop.is_set():
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                continue
+            except Exception:
+                return False
+        future.cancel()
+        return False
+
+    def produce():
+        iterator = None
+        try:
+            iterator = make_iterator()
+            for item in iterator:
+                if stop.is_set() or not put(item):
+                    break
+        except Exception as e:
+            put(e)
+        finally:
+            if iterator is not None and hasattr(iterator, "close"):
+                iterator.close()
+            put(_END)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # The producer notices at its next item and exits on its own; an
+        # in-progress blocking call is not waited for
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
+
+
+async def coalesce(chunks: AsyncIterator[str], interval: float = 0.05, max_chars: int = 1024) -> AsyncIterator[str]:
+    """
+    Merge small text chunks into larger ones.
+
+    A merged chunk is emitted once `interval` seconds have passed since its
+    first piece arrived or once it holds `max_chars` characters, whichever
+    comes first, and whatever remains is flushed when the source ends.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    buffer = []
+    size = 0
+    deadline: Optional[float] = None
+    pending = asyncio.ensure_future(iterator.__anext__())
+
+    try:
+        while True:
+            timeout = None if not buffer else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if not done:
+                # Time bound reached with data waiting
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+
+            try:
+                chunk = pending.result()
+            except StopAsyncIteration:
+                break
+
+            if not buffer:
+                deadline = loop.time() + interval
+            buffer.append(chunk)
+            size += len(chunk)
+
+            if size >= max_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+
+            pending = asyncio.ensure_future(iterator.__anext__())
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
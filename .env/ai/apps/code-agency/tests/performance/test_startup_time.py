@@ -0,0 +1,48 @@
+"""
+Startup benchmark: import cost of the backend, per module.
+
+Runs `python -X importtime` in a fresh interpreter so nothing is cached,
+prints the most expensive imports, and checks that ML libraries are only
+imported on first use. Run with `pytest -s tests/performance` to see the table.
+"""
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ENTRY_MODULE = "backend.app.main"
+DEFERRED_MODULES = ["torch", "transformers", "llama_cpp", "sentence_transformers", "faiss"]
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure_imports(module: str):
+    """Return {module: (self_us, cumulative_us)} for everything `module` imports"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        pytest.skip(f"{module} is not importable here: {proc.stderr.strip().splitlines()[-1]}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def test_startup_import_cost():
+    timings = measure_imports(ENTRY_MODULE)
+    total_ms = timings[ENTRY_MODULE][1] / 1000
+
+    print(f"\nimport {ENTRY_MODULE}: {total_ms:.0f} ms")
+    top_level = {name: t for name, t in timings.items() if "." not in name or name.startswith("backend.")}
+    for name, (_, cumulative) in sorted(top_level.items(), key=lambda kv: -kv[1][1])[:20]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = [name for name in DEFERRED_MODULES if name in timings]
+    assert not loaded, f"imported at startup instead of on first use: {loaded}"
@@ -0,0 +1,103 @@
+import json
+import time
+import httpx
+import pytest
+from backend.agents.base import AgentContext, AgentType
+from backend.agents.coordinator_agent import CoordinatorAgent, OFFLINE_MESSAGE
+from backend.agents.health_monitor import CircuitState, HealthMonitor
+
+def make_agent(monkeypatch, handler, reset_timeout: float = 60) -> CoordinatorAgent:
+    agent = CoordinatorAgent("http://coordinator.test")
+    agent.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    agent.health = HealthMonitor("http://coordinator.test", failure_threshold=1, reset_timeout=reset_timeout)
+    monkeypatch.setattr(agent.health, "start", lambda: None)  # No background probes
+    return agent
+
+def make_context(message: str = "list files") -> AgentContext:
+    return AgentContext(
+        conversation_id="c1",
+        user_id="u1",
+        message=message,
+        conversation_history="",
+        agent_type=AgentType.COORDINATOR
+    )
+
+def ndjson(*events) -> bytes:
+    return "".join(json.dumps(event) + "\n" for event in events).encode()
+
+class TestCoordinatorStream:
+    """Test streaming coordinator replies and the /command fallback"""
+
+    @pytest.mark.asyncio
+    async def test_streams_events_in_order(self, monkeypatch):
+        def handler(request):
+            assert request.url.path == "/command/stream"
+            return httpx.Response(200, content=ndjson(
+                {"type": "token", "content": "Hel"},
+                {"type": "token", "content": "lo"},
+                {"type": "agent_result", "agent": "web", "content": "found"},
+                {"type": "done", "actions_taken": []},
+                {"type": "token", "content": "ignored"}
+            ))
+
+        agent = make_agent(monkeypatch, handler)
+        chunks = [chunk async for chunk in agent.stream_message(make_context())]
+        assert chunks == ["Hel", "lo", "found\n\n"]
+        assert agent.health.breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_error_event_ends_stream(self, monkeypatch):
+        def handler(request):
+            return httpx.Response(200, content=ndjson({"type": "error", "error": "no agents"}))
+
+        agent = make_agent(monkeypatch, handler)
+        chunks = [chunk async for chunk in agent.stream_message(make_context())]
+        assert chunks == ["⚠️ Error: no agents"]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_command(self, monkeypatch):
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            if request.url.path == "/command/stream":
+                return httpx.Response(404)
+            return httpx.Response(200, json={
+                "success": True,
+                "result": {"results": [{"response": "full reply"}]}
+            })
+
+        agent = make_agent(monkeypatch, handler)
+        chunks = [chunk async for chunk in agent.stream_message(make_context())]
+        assert chunks == ["full reply"]
+        assert paths == ["/command/stream", "/command"]
+
+    @pytest.mark.asyncio
+    async def test_fallback_after_half_open_trial(self, monkeypatch):
+        """The trial taken by the stream attempt does not block the fallback request"""
+        def handler(request):
+            if request.url.path == "/command/stream":
+                return httpx.Response(405)
+            return httpx.Response(200, json={
+                "success": True,
+                "result": {"results": [{"response": "recovered"}]}
+            })
+
+        agent = make_agent(monkeypatch, handler, reset_timeout=0.01)
+        agent.health.record_failure()
+        time.sleep(0.02)
+        assert agent.health.breaker.state == CircuitState.HALF_OPEN
+
+        chunks = [chunk async for chunk in agent.stream_message(make_context())]
+        assert chunks == ["recovered"]
+        assert agent.health.breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, monkeypatch):
+        def handler(request):
+            raise AssertionError("no request expected while the circuit is open")
+
+        agent = make_agent(monkeypatch, handler)
+        agent.health.record_failure()
+        chunks = [chunk async for chunk in agent.stream_message(make_context())]
+        assert chunks == [OFFLINE_MESSAGE]
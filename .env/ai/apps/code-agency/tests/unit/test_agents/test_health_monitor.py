@@ -0,0 +1,38 @@
+import time
+from backend.agents.health_monitor import CircuitBreaker, CircuitState
+
+class TestCircuitBreaker:
+    """Test the coordinator/gateway circuit breaker"""
+
+    def test_opens_after_threshold(self):
+        """Consecutive failures open the circuit and reject requests"""
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+    def test_half_open_allows_single_trial(self):
+        """After the reset timeout exactly one trial request is let through"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+    def test_trial_outcome_closes_or_reopens(self):
+        """A successful trial closes the circuit, a failed one reopens it"""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+        time.sleep(0.02)
+        breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request()
@@ -0,0 +1,62 @@
+from backend.agents.intent import KeywordAutomaton, IntentClassifier, IntentRules
+
+class TestKeywordAutomaton:
+    """Test the Aho-Corasick keyword matcher"""
+
+    def test_finds_overlapping_keywords(self):
+        """All keywords are found, including ones nested inside others"""
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+        assert automaton.search("ushers") == {"he", "she", "hers"}
+
+    def test_substring_semantics_match_in_operator(self):
+        """Results match a plain `kw in text` scan"""
+        keywords = ["if", "def", "class", "git", "api", "step by step"]
+        text = "different classes in a digital rapid step by step guide"
+        automaton = KeywordAutomaton(keywords)
+        assert automaton.search(text) == {k for k in keywords if k in text}
+
+
+class TestIntentClassifier:
+    """Test the single-pass routing classifier"""
+
+    def test_keyword_classes_are_namespaced_per_agent(self):
+        """Agents sharing a keyword get independent counts"""
+        classifier = IntentClassifier()
+        classifier.register("a", IntentRules(keywords={"tech": ["code", "bug"]}))
+        classifier.register("b", IntentRules(keywords={"words": ["code"]}))
+
+        match = classifier.match("Fix the CODE bug")
+        assert match.count("a", "tech") == 2
+        assert match.count("b", "words") == 1
+        assert not match.has("b", "missing")
+
+    def test_patterns_do_not_consume_each_other(self):
+        """Every regex rule is reported even when matches overlap"""
+        classifier = IntentClassifier()
+        classifier.register("code", IntentRules(patterns={
+            "terms": r'\b(code|function)\b',
+            "build": r'\b(write|create)\b.*\b(function|class)\b',
+        }))
+
+        match = classifier.match("write a function")
+        assert match.matched("code", "terms")
+        assert match.matched("code", "build")
+        assert match.pattern_count("code") == 2
+
+    def test_repeated_messages_hit_cache(self):
+        """Identical messages are served from the LRU cache"""
+        classifier = IntentClassifier()
+        classifier.register("a", IntentRules(keywords={"k": ["plan"]}))
+
+        classifier.match("make a plan")
+        classifier.match("Make a PLAN")
+        assert classifier.cache_info().hits == 1
+
+    def test_register_invalidates_compiled_matchers(self):
+        """Newly registered rules take effect on the next match"""
+        classifier = IntentClassifier()
+        classifier.register("a", IntentRules(keywords={"k": ["plan"]}))
+        assert not classifier.match("deploy").has("b", "k")
+
+        classifier.register("b", IntentRules(keywords={"k": ["deploy"]}))
+        assert classifier.match("deploy").has("b", "k")
@@ -0,0 +1,155 @@
+import importlib
+import json
+import sys
+import pytest
+
+@pytest.fixture(scope="module")
+def worker(tmp_path_factory):
+    """Import the worker with its shared workspace under a temporary home"""
+    home = tmp_path_factory.mktemp("home")
+    (home / "shared" / "ai-workspace" / "logs").mkdir(parents=True)
+    (home / "shared" / "ai-workspace" / "chats").mkdir()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("HOME", str(home))
+        for name in ("backend.agents.worker", "backend.agents.client"):
+            sys.modules.pop(name, None)
+        module = importlib.import_module("backend.agents.worker")
+        importlib.import_module("backend.agents.client")
+    return module
+
+class FakeResponse:
+    def __init__(self, chunks, status_code=200, fail_after=None):
+        self.chunks = chunks
+        self.status_code = status_code
+        self.fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self):
+        for i, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                raise TimeoutError("read timed out")
+            yield json.dumps(chunk).encode()
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+def make_agent(worker, response):
+    agent = worker.Agent.__new__(worker.Agent)
+    agent.agent_id = "coder"
+    agent.agent_config = {"host": "ollama.test", "model": "test"}
+    agent.session = FakeSession(response)
+    agent.errors = []
+    agent.log_error = agent.errors.append
+    return agent
+
+def tokens(*parts, done=True):
+    chunks = [{"response": part} for part in parts]
+    if done:
+        chunks.append({"response": "", "done": True})
+    return chunks
+
+def read_tail(worker, channel):
+    client_module = sys.modules["backend.agents.client"]
+    client = client_module.ChatClient.__new__(client_module.ChatClient)
+    return client.read_channel_tail(channel)
+
+class TestFenceSafeCut:
+    """Test where streamed partials may be cut"""
+
+    def test_cuts_after_last_whole_line(self, worker):
+        assert worker.fence_safe_cut("one\ntwo\nthr", 0) == len("one\ntwo\n")
+        assert worker.fence_safe_cut("no newline yet", 0) == 0
+
+    def test_starts_from_offset(self, worker):
+        text = "one\ntwo\nthree\n"
+        assert worker.fence_safe_cut(text, 4) == len(text)
+        assert worker.fence_safe_cut(text, len(text)) == len(text)
+
+    def test_never_cuts_inside_fence(self, worker):
+        text = "intro\n```python\nx = 1\ny = 2\n"
+        assert worker.fence_safe_cut(text, 0) == len("intro\n")
+        closed = text + "```\nafter"
+        assert worker.fence_safe_cut(closed, 0) == len(text + "```\n")
+
+    def test_inline_backticks_are_not_fences(self, worker):
+        text = "use `x` here\nand ```inline``` there\n"
+        assert worker.fence_safe_cut(text, 0) == len(text)
+
+class TestCallOllamaStreaming:
+    """Test coalescing partials and terminating failed streams"""
+
+    @pytest.fixture(autouse=True)
+    def flush_by_size(self, worker, monkeypatch):
+        monkeypatch.setattr(worker, "STREAM_FLUSH_CHARS", 10)
+        monkeypatch.setattr(worker, "STREAM_FLUSH_INTERVAL", 3600)
+
+    def capture(self, agent):
+        writes = []
+        agent.write_to_channel = lambda channel, message, status="": writes.append((channel, message, status))
+        return writes
+
+    def test_coalesces_tokens_into_line_partials(self, worker):
+        agent = make_agent(worker, FakeResponse(tokens("first ", "line\n", "sec", "ond line\n", "tail")))
+        writes = self.capture(agent)
+
+        text = agent.call_ollama("hi", channel="general", stream_id="abc")
+        assert text == "first line\nsecond line\ntail"
+        assert writes == [
+            ("general", "first line", "SENDING abc"),
+            ("general", "second line", "SENDING abc"),
+        ]
+
+    def test_no_partials_without_channel(self, worker):
+        agent = make_agent(worker, FakeResponse(tokens("a long first line\n", "more\n")))
+        writes = self.capture(agent)
+        assert agent.call_ollama("hi") == "a long first line\nmore\n"
+        assert writes == []
+
+    def test_partials_hold_back_open_fences(self, worker):
+        agent = make_agent(worker, FakeResponse(tokens("code:\n", "```py\n", "x = 1 + 2\n", "```\n")))
+        writes = self.capture(agent)
+        agent.call_ollama("hi", channel="general", stream_id="abc")
+        sent = "\n".join(message for _, message, _ in writes)
+        assert "code:" in sent
+        assert sent.count("```") % 2 == 0
+
+    def test_error_chunk_after_partials_writes_final(self, worker):
+        chunks = tokens("partial answer\n", done=False) + [{"error": "model unloaded"}]
+        agent = make_agent(worker, FakeResponse(chunks))
+        writes = self.capture(agent)
+
+        assert agent.call_ollama("hi", channel="general", stream_id="abc") == ""
+        assert writes[0] == ("general", "partial answer", "SENDING abc")
+        assert writes[-1][2] == "FINAL abc"
+
+    def test_read_failure_after_partials_writes_final(self, worker):
+        agent = make_agent(worker, FakeResponse(tokens("partial answer\n", "more"), fail_after=1))
+        writes = self.capture(agent)
+
+        assert agent.call_ollama("hi", channel="general", stream_id="abc") == ""
+        assert [status for _, _, status in writes] == ["SENDING abc", "FINAL abc"]
+
+    def test_failure_before_partials_writes_nothing(self, worker):
+        agent = make_agent(worker, FakeResponse([{"error": "no such model"}]))
+        writes = self.capture(agent)
+        assert agent.call_ollama("hi", channel="general", stream_id="abc") == ""
+        assert writes == []
+
+    def test_failed_stream_partials_are_hidden_from_readers(self, worker):
+        """The interruption notice supersedes the partials in the channel"""
+        agent = make_agent(worker, FakeResponse(tokens("half an answer\n", "more"), fail_after=1))
+        agent.call_ollama("hi", channel="interrupted", stream_id="abc")
+
+        messages = read_tail(worker, "interrupted")
+        assert len(messages) == 1
+        assert "[FINAL abc]" in messages[0]
+        assert "half an answer" not in messages[0]
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from backend.app.auth import dependencies
+from backend.app.auth.rate_limiter import TokenBucketLimiter, create_rate_limiter
+
+
+class TestTokenBucketLimiter:
+    """Test in-process token buckets"""
+
+    def test_enforces_capacity(self):
+        limiter = TokenBucketLimiter()
+        results = [limiter.allow("ip_1", 100, 60)[0] for _ in range(101)]
+        assert results.count(True) == 100
+        allowed, retry_after = limiter.allow("ip_1", 100, 60)
+        assert not allowed
+        assert 0 < retry_after <= 0.6
+
+    def test_keys_are_independent(self):
+        limiter = TokenBucketLimiter()
+        for _ in range(3):
+            limiter.allow("user_a", 3, 60)
+        assert not limiter.allow("user_a", 3, 60)[0]
+        assert limiter.allow("user_b", 3, 60)[0]
+
+    def test_refills_over_time(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("backend.app.auth.rate_limiter.time.monotonic", lambda: clock[0])
+        limiter = TokenBucketLimiter()
+        for _ in range(10):
+            limiter.allow("k", 10, 10)
+        assert not limiter.allow("k", 10, 10)[0]
+        clock[0] += 1.0
+        assert limiter.allow("k", 10, 10)[0]
+        assert not limiter.allow("k", 10, 10)[0]
+
+    def test_bucket_count_is_bounded(self):
+        limiter = TokenBucketLimiter(max_buckets=10)
+        for i in range(50):
+            limiter.allow(f"ip_{i}", 100, 60)
+        assert len(limiter._buckets) == 10
+
+    @pytest.mark.asyncio
+    async def test_default_is_local(self):
+        limiter = create_rate_limiter(None)
+        assert isinstance(limiter, TokenBucketLimiter)
+        assert await limiter.acquire("k", 1, 60) == (True, 0.0)
+
+
+class TestRateLimitedRoutes:
+    """Test the limiter is enforced on the API routers"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from backend.app.main import app
+        monkeypatch.setattr(dependencies, "ANONYMOUS_RATE_LIMIT", 3)
+        monkeypatch.setattr(dependencies, "rate_limiter", TokenBucketLimiter())
+        return TestClient(app)
+
+    def test_request_over_limit_gets_429(self, client):
+        for _ in range(3):
+            assert client.get("/api/models").status_code == 200
+        response = client.get("/api/models")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert response.json()["detail"]["error"] == "rate_limited"
+
+    def test_limit_is_shared_across_api_routers(self, client):
+        for _ in range(3):
+            client.get("/api/models")
+        assert client.get("/api/ollama/models").status_code == 429
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from backend.app.auth.session_cache import CachedSession, SessionCache
+
+
+def make_entry(user_id="u1"):
+    return CachedSession(user=SimpleNamespace(id=user_id), session_id="s1",
+                         expires_at=datetime.utcnow() + timedelta(days=1))
+
+
+class TestSessionCache:
+    """Test the token -> user cache"""
+
+    def test_hit_and_miss(self):
+        cache = SessionCache()
+        assert cache.get("t") is None
+        entry = make_entry()
+        cache.put("t", entry)
+        assert cache.get("t") is entry
+        assert cache.get_status()["hits"] == 1
+        assert cache.get_status()["misses"] == 1
+
+    def test_ttl_expiry(self):
+        cache = SessionCache(ttl=0.05)
+        cache.put("t", make_entry())
+        time.sleep(0.1)
+        assert cache.get("t") is None
+        assert cache.get_status()["size"] == 0
+
+    def test_lru_eviction(self):
+        cache = SessionCache(maxsize=2)
+        cache.put("a", make_entry())
+        cache.put("b", make_entry())
+        cache.get("a")
+        cache.put("c", make_entry())
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_invalidation(self):
+        cache = SessionCache()
+        cache.put("a", make_entry("u1"))
+        cache.put("b", make_entry("u1"))
+        cache.put("c", make_entry("u2"))
+        cache.invalidate("c")
+        assert cache.get("c") is None
+        assert cache.invalidate_user("u1") == 2
+        assert cache.get_status()["size"] == 0
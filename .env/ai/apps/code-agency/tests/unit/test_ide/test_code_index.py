@@ -0,0 +1,83 @@
+import pytest
+from backend.ide.file_manager import FileManager
+from backend.ide.code_index import CodeIndex, extract_symbols
+
+PY_SOURCE = '''
+class RateLimiter:
+    def allow(self, key):
+        return True
+
+async def fetch_leads(source):
+    return []
+'''
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "limits.py").write_text(PY_SOURCE)
+    (tmp_path / "app" / "client.ts").write_text("export function sendInvoice(id: string) {\n  return id;\n}\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("function sendInvoice() {}\n")
+    manager = FileManager(str(tmp_path))
+    code_index = CodeIndex(manager)
+    code_index.build()
+    yield code_index
+    manager.tree_index.stop()
+
+class TestSymbolExtraction:
+    """Test per-language symbol parsing"""
+
+    def test_python_symbols_use_ast(self):
+        """Classes, methods and functions are found with their spans"""
+        symbols = {(s.name, s.kind, s.container) for s in extract_symbols("a.py", "python", PY_SOURCE)}
+        assert symbols == {
+            ("RateLimiter", "class", None),
+            ("allow", "method", "RateLimiter"),
+            ("fetch_leads", "function", None),
+        }
+
+    def test_other_languages_use_patterns(self):
+        """Declarations are recognised by pattern for languages without a parser"""
+        source = "pub struct Lead {}\npub async fn score_lead() {}\n"
+        assert [(s.name, s.kind, s.line) for s in extract_symbols("a.rs", "rust", source)] == [
+            ("Lead", "struct", 1), ("score_lead", "function", 2)
+        ]
+
+
+class TestCodeIndex:
+    """Test workspace search and retrieval"""
+
+    def test_search_finds_lines_case_insensitively(self, index):
+        """Literal search narrows by trigrams and reports line positions"""
+        result = index.search("ratelimiter")
+        assert result["results"] == [
+            {"path": "app/limits.py", "line": 2, "column": 7, "text": "class RateLimiter:"}
+        ]
+        assert result["files_searched"] == 1
+
+    def test_ignored_directories_are_not_indexed(self, index):
+        """Dependency folders stay out of results"""
+        paths = {r["path"] for r in index.search("sendInvoice")["results"]}
+        assert paths == {"app/client.ts"}
+
+    def test_invalid_regex_is_reported(self, index):
+        assert "error" in index.search("(", regex=True)
+
+    def test_writes_are_reindexed(self, index):
+        """Changes reported by the file tree update the index"""
+        index.file_manager.write_file("app/limits.py", "def throttle():\n    pass\n")
+        index.flush()
+        assert index.search("RateLimiter")["results"] == []
+        assert [s["name"] for s in index.find_symbols("throttle")] == ["throttle"]
+
+    def test_deleted_directories_are_dropped(self, index):
+        index.file_manager.delete_path("app")
+        index.flush()
+        assert index.get_status()["files"] == 0
+
+    def test_retrieve_returns_symbol_body(self, index):
+        """A message naming a symbol retrieves that symbol's definition"""
+        snippets = index.retrieve("Why does fetch_leads return nothing?")
+        assert snippets[0]["path"] == "app/limits.py"
+        assert snippets[0]["reason"] == "symbol"
+        assert "async def fetch_leads" in snippets[0]["content"]
@@ -0,0 +1,85 @@
+import os
+import pytest
+from backend.ide import file_manager as file_manager_module
+from backend.ide.file_manager import FileManager
+from backend.ide.line_index import LineIndex
+
+@pytest.fixture
+def manager(tmp_path):
+    fm = FileManager(str(tmp_path))
+    yield fm
+    fm.tree_index.stop()
+
+class TestLineIndex:
+    """Test random access by line and byte range"""
+
+    @pytest.mark.parametrize("content", ["", "one", "one\n", "a\nb\r\nc", "x\n" * 50000])
+    def test_line_count_matches_splitlines(self, tmp_path, content):
+        path = tmp_path / "f.txt"
+        path.write_bytes(content.encode())
+        assert LineIndex(path).line_count == len(content.splitlines())
+
+    def test_reads_lines_across_checkpoints(self, tmp_path, monkeypatch):
+        """Line ranges are exact even when they span many checkpoints"""
+        monkeypatch.setattr("backend.ide.line_index.CHECKPOINT_BYTES", 64)
+        lines = [f"line {i}" for i in range(1, 1001)]
+        path = tmp_path / "f.txt"
+        path.write_text("\n".join(lines) + "\n")
+
+        index = LineIndex(path)
+        assert index.read_lines(500, 502).decode().splitlines() == lines[499:502]
+        assert index.read_lines(999, 2000).decode().splitlines() == lines[998:]
+        assert index.line_at(path.read_bytes().index(b"line 700")) == 700
+
+
+class TestRangedFileAccess:
+    """Test FileManager paging, streaming and atomic writes"""
+
+    def test_small_files_are_read_whole(self, manager):
+        manager.write_file("a.txt", "one\ntwo\n")
+        result = manager.read_file("a.txt")
+        assert result["content"] == "one\ntwo\n"
+        assert result["lines"] == 2
+        assert "truncated" not in result
+
+    def test_unranged_reads_are_never_truncated(self, manager):
+        """Content read without a range is safe to save back over the file"""
+        content = "".join(f"{i}\n" for i in range(1, 50001))
+        manager.write_file("big.log", content)
+        result = manager.read_file("big.log")
+        assert result["content"] == content
+        assert "truncated" not in result
+
+    def test_line_range_pages(self, manager, monkeypatch):
+        monkeypatch.setattr(file_manager_module, "DEFAULT_PAGE_LINES", 10)
+        manager.write_file("big.log", "".join(f"{i}\n" for i in range(1, 101)))
+
+        result = manager.read_file("big.log", start_line=1)
+        assert result["content"].splitlines() == [str(i) for i in range(1, 11)]
+        assert (result["start_line"], result["end_line"], result["lines"]) == (1, 10, 100)
+        assert result["truncated"] is True
+
+        tail = manager.read_file("big.log", start_line=95)
+        assert tail["content"].splitlines() == [str(i) for i in range(95, 101)]
+        assert tail["end_line"] == 100
+
+    def test_byte_range(self, manager):
+        manager.write_file("a.txt", "alpha\nbeta\ngamma\n")
+        result = manager.read_file("a.txt", offset=6, length=4)
+        assert result["content"] == "beta"
+        assert result["start_line"] == 2
+
+    def test_stream_file_yields_requested_bytes(self, manager):
+        manager.write_file("a.txt", "0123456789")
+        result = manager.stream_file("a.txt", offset=2, length=5)
+        assert b"".join(result["iterator"]) == b"23456"
+
+    def test_overwrite_is_atomic_without_backups(self, manager):
+        """Saving replaces the file in place and leaves no .bak or temp files behind"""
+        manager.write_file("a.sh", "echo 1\n")
+        os.chmod(manager.workspace_root / "a.sh", 0o755)
+        manager.write_file("a.sh", "echo 2\n")
+
+        assert manager.read_file("a.sh")["content"] == "echo 2\n"
+        assert os.stat(manager.workspace_root / "a.sh").st_mode & 0o777 == 0o755
+        assert sorted(os.listdir(manager.workspace_root)) == ["a.sh"]
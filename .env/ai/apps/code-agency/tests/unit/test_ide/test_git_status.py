@@ -0,0 +1,46 @@
+import subprocess
+import pytest
+from backend.ide.github_client import GitHubClient
+
+@pytest.fixture
+def repo(tmp_path):
+    subprocess.run(["git", "init", "-q", "-b", "main", str(tmp_path)], check=True)
+    subprocess.run(["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t",
+                    "commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    return tmp_path
+
+class TestGitStatusCache:
+    """Test cached, single-run git status"""
+
+    @pytest.mark.asyncio
+    async def test_status_reports_branch_and_files(self, repo):
+        (repo / "new.txt").write_text("x")
+        client = GitHubClient(str(repo))
+        result = await client.get_git_status()
+        assert result["status"]["branch"] == "main"
+        assert result["status"]["untracked"] == ["new.txt"]
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_are_cached(self, repo):
+        client = GitHubClient(str(repo))
+        first = await client.get_git_status()
+        (repo / "unseen.txt").write_text("x")  # No watcher event, index untouched
+        assert await client.get_git_status() is first
+
+    @pytest.mark.asyncio
+    async def test_index_change_invalidates(self, repo):
+        client = GitHubClient(str(repo))
+        (repo / "a.txt").write_text("x")
+        await client.get_git_status()
+        subprocess.run(["git", "-C", str(repo), "add", "a.txt"], check=True)
+        result = await client.get_git_status()
+        assert result["status"]["staged"] == ["a.txt"]
+
+    @pytest.mark.asyncio
+    async def test_workspace_change_invalidates(self, repo):
+        client = GitHubClient(str(repo))
+        await client.get_git_status()
+        (repo / "b.txt").write_text("x")
+        client._on_workspace_change(["b.txt"])
+        result = await client.get_git_status()
+        assert result["status"]["untracked"] == ["b.txt"]
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from backend.ide import terminal
+from backend.ide.terminal import ScrollbackBuffer, TerminalSession
+
+async def collect(frames: asyncio.Queue, session: TerminalSession, until: str, timeout: float = 5.0) -> str:
+    output = ""
+    while until not in output:
+        data = await asyncio.wait_for(frames.get(), timeout)
+        if data is None:
+            break
+        output += data
+        session.frame_sent()
+    return output
+
+class TestScrollbackBuffer:
+    """Test the terminal output ring buffer"""
+
+    def test_keeps_most_recent_output(self):
+        buffer = ScrollbackBuffer(max_chars=10)
+        for chunk in ["aaaa", "bbbb", "cccc"]:
+            buffer.append(chunk)
+        assert buffer.snapshot() == "bbbbcccc"
+
+    def test_trims_single_oversized_chunk(self):
+        buffer = ScrollbackBuffer(max_chars=4)
+        buffer.append("0123456789")
+        assert buffer.snapshot() == "6789"
+
+
+class TestTerminalSession:
+    """Test event-loop driven PTY sessions"""
+
+    @pytest.mark.asyncio
+    async def test_output_reaches_attached_client(self, tmp_path):
+        session = TerminalSession("t1", str(tmp_path), "/bin/sh")
+        assert session.start()
+        try:
+            _, frames = session.attach()
+            session.write_input("echo ready-$((40+2))\n")
+            assert "ready-42" in await collect(frames, session, "ready-42")
+        finally:
+            session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_reattached_client_gets_scrollback(self, tmp_path):
+        session = TerminalSession("t2", str(tmp_path), "/bin/sh")
+        assert session.start()
+        try:
+            _, frames = session.attach()
+            session.write_input("echo first-run\n")
+            await collect(frames, session, "first-run")
+            session.detach(frames)
+
+            scrollback, _ = session.attach()
+            assert "first-run" in scrollback
+        finally:
+            session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_pauses_reading(self, tmp_path, monkeypatch):
+        """Output stops being read while a client has too many unsent frames"""
+        monkeypatch.setattr(terminal, "HIGH_WATER_FRAMES", 2)
+        session = TerminalSession("t3", str(tmp_path), "/bin/sh")
+        assert session.start()
+        try:
+            _, frames = session.attach()
+            session.write_input("yes | head -c 10000000\n")
+            await asyncio.sleep(0.5)
+            assert frames.qsize() <= 3
+            assert not session._reading
+
+            frames.get_nowait()
+            frames.get_nowait()
+            session.frame_sent()
+            assert session._reading
+        finally:
+            session.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_exit_ends_frame_stream(self, tmp_path):
+        session = TerminalSession("t4", str(tmp_path), "/bin/sh")
+        assert session.start()
+        try:
+            _, frames = session.attach()
+            session.write_input("exit\n")
+            await collect(frames, session, "\0never")
+            assert not session.running
+        finally:
+            session.cleanup()
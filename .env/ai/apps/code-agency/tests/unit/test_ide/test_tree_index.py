@@ -0,0 +1,116 @@
+import threading
+import pytest
+from backend.ide.file_manager import FileManager
+
+@pytest.fixture
+def manager(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('hi')\n")
+    (tmp_path / "README.md").write_text("# readme\n")
+    (tmp_path / ".git").mkdir()
+    fm = FileManager(str(tmp_path))
+    yield fm
+    fm.tree_index.stop()
+
+class TestTreeIndex:
+    """Test the in-memory workspace tree"""
+
+    def test_matches_directory_walk(self, manager):
+        """Indexed tree is identical to a fresh walk of the workspace"""
+        indexed = manager.get_file_tree("", max_depth=3)
+        walked = manager._build_tree_node(manager.workspace_root, 0, 3)
+        assert indexed == walked
+        assert [c["name"] for c in indexed["children"]] == ["src", "README.md"]
+
+    def test_own_writes_are_visible_immediately(self, manager):
+        """Writes through FileManager update the index without waiting for the watcher"""
+        manager.get_file_tree("", max_depth=3)
+        manager.create_file("src/util.py", "x = 1\n")
+        manager.create_directory("docs/api")
+
+        tree = manager.get_file_tree("", max_depth=3)
+        names = {c["name"] for c in tree["children"]}
+        assert "docs" in names
+        src = next(c for c in tree["children"] if c["name"] == "src")
+        assert {c["name"] for c in src["children"]} == {"main.py", "util.py"}
+
+    def test_etag_changes_only_with_subtree(self, manager):
+        """ETags are stable until something under the requested path changes"""
+        manager.get_file_tree("", max_depth=3)
+        root_tag = manager.get_tree_etag("", 3)
+        src_tag = manager.get_tree_etag("src", 3)
+        assert manager.get_tree_etag("", 3) == root_tag
+
+        manager.write_file("README.md", "# changed readme\n")
+        assert manager.get_tree_etag("", 3) != root_tag
+        assert manager.get_tree_etag("src", 3) == src_tag
+
+    def test_external_changes_are_picked_up(self, manager):
+        """Changes made behind the manager's back show up once the index refreshes"""
+        manager.get_file_tree("", max_depth=3)
+        (manager.workspace_root / "src" / "extra.py").write_text("")
+
+        manager.tree_index._mark(str(manager.workspace_root / "src" / "extra.py"), False)
+        manager.tree_index.flush()
+
+        src = manager.get_file_tree("src", max_depth=1)
+        assert "extra.py" in {c["name"] for c in src["children"]}
+
+    def test_max_children_truncates_listing(self, manager):
+        """Large directories can be capped per level"""
+        tree = manager.get_file_tree("", max_depth=1, max_children=1)
+        assert len(tree["children"]) == 1
+        assert tree["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_deltas(self, manager):
+        """Changes are pushed to subscribers as tree_delta frames"""
+        manager.get_file_tree("", max_depth=3)
+        queue = manager.tree_index.subscribe()
+        manager.delete_path("src/main.py")
+
+        message = await queue.get()
+        assert message["type"] == "tree_delta"
+        assert {"op": "remove", "path": "src/main.py"} in message["changes"]
+        manager.tree_index.unsubscribe(queue)
+
+    def test_file_sniffing_runs_outside_lock(self, manager):
+        """Language and binary checks read from disk without holding the index lock"""
+        index = manager.tree_index
+        sniff = index._is_binary
+        held = []
+
+        def probe():
+            free = index._lock.acquire(timeout=0)
+            if free:
+                index._lock.release()
+            held.append(not free)
+
+        def is_binary(path):
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return sniff(path)
+
+        index._is_binary = is_binary
+        tree = manager.get_file_tree("", max_depth=3)
+        readme = next(c for c in tree["children"] if c["name"] == "README.md")
+        assert (readme["language"], readme["is_binary"]) == ("markdown", False)
+        assert held and not any(held)
+
+    def test_file_sniffing_is_cached_until_change(self, manager):
+        """Files are sniffed once and again only after they change"""
+        index = manager.tree_index
+        sniff = index._is_binary
+        calls = []
+        index._is_binary = lambda path: calls.append(path.name) or sniff(path)
+
+        manager.get_file_tree("", max_depth=3)
+        manager.get_file_tree("", max_depth=3)
+        assert sorted(calls) == ["README.md", "main.py"]
+
+        manager.write_file("README.md", "binary\0now")
+        tree = manager.get_file_tree("", max_depth=3)
+        readme = next(c for c in tree["children"] if c["name"] == "README.md")
+        assert readme["is_binary"] is True
+        assert calls.count("README.md") == 2
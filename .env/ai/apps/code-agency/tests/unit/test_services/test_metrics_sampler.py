@@ -0,0 +1,72 @@
+import asyncio
+import os
+import time
+import pytest
+from backend.app.services.metrics_sampler import MetricsSampler
+
+SERVICES = [
+    {"name": "self", "port": 1, "pid_file": "self.pid"},
+    {"name": "missing", "port": 2, "pid_file": "missing.pid"},
+    {"name": "broken", "port": 3, "pid_file": "broken.pid"},
+]
+
+
+@pytest.fixture
+def pids_dir(tmp_path):
+    (tmp_path / "self.pid").write_text(str(os.getpid()))
+    (tmp_path / "broken.pid").write_text("not-a-pid")
+    return tmp_path
+
+
+class TestMetricsSampler:
+    """Test background service/system sampling"""
+
+    def test_sample_reports_service_status(self, pids_dir):
+        sample = MetricsSampler(pids_dir, SERVICES).sample()
+        services = {s["name"]: s for s in sample["services"]}
+        assert services["self"]["status"] == "running"
+        assert services["self"]["pid"] == os.getpid()
+        assert services["self"]["memory_mb"] > 0
+        assert services["missing"]["status"] == "stopped"
+        assert services["broken"]["status"] == "error"
+        assert 0 <= sample["system"]["memory_percent"] <= 100
+
+    def test_sample_does_not_block(self, pids_dir):
+        sampler = MetricsSampler(pids_dir, SERVICES)
+        started = time.monotonic()
+        for _ in range(5):
+            sampler.sample()
+        assert time.monotonic() - started < 0.5
+
+    def test_history_is_bounded(self, pids_dir):
+        sampler = MetricsSampler(pids_dir, SERVICES, history_size=3)
+        for _ in range(5):
+            sampler.sample()
+        assert len(sampler.history()["points"]) == 3
+        assert len(sampler.history(limit=2)["points"]) == 2
+
+        points = sampler.history(service="self")["points"]
+        assert set(points[0]) == {"timestamp", "status", "cpu_percent", "memory_mb"}
+        assert [p["timestamp"] for p in points] == sorted(p["timestamp"] for p in points)
+
+    @pytest.mark.asyncio
+    async def test_background_sampling(self, pids_dir):
+        sampler = MetricsSampler(pids_dir, SERVICES, interval=0.05)
+        first = await sampler.latest()
+        await asyncio.sleep(0.3)
+        assert (await sampler.latest())["timestamp"] > first["timestamp"]
+        await sampler.close()
+        assert sampler._task is None
+
+    @pytest.mark.asyncio
+    async def test_first_latest_waits_for_loop_sample(self, pids_dir, monkeypatch):
+        """Early callers share the loop's first sample instead of sampling alongside it"""
+        sampler = MetricsSampler(pids_dir, SERVICES, interval=60)
+        calls = []
+        sample = sampler.sample
+        monkeypatch.setattr(sampler, "sample", lambda: calls.append(1) or sample())
+
+        first, second = await asyncio.gather(sampler.latest(), sampler.latest())
+        assert first is second
+        assert len(calls) == 1
+        await sampler.close()
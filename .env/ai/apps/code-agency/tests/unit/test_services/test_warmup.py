@@ -0,0 +1,30 @@
+import time
+import pytest
+from backend.app.services.warmup import Warmup
+
+
+class TestWarmup:
+    """Test background warm-up stages"""
+
+    @pytest.mark.asyncio
+    async def test_stages_run_in_background(self):
+        warmup = Warmup()
+        warmup.add("slow", lambda: time.sleep(0.1))
+        warmup.add("failing", lambda: False)
+        warmup.add("raising", lambda: 1 / 0)
+        assert not warmup.ready
+
+        warmup.start()
+        assert warmup.status["slow"]["state"] in ("pending", "running")
+        await warmup.wait()
+
+        assert warmup.ready
+        stages = warmup.get_status()["stages"]
+        assert stages["slow"]["state"] == "ready"
+        assert stages["slow"]["seconds"] >= 0.1
+        assert stages["failing"]["state"] == "failed"
+        assert stages["raising"]["state"] == "failed"
+        assert "division" in stages["raising"]["error"]
+
+    def test_ready_without_stages(self):
+        assert Warmup().ready
@@ -0,0 +1,26 @@
+import sys
+from backend.utils.lazy import LazyModule, import_timings
+
+
+class TestLazyModule:
+    """Test deferred module imports"""
+
+    def test_imports_on_first_attribute_access(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = LazyModule("colorsys")
+        assert not colorsys.loaded
+        assert "colorsys" not in sys.modules
+
+        assert colorsys.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+        assert colorsys.loaded
+        assert "colorsys" in import_timings
+
+    def test_missing_module_raises_on_use(self):
+        missing = LazyModule("no_such_module_here")
+        assert not missing.loaded
+        try:
+            missing.anything
+        except ImportError:
+            pass
+        else:
+            raise AssertionError("expected ImportError")
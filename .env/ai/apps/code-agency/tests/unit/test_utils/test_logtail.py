@@ -0,0 +1,130 @@
+import asyncio
+import os
+import re
+import pytest
+from backend.utils import logtail
+from backend.utils.logtail import LogFollower, follow_log, tail_lines
+
+
+class TestTailLines:
+    """Test reverse-seek tail reading"""
+
+    def test_matches_readlines(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logtail, "TAIL_BLOCK_SIZE", 7)  # Force lines across block edges
+        path = tmp_path / "app.log"
+        path.write_text("".join(f"line {i}\n" for i in range(50)))
+        expected = [line.rstrip("\n") for line in path.read_text().splitlines(True)]
+        for n in (1, 3, 49, 50, 80):
+            assert tail_lines(path, n) == expected[-n:]
+
+    def test_edge_cases(self, tmp_path):
+        path = tmp_path / "app.log"
+        path.write_bytes(b"")
+        assert tail_lines(path, 5) == []
+        path.write_bytes(b"a\r\nb\n\nc")
+        assert tail_lines(path, 2) == ["", "c"]
+        assert tail_lines(path, 10) == ["a", "b", "", "c"]
+        assert tail_lines(path, 0) == []
+
+    def test_reads_only_the_end(self, tmp_path, monkeypatch):
+        path = tmp_path / "big.log"
+        with open(path, "wb") as f:
+            f.write(b"x" * 100 + b"\n")
+            f.write(b"filler line\n" * 200_000)
+
+        reads = []
+
+        class Tracked:
+            def __init__(self, f):
+                self.f = f
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.f.close()
+
+            def seek(self, *args):
+                return self.f.seek(*args)
+
+            def read(self, n=-1):
+                data = self.f.read(n)
+                reads.append(len(data))
+                return data
+
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            return Tracked(real_open(*args, **kwargs))
+
+        monkeypatch.setattr(logtail, "open", tracking_open, raising=False)
+        assert tail_lines(path, 10) == ["filler line"] * 10
+        assert sum(reads) <= logtail.TAIL_BLOCK_SIZE
+
+
+class TestLogFollower:
+    """Test following appended lines"""
+
+    def test_follows_appends_and_partial_lines(self, tmp_path):
+        path = tmp_path / "svc.log"
+        path.write_text("old\n")
+        follower = LogFollower(path)
+        assert follower.poll()["lines"] == []
+
+        with open(path, "a") as f:
+            f.write("one\ntw")
+        assert follower.poll()["lines"] == ["one"]
+        with open(path, "a") as f:
+            f.write("o\n")
+        assert follower.poll()["lines"] == ["two"]
+        follower.close()
+
+    def test_grep_filter(self, tmp_path):
+        path = tmp_path / "svc.log"
+        path.write_text("")
+        follower = LogFollower(path, re.compile("error", re.IGNORECASE))
+        follower.poll()
+        with open(path, "a") as f:
+            f.write("ok\nERROR boom\nfine\nerror again\n")
+        assert follower.poll()["lines"] == ["ERROR boom", "error again"]
+        follower.close()
+
+    def test_rotation(self, tmp_path):
+        path = tmp_path / "svc.log"
+        path.write_text("")
+        follower = LogFollower(path)
+        follower.poll()
+        with open(path, "a") as f:
+            f.write("before\nunfinished")
+        os.rename(path, tmp_path / "svc.log.1")
+        path.write_text("after\n")
+
+        batch = follower.poll()
+        assert batch["rotated"] is True
+        assert batch["lines"] == ["before", "unfinished", "after"]
+
+        path.write_text("")  # Truncated in place
+        with open(path, "a") as f:
+            f.write("x\n")
+        assert follower.poll() == {"lines": ["x"], "rotated": True, "more": False}
+        follower.close()
+
+    def test_file_created_later(self, tmp_path):
+        path = tmp_path / "svc.log"
+        follower = LogFollower(path)
+        assert follower.poll()["lines"] == []
+        path.write_text("first\n")
+        assert follower.poll()["lines"] == ["first"]
+        follower.close()
+
+    @pytest.mark.asyncio
+    async def test_follow_log(self, tmp_path):
+        path = tmp_path / "svc.log"
+        path.write_text("")
+        stream = follow_log(path, poll_interval=0.01)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        with open(path, "a") as f:
+            f.write("hello\n")
+        assert await asyncio.wait_for(pending, 1) == {"lines": ["hello"], "rotated": False}
+        await stream.aclose()
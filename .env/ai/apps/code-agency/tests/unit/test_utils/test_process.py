@@ -0,0 +1,50 @@
+import asyncio
+import time
+import pytest
+from backend.utils.process import ProcessRunner
+
+class TestProcessRunner:
+    """Test async subprocess execution"""
+
+    @pytest.mark.asyncio
+    async def test_run_captures_output(self):
+        result = await ProcessRunner().run("echo out; echo err >&2; exit 3")
+        assert result == {"returncode": 3, "stdout": "out\n", "stderr": "err\n"}
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Other coroutines run while a command is in progress"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await ProcessRunner().run(["sleep", "0.3"])
+        task.cancel()
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process_group(self):
+        runner = ProcessRunner()
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await runner.run("sleep 5 & sleep 5; wait", timeout=0.2)
+        assert time.monotonic() - started < 2
+        assert runner.running == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Calls beyond the pool size wait for a free slot"""
+        runner = ProcessRunner(max_concurrency=2)
+        started = time.monotonic()
+        await asyncio.gather(*(runner.run(["sleep", "0.2"]) for _ in range(4)))
+        assert time.monotonic() - started >= 0.4
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_output_then_exit(self):
+        events = [event async for event in ProcessRunner().stream("echo a; sleep 0.05; echo b >&2")]
+        assert events == [("stdout", "a\n"), ("stderr", "b\n"), ("exit", 0)]
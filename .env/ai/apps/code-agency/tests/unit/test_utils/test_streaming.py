@@ -0,0 +1,62 @@
+import asyncio
+import time
+import pytest
+from backend.utils.streaming import iterate_in_thread, coalesce
+
+def slow_tokens(count: int = 20, delay: float = 0.005):
+    for i in range(count):
+        time.sleep(delay)
+        yield f"t{i} "
+
+class TestIterateInThread:
+    """Test running blocking generators off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_yields_all_items_in_order(self):
+        items = [item async for item in iterate_in_thread(slow_tokens)]
+        assert items == list(slow_tokens(delay=0))
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Other coroutines keep running while the generator blocks"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        async for _ in iterate_in_thread(slow_tokens):
+            pass
+        task.cancel()
+        assert ticks > 5
+
+    @pytest.mark.asyncio
+    async def test_propagates_generator_errors(self):
+        def failing():
+            yield "a"
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            async for _ in iterate_in_thread(failing):
+                pass
+
+class TestCoalesce:
+    """Test time/size bounded frame coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_merges_without_losing_text(self):
+        frames = [f async for f in coalesce(iterate_in_thread(slow_tokens), interval=0.03, max_chars=1024)]
+        assert "".join(frames) == "".join(slow_tokens(delay=0))
+        assert len(frames) < 20
+
+    @pytest.mark.asyncio
+    async def test_size_bound(self):
+        async def burst():
+            for _ in range(10):
+                yield "x" * 10
+
+        frames = [f async for f in coalesce(burst(), interval=10, max_chars=30)]
+        assert frames == ["x" * 30, "x" * 30, "x" * 30, "x" * 10]
@@ -2,7 +2,7 @@
 Outreach Agent - Drafts personalized messages using Ollama
 """
 from typing import Dict
-from app.core.ollama_client import ollama_cluster
+from app.core.llm_cache import llm_cache
 
 
 class OutreachAgent:
@@ -25,7 +25,7 @@ class OutreachAgent:
         prompt = self._build_outreach_prompt(lead)
 
         try:
-            draft = ollama_cluster.generate(
+            draft = llm_cache.generate(
                 model=self.model,
                 prompt=prompt,
                 node=self.node,
@@ -2,8 +2,11 @@
 Qualifier Agent - Scores and filters leads using config-based rules
 """
 import re
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Set
 from app.config.settings import config
+from app.core.matcher import lead_matcher
+
+FORMATTING_PATTERN = re.compile(r'[-*•]\s+|\d+\.\s+')
 
 
 class QualifierAgent:
@@ -11,13 +14,28 @@ class QualifierAgent:
 
     def __init__(self):
         self.config = config
+        self.matcher = lead_matcher
+        self._preferred_tech = {t.lower() for t in self.config.filters.tech_stack.preferred}
+        self._avoided_tech = {t.lower() for t in self.config.filters.tech_stack.avoid}
+
+    def qualify_leads(self, leads: List[Dict]) -> List[Tuple[int, Dict, str]]:
+        """
+        Score a batch of leads
 
-    def qualify_lead(self, lead: Dict) -> Tuple[int, Dict, str]:
+        Each lead's text is scanned once for every keyword class; the
+        results are in the same order as `leads`.
+        """
+        texts = [lead.get('title', '') + " " + lead.get('description', '') for lead in leads]
+        scans = self.matcher.scan_many(texts)
+        return [self.qualify_lead(lead, found) for lead, found in zip(leads, scans)]
+
+    def qualify_lead(self, lead: Dict, found: Dict[str, Set[str]] = None) -> Tuple[int, Dict, str]:
         """
         Score a lead 0-100 using config-based scoring rules
 
         Args:
             lead: Lead dictionary with title, description, budget, etc.
+            found: Precomputed matcher scan of the lead's text (see qualify_leads)
 
         Returns:
             Tuple of (score, breakdown, notes)
@@ -29,6 +47,8 @@ class QualifierAgent:
         title = lead.get('title', '')
         description = lead.get('description', '')
         full_text = (title + " " + description).lower()
+        if found is None:
+            found = self.matcher.scan(full_text)
         budget_min = lead.get('budget_min', 0)
         tech_stack = lead.get('tech_stack', [])
 
@@ -37,27 +57,27 @@ class QualifierAgent:
         breakdown['budget'] = budget_score
 
         # 2. Description Scoring (20 points max)
-        desc_score = self._score_description(description, full_text)
+        desc_score = self._score_description(description, found)
         breakdown['description'] = desc_score
 
         # 3. Tech Stack Scoring (15 points max)
-        tech_score = self._score_tech_stack(tech_stack, full_text)
+        tech_score = self._score_tech_stack(tech_stack)
         breakdown['tech_stack'] = tech_score
 
         # 4. Client Quality Scoring (20 points max)
-        client_score = self._score_client_quality(full_text)
+        client_score = self._score_client_quality(found)
         breakdown['client_quality'] = client_score
 
         # 5. Timeline Scoring (10 points max)
-        timeline_score = self._score_timeline(full_text)
+        timeline_score = self._score_timeline(found)
         breakdown['timeline'] = timeline_score
 
         # 6. Engagement Scoring (5 points max)
-        engagement_score = self._score_engagement(full_text)
+        engagement_score = self._score_engagement(found, full_text)
         breakdown['engagement'] = engagement_score
 
         # 7. Apply Penalties
-        penalties_score = self._apply_penalties(full_text)
+        penalties_score = self._apply_penalties(found)
         breakdown['penalties'] = penalties_score
 
         # Calculate total score
@@ -107,7 +127,7 @@ class QualifierAgent:
 
         return 0
 
-    def _score_description(self, description: str, full_text: str) -> int:
+    def _score_description(self, description: str, found: Dict[str, Set[str]]) -> int:
         """Score based on description quality from config"""
         if not description:
             return 0
@@ -122,25 +142,25 @@ class QualifierAgent:
                 break
 
         # Bonus for requirements
-        if any(word in full_text for word in ['require', 'requirement', 'specification', 'feature', 'must have']):
+        if 'requirements' in found:
             score += self.config.scoring.description_scoring['has_requirements']
 
         # Bonus for timeline
-        if any(word in full_text for word in ['timeline', 'deadline', 'delivery', 'week', 'month']):
+        if 'description_timeline' in found:
             score += self.config.scoring.description_scoring['has_timeline']
 
         # Bonus for formatting (bullets, numbers)
-        if re.search(r'[-*•]\s+|\d+\.\s+', description):
+        if FORMATTING_PATTERN.search(description):
             score += self.config.scoring.description_scoring['well_formatted']
 
         # Cap at 20 points
         return min(20, score)
 
-    def _score_tech_stack(self, tech_stack: List[str], full_text: str) -> int:
+    def _score_tech_stack(self, tech_stack: List[str]) -> int:
         """Score based on tech stack match from config"""
         score = 0
-        preferred_tech = [t.lower() for t in self.config.filters.tech_stack.preferred]
-        avoided_tech = [t.lower() for t in self.config.filters.tech_stack.avoid]
+        preferred_tech = self._preferred_tech
+        avoided_tech = self._avoided_tech
 
         # Count preferred tech matches
         preferred_count = 0
@@ -158,27 +178,17 @@ class QualifierAgent:
         # Cap at 15 points (can go negative)
         return max(-15, min(15, score))
 
-    def _score_client_quality(self, full_text: str) -> int:
+    def _score_client_quality(self, found: Dict[str, Set[str]]) -> int:
         """Score based on client quality indicators from config"""
         score = 0
 
-        # Check for company indicators
-        company_indicators = self.config.scoring.client_quality_scoring['company_indicators']
-        points_per_company = self.config.scoring.client_quality_scoring['points_per_indicator']
-
-        for indicator in company_indicators:
-            if indicator.lower() in full_text:
-                score += points_per_company
-                break  # Only count once
-
-        # Check for startup indicators (higher value)
-        startup_indicators = self.config.scoring.client_quality_scoring['startup_indicators']
-        points_per_startup = self.config.scoring.client_quality_scoring.get('points_per_indicator', 5)
+        # Check for company indicators (only count once)
+        if 'company' in found:
+            score += self.config.scoring.client_quality_scoring['points_per_indicator']
 
-        for indicator in startup_indicators:
-            if indicator.lower() in full_text:
-                score += points_per_startup
-                break  # Only count once
+        # Check for startup indicators (only count once)
+        if 'startup' in found:
+            score += self.config.scoring.client_quality_scoring.get('points_per_indicator', 5)
 
         # Default individual points if no company/startup found
         if score == 0:
@@ -187,31 +197,31 @@ class QualifierAgent:
         # Cap at 20 points
         return min(20, score)
 
-    def _score_timeline(self, full_text: str) -> int:
+    def _score_timeline(self, found: Dict[str, Set[str]]) -> int:
         """Score based on timeline reasonableness from config"""
         score = 0
 
         # Check for reasonable timeline
-        if any(word in full_text for word in ['timeline', 'deadline', 'delivery date']):
+        if 'timeline' in found:
             score += self.config.scoring.timeline_scoring['has_timeline']
 
         # Check for realistic timeline (not ASAP)
-        if 'asap' not in full_text and 'urgent' not in full_text and 'immediately' not in full_text:
+        if 'urgent' not in found:
             score += self.config.scoring.timeline_scoring['realistic']
 
         # Bonus for long-term/ongoing work
-        if any(word in full_text for word in ['ongoing', 'long-term', 'maintenance', 'retainer']):
+        if 'ongoing' in found:
             score += self.config.scoring.timeline_scoring['ongoing']
 
         # Cap at 10 points
         return min(10, score)
 
-    def _score_engagement(self, full_text: str) -> int:
+    def _score_engagement(self, found: Dict[str, Set[str]], full_text: str) -> int:
         """Score based on engagement indicators from config"""
         score = 0
 
         # Check for portfolio/examples
-        if any(word in full_text for word in ['portfolio', 'examples', 'previous work', 'samples']):
+        if 'examples' in found:
             score += self.config.scoring.engagement_scoring['has_examples']
 
         # Check for detailed communication
@@ -221,23 +231,20 @@ class QualifierAgent:
         # Cap at 5 points
         return min(5, score)
 
-    def _apply_penalties(self, full_text: str) -> int:
+    def _apply_penalties(self, found: Dict[str, Set[str]]) -> int:
         """Apply penalties for red flags from config"""
         penalty = 0
 
-        # Check quality red flags from filters config
-        red_flags = [rf.lower() for rf in self.config.filters.quality_indicators['red_flags']]
-        for flag in red_flags:
-            if flag in full_text:
-                penalty += self.config.scoring.penalties['red_flag']
-                break  # Apply penalty once
+        # Check quality red flags from filters config (apply penalty once)
+        if 'red_flag' in found:
+            penalty += self.config.scoring.penalties['red_flag']
 
         # Check for urgent/desperate
-        if 'asap' in full_text or 'urgent' in full_text or 'immediately' in full_text:
+        if 'urgent' in found:
             penalty += self.config.scoring.penalties['urgent']
 
         # Check for unrealistic expectations
-        if any(word in full_text for word in ['like facebook', 'like uber', 'like amazon', 'clone']):
+        if 'unrealistic' in found:
             penalty += self.config.scoring.penalties['unrealistic']
 
         return penalty
@@ -2,7 +2,7 @@
 Researcher Agent - Enriches leads with context using Ollama
 """
 from typing import Dict
-from app.core.ollama_client import ollama_cluster
+from app.core.llm_cache import llm_cache
 
 
 class ResearcherAgent:
@@ -25,7 +25,7 @@ class ResearcherAgent:
         prompt = self._build_research_prompt(lead)
 
         try:
-            response = ollama_cluster.generate(
+            response = llm_cache.generate(
                 model=self.model,
                 prompt=prompt,
                 node=self.node,
@@ -1,28 +1,42 @@
 """
 Scout Agent - Finds leads from free sources
 """
+import asyncio
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-import requests
 from bs4 import BeautifulSoup
 
 from app.config.settings import config
+from app.core.http_client import fetcher
+from app.core.matcher import lead_matcher
 
 
 class ScoutAgent:
     """Finds dev gigs from free sources"""
 
+    # Overridable so a local fixture server can stand in for the real sites
+    reddit_base_url = "https://www.reddit.com"
+    hn_base_url = "https://news.ycombinator.com"
+
     def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
-        }
         self.config = config
-
-    def search_all(self, categories: List[str] = None, min_budget: int = 1000) -> List[Dict]:
+        self.matcher = lead_matcher
+        self._budget_patterns = [
+            (re.compile(p['regex'], re.IGNORECASE), p.get('multiplier', 1))
+            for p in self.config.filters.budget.patterns
+        ]
+
+    def search_all(
+        self,
+        categories: List[str] = None,
+        min_budget: int = 1000
+    ) -> List[Dict]:
         """
         Search all sources for leads
 
+        Blocking wrapper around search_all_async for synchronous callers.
+
         Args:
             categories: List of categories to search (e.g., ['web_development'])
             min_budget: Minimum budget filter
@@ -30,192 +44,226 @@ class ScoutAgent:
         Returns:
             List of raw lead dictionaries
         """
-        leads = []
-
-        # Search each source
-        leads.extend(self.search_reddit(categories, min_budget))
-        leads.extend(self.search_hackernews())
-        # TODO: Add Indeed, Twitter, LinkedIn scrapers
+        async def run():
+            try:
+                return await self.search_all_async(categories, min_budget)
+            finally:
+                # The pool is tied to this event loop; cached validators are kept
+                await fetcher.aclose()
+
+        return asyncio.run(run())
+
+    async def search_all_async(self, categories: List[str] = None, min_budget: int = 1000) -> List[Dict]:
+        """Fetch every source concurrently; a failing source contributes no leads"""
+        results = await asyncio.gather(
+            self.search_reddit(categories, min_budget),
+            self.search_hackernews(),
+            # TODO: Add Indeed, Twitter, LinkedIn scrapers
+        )
 
+        leads = []
+        for source_leads in results:
+            leads.extend(source_leads)
         return leads
 
-    def search_reddit(self, categories: List[str] = None, min_budget: int = 1000) -> List[Dict]:
+    async def search_reddit(self, categories: List[str] = None, min_budget: int = 1000) -> List[Dict]:
         """
         Scrape Reddit using configured subreddits and keywords
 
+        All subreddits are fetched in parallel, bounded by the fetcher's
+        per-host limit.
+
         Note: This is a basic scraper. For production, use PRAW (Reddit API)
         """
+        results = await asyncio.gather(*[
+            self._search_subreddit(subreddit_config, min_budget)
+            for subreddit_config in self.config.sources.reddit.subreddits
+        ])
+
         leads = []
+        for subreddit_leads in results:
+            leads.extend(subreddit_leads)
+        return leads
 
-        # Use configured subreddits
-        for subreddit_config in self.config.sources.reddit.subreddits:
-            subreddit_name = subreddit_config['name']
-            keywords = [k.lower() for k in subreddit_config['keywords']]
-            exclude_keywords = [k.lower() for k in subreddit_config.get('exclude_keywords', [])]
+    async def _search_subreddit(self, subreddit_config: Dict, min_budget: int) -> List[Dict]:
+        subreddit_name = subreddit_config['name']
 
-            try:
-                # Fetch posts from subreddit
-                url = f"https://www.reddit.com/r/{subreddit_name}/new.json"
-                params = {'limit': self.config.sources.reddit.limit}
-                response = requests.get(url, headers=self.headers, params=params, timeout=15)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    posts = data.get('data', {}).get('children', [])
-
-                    for post in posts:
-                        post_data = post.get('data', {})
-
-                        # Get title and text
-                        title = post_data.get('title', '')
-                        selftext = post_data.get('selftext', '')
-                        full_text = (title + " " + selftext).lower()
-
-                        # Check post age (skip old posts)
-                        created = datetime.fromtimestamp(post_data.get('created_utc', 0))
-                        max_age = timedelta(hours=self.config.sources.reddit.max_age_hours)
-                        if datetime.now() - created > max_age:
-                            continue
-
-                        # Filter 1: Must be [Hiring] post
-                        if not title.lower().startswith('[hiring]'):
-                            # Also accept posts with hiring keywords
-                            if not any(kw in title.lower() for kw in ['hiring', 'looking for', 'need developer', 'seeking']):
-                                continue
-
-                        # Filter 2: Must contain web development keywords
-                        has_web_dev_keyword = any(keyword in full_text for keyword in keywords)
-                        if not has_web_dev_keyword:
-                            continue
-
-                        # Filter 3: Must NOT contain exclusion keywords
-                        has_exclusion = any(exclude in full_text for exclude in exclude_keywords)
-                        if has_exclusion:
-                            continue
-
-                        # Extract budget
-                        budget = self._extract_budget(title + " " + selftext)
-
-                        # Filter 4: Must meet minimum budget (if budget found)
-                        # If no budget mentioned, allow it through for manual review
-                        if budget is not None and budget < min_budget:
-                            continue
-
-                        # Extract tech stack
-                        tech_stack = self._extract_tech_stack(title + " " + selftext)
-
-                        # Filter 5: Prefer posts mentioning preferred tech
-                        preferred_tech = [t.lower() for t in self.config.filters.tech_stack.preferred]
-                        has_preferred_tech = any(tech.lower() in full_text for tech in preferred_tech)
-
-                        # Skip if it has avoided tech
-                        avoided_tech = [t.lower() for t in self.config.filters.tech_stack.avoid]
-                        has_avoided_tech = any(tech in full_text for tech in avoided_tech)
-                        if has_avoided_tech:
-                            continue
-
-                        # Create lead
-                        lead = {
-                            'source': 'reddit',
-                            'title': title,
-                            'description': selftext[:1000],
-                            'url': f"https://reddit.com{post_data.get('permalink', '')}",
-                            'budget_min': budget if budget else None,
-                            'budget_max': budget * 2 if budget else None,  # Rough estimate
-                            'tech_stack': tech_stack,
-                            'found_at': datetime.now(),
-                        }
-
-                        leads.append(lead)
-
-            except Exception as e:
-                print(f"Error scraping r/{subreddit_name}: {e}")
+        try:
+            # Fetch posts from subreddit
+            url = f"{self.reddit_base_url}/r/{subreddit_name}/new.json"
+            params = {'limit': self.config.sources.reddit.limit}
+            response = await fetcher.get(url, params=params)
+
+            if response.status != 200:
+                return []
+
+            posts = response.json().get('data', {}).get('children', [])
+            return self._parse_reddit_posts(subreddit_config, posts, min_budget)
+
+        except Exception as e:
+            print(f"Error scraping r/{subreddit_name}: {e}")
+            return []
+
+    def _parse_reddit_posts(self, subreddit_config: Dict, posts: List[Dict], min_budget: int) -> List[Dict]:
+        """Filter a subreddit listing down to matching leads"""
+        leads = []
+        subreddit_name = subreddit_config['name']
+        max_age = timedelta(hours=self.config.sources.reddit.max_age_hours)
+
+        for post in posts:
+            post_data = post.get('data', {})
+
+            # Get title and text
+            title = post_data.get('title', '')
+            selftext = post_data.get('selftext', '')
+            full_text = title + " " + selftext
+
+            # Check post age (skip old posts)
+            created = datetime.fromtimestamp(post_data.get('created_utc', 0))
+            if datetime.now() - created > max_age:
+                continue
+
+            # Filter 1: Must be [Hiring] post
+            if not title.lower().startswith('[hiring]'):
+                # Also accept posts with hiring keywords
+                if 'hiring' not in self.matcher.scan(title):
+                    continue
+
+            # One pass finds every keyword class in the post
+            found = self.matcher.scan(full_text)
+
+            # Filter 2: Must contain web development keywords
+            if f"subreddit:{subreddit_name}" not in found:
+                continue
+
+            # Filter 3: Must NOT contain exclusion keywords
+            if f"subreddit_exclude:{subreddit_name}" in found:
+                continue
+
+            # Extract budget
+            budget = self._extract_budget(full_text)
+
+            # Filter 4: Must meet minimum budget (if budget found)
+            # If no budget mentioned, allow it through for manual review
+            if budget is not None and budget < min_budget:
+                continue
+
+            # Extract tech stack
+            tech_stack = sorted(found.get('tech', ()))
+
+            # Skip if it has avoided tech
+            if 'avoid' in found:
+                continue
+
+            # Create lead
+            lead = {
+                'source': 'reddit',
+                'title': title,
+                'description': selftext[:1000],
+                'url': f"https://reddit.com{post_data.get('permalink', '')}",
+                'budget_min': budget if budget else None,
+                'budget_max': budget * 2 if budget else None,  # Rough estimate
+                'tech_stack': tech_stack,
+                'found_at': datetime.now(),
+            }
+
+            leads.append(lead)
 
         return leads
 
-    def search_hackernews(self) -> List[Dict]:
+    async def search_hackernews(self) -> List[Dict]:
         """
         Scrape HackerNews 'Who is Hiring' monthly threads using config
-        """
-        leads = []
 
+        The thread depends on the listing, so the two requests are sequential,
+        but the pair runs alongside the Reddit fetches.
+        """
         try:
             # Find the latest "Who is Hiring" thread
-            url = "https://news.ycombinator.com/submitted?id=whoishiring"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            url = f"{self.hn_base_url}/submitted?id=whoishiring"
+            response = await fetcher.get(url)
+            if response.status != 200:
+                return []
+
+            thread_url = self._find_hn_thread(response.content)
+            if not thread_url:
+                return []
 
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+            # Parse the thread
+            thread_response = await fetcher.get(thread_url)
+            if thread_response.status != 200:
+                return []
+
+            # Large threads take a while to parse; keep the event loop free
+            return await asyncio.to_thread(self._parse_hn_thread, thread_response.content, thread_url)
+
+        except Exception as e:
+            print(f"Error scraping HackerNews: {e}")
+            return []
 
-                # Find "Who is Hiring" links using configured patterns
-                thread_patterns = [t.lower() for t in self.config.sources.hackernews.thread_titles]
-                hiring_links = soup.find_all('a', class_='storylink')
+    def _find_hn_thread(self, html: bytes) -> Optional[str]:
+        """URL of the latest thread whose title matches the configured patterns"""
+        soup = BeautifulSoup(html, 'html.parser')
 
-                for link in hiring_links[:1]:  # Just the latest thread
-                    link_text_lower = link.text.lower()
+        # Find "Who is Hiring" links using configured patterns
+        thread_patterns = [t.lower() for t in self.config.sources.hackernews.thread_titles]
+        hiring_links = soup.find_all('a', class_='storylink')
 
-                    # Match against configured thread patterns
-                    if any(pattern in link_text_lower for pattern in thread_patterns):
-                        thread_url = f"https://news.ycombinator.com/{link.get('href', '')}"
+        for link in hiring_links[:1]:  # Just the latest thread
+            link_text_lower = link.text.lower()
 
-                        # Parse the thread
-                        thread_response = requests.get(thread_url, headers=self.headers, timeout=10)
-                        thread_soup = BeautifulSoup(thread_response.content, 'html.parser')
+            # Match against configured thread patterns
+            if any(pattern in link_text_lower for pattern in thread_patterns):
+                return f"{self.hn_base_url}/{link.get('href', '')}"
 
-                        # Extract job posts (comments)
-                        comments = thread_soup.find_all('div', class_='comment')
+        return None
 
-                        # Get configured keywords
-                        keywords = [k.lower() for k in self.config.sources.hackernews.keywords]
-                        max_comments = self.config.sources.hackernews.max_comments
+    def _parse_hn_thread(self, html: bytes, thread_url: str) -> List[Dict]:
+        """Extract matching job posts from a 'Who is Hiring' thread"""
+        leads = []
+        thread_soup = BeautifulSoup(html, 'html.parser')
 
-                        for comment in comments[:max_comments]:
-                            text = comment.get_text(strip=True)
-                            text_lower = text.lower()
+        # Extract job posts (comments)
+        comments = thread_soup.find_all('div', class_='comment')
 
-                            # Look for positions matching our keywords
-                            if any(keyword in text_lower for keyword in keywords):
-                                # Extract tech stack
-                                tech_stack = self._extract_tech_stack(text)
+        max_comments = self.config.sources.hackernews.max_comments
 
-                                # Only include if it mentions preferred or acceptable tech
-                                preferred = [t.lower() for t in self.config.filters.tech_stack.preferred]
-                                acceptable = [t.lower() for t in self.config.filters.tech_stack.acceptable]
-                                all_acceptable = preferred + acceptable
+        for comment in comments[:max_comments]:
+            text = comment.get_text(strip=True)
+            found = self.matcher.scan(text)
 
-                                has_relevant_tech = any(
-                                    tech.lower() in text_lower for tech in all_acceptable
-                                )
+            # Look for positions matching our keywords
+            if 'hn_keyword' in found:
+                # Only include if it mentions preferred or acceptable tech
+                if 'preferred' not in found and 'acceptable' not in found:
+                    continue
 
-                                if not has_relevant_tech:
-                                    continue
+                # Extract tech stack
+                tech_stack = sorted(found.get('tech', ()))
 
-                                lead = {
-                                    'source': 'hackernews',
-                                    'title': text[:100],  # First 100 chars as title
-                                    'description': text[:1000],
-                                    'url': thread_url,
-                                    'budget_min': None,  # HN doesn't usually list budgets
-                                    'budget_max': None,
-                                    'tech_stack': tech_stack,
-                                    'found_at': datetime.now(),
-                                }
+                # Link the comment itself so each post has its own URL
+                row = comment.find_parent('tr', class_='athing')
+                url = f"{self.hn_base_url}/item?id={row['id']}" if row and row.get('id') else thread_url
 
-                                leads.append(lead)
+                lead = {
+                    'source': 'hackernews',
+                    'title': text[:100],  # First 100 chars as title
+                    'description': text[:1000],
+                    'url': url,
+                    'budget_min': None,  # HN doesn't usually list budgets
+                    'budget_max': None,
+                    'tech_stack': tech_stack,
+                    'found_at': datetime.now(),
+                }
 
-        except Exception as e:
-            print(f"Error scraping HackerNews: {e}")
+                leads.append(lead)
 
         return leads
 
     def _extract_budget(self, text: str) -> int:
         """Extract budget from text using config patterns"""
-        # Use patterns from config
-        for pattern_config in self.config.filters.budget.patterns:
-            pattern = pattern_config['regex']
-            multiplier = pattern_config.get('multiplier', 1)
-
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, multiplier in self._budget_patterns:
+            match = pattern.search(text)
             if match:
                 try:
                     # Get the captured number
@@ -238,25 +286,5 @@ class ScoutAgent:
 
     def _extract_tech_stack(self, text: str) -> List[str]:
         """Extract technologies mentioned in text using config"""
-        # Combine all tech from config
-        all_tech = (
-            self.config.filters.tech_stack.preferred +
-            self.config.filters.tech_stack.acceptable +
-            self.config.filters.tech_stack.avoid
-        )
-
-        found = []
-        text_lower = text.lower()
-
-        for tech in all_tech:
-            # Handle variations like "next.js" vs "nextjs"
-            tech_variations = [
-                tech.lower(),
-                tech.lower().replace('.', ''),
-                tech.lower().replace(' ', ''),
-            ]
-
-            if any(variation in text_lower for variation in tech_variations):
-                found.append(tech)
-
-        return list(set(found))  # Remove duplicates
+        # Variations like "next.js" vs "nextjs" are compiled into the matcher
+        return sorted(self.matcher.scan(text).get('tech', ()))
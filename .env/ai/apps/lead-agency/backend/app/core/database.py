@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -13,6 +13,13 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# create_all() only creates missing tables; columns added to existing ones go here
+MIGRATIONS = [
+    "ALTER TABLE leads ADD COLUMN IF NOT EXISTS dedup_key VARCHAR(64)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS leads_dedup_key_key ON leads (dedup_key)",
+    "CREATE INDEX IF NOT EXISTS ix_leads_score_id ON leads (score, id)",
+]
+
 
 def get_db():
     """Dependency for FastAPI routes"""
@@ -26,3 +33,7 @@ def get_db():
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
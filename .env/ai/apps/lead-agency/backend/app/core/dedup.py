@@ -0,0 +1,180 @@
+"""
+Lead Deduplication - Seen-post store with near-duplicate detection
+Posts are keyed by canonical URL and content hash; reposts with small
+edits (or the same post in several subreddits) are caught by comparing
+SimHashes against recently seen posts.
+"""
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.models.seen_item import SeenItem
+
+SIMHASH_BITS = 64
+SIMHASH_DISTANCE = 8        # Max differing bits for a near-duplicate
+MIN_SIMHASH_WORDS = 8       # Shorter posts are only matched exactly
+NEAR_DUPLICATE_DAYS = 14    # Reposts are compared against this window
+
+_word_pattern = re.compile(r'[a-z0-9]+')
+
+
+def normalize_text(text: str) -> str:
+    return ' '.join(_word_pattern.findall(text.lower()))
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Drop scheme, www., query string, fragment and trailing slash"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/')
+    # HN item links are identified by their query string
+    query = parts.query if path.endswith('/item') else ''
+    return urlunsplit(('', host, path, query, ''))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word counts (unsigned)"""
+    weights = [0] * SIMHASH_BITS
+    for word, count in Counter(normalize_text(text).split()).items():
+        value = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    result = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            result |= 1 << bit
+    return result
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _to_signed(value: int) -> int:
+    # Postgres BIGINT is signed
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
+
+def fingerprint(lead: Dict) -> Dict:
+    """Dedup keys for a scouted lead"""
+    text = lead.get('title', '') + " " + (lead.get('description') or '')
+    url = canonical_url(lead.get('url'))
+    digest = content_hash(text)
+    long_enough = len(normalize_text(text).split()) >= MIN_SIMHASH_WORDS
+    return {
+        'key': hashlib.sha256(url.encode()).hexdigest() if url else digest,
+        'url': url,
+        'content_hash': digest,
+        'simhash': simhash(text) if long_enough else None,
+    }
+
+
+class SeenStore:
+    """Filters scouted posts down to ones no earlier run has processed"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def filter_new(self, leads: List[Dict]) -> List[Dict]:
+        """
+        Drop leads already seen (same URL, same text, or a near-duplicate),
+        including repeats within this batch
+
+        Each kept lead gets a 'dedup_key' and a '_fingerprint' used by mark_seen.
+        """
+        if not leads:
+            return []
+
+        prints = [fingerprint(lead) for lead in leads]
+        known_keys, known_hashes = self._lookup(prints)
+        known_simhashes = self._recent_simhashes()
+
+        new_leads = []
+        for lead, fp in zip(leads, prints):
+            if fp['key'] in known_keys or fp['content_hash'] in known_hashes:
+                continue
+            if fp['simhash'] is not None and any(
+                hamming(fp['simhash'], other) <= SIMHASH_DISTANCE for other in known_simhashes
+            ):
+                continue
+
+            # Later posts in this batch are checked against this one too
+            known_keys.add(fp['key'])
+            known_hashes.add(fp['content_hash'])
+            if fp['simhash'] is not None:
+                known_simhashes.append(fp['simhash'])
+            new_leads.append({**lead, 'dedup_key': fp['key'], '_fingerprint': fp})
+
+        print(f"   Dedup: {len(new_leads)}/{len(leads)} posts are new")
+        return new_leads
+
+    def _lookup(self, prints: List[Dict]) -> Tuple[Set[str], Set[str]]:
+        """Keys and content hashes of stored items matching any print exactly"""
+        rows = (
+            self.db.query(SeenItem.key, SeenItem.content_hash)
+            .filter(or_(
+                SeenItem.key.in_({fp['key'] for fp in prints}),
+                SeenItem.content_hash.in_({fp['content_hash'] for fp in prints}),
+            ))
+            .all()
+        )
+        return {row.key for row in rows}, {row.content_hash for row in rows}
+
+    def _recent_simhashes(self) -> List[int]:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=NEAR_DUPLICATE_DAYS)
+        rows = (
+            self.db.query(SeenItem.simhash)
+            .filter(SeenItem.simhash.isnot(None), SeenItem.last_seen >= cutoff)
+            .all()
+        )
+        return [_to_unsigned(row.simhash) for row in rows]
+
+    def mark_seen(self, leads: Iterable[Dict], lead_ids: Optional[Dict[str, int]] = None):
+        """Record processed leads; lead_ids maps dedup_key -> stored Lead id"""
+        lead_ids = lead_ids or {}
+        rows = {}
+        for lead in leads:
+            fp = lead.get('_fingerprint') or fingerprint(lead)
+            # One row per key; ON CONFLICT can't touch the same row twice
+            rows[fp['key']] = {
+                'key': fp['key'],
+                'source': lead.get('source'),
+                'url': fp['url'],
+                'content_hash': fp['content_hash'],
+                'simhash': _to_signed(fp['simhash']) if fp['simhash'] is not None else None,
+                'lead_id': lead_ids.get(fp['key']),
+            }
+        if not rows:
+            return
+
+        stmt = insert(SeenItem).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SeenItem.key],
+            set_={
+                'last_seen': func.now(),
+                'lead_id': func.coalesce(stmt.excluded.lead_id, SeenItem.lead_id),
+            },
+        )
+        self.db.execute(stmt)
+        self.db.commit()
@@ -0,0 +1,182 @@
+"""
+Async HTTP Fetcher - Shared pooled client for lead sources
+Bounds concurrency per host, revalidates cached pages with
+ETag/If-Modified-Since and retries transient failures with jittered backoff.
+"""
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+MAX_CONNECTIONS = 20        # Pool size across all hosts
+MAX_PER_HOST = 4            # Concurrent requests to any one host
+DEFAULT_TIMEOUT = 15.0      # Seconds per attempt
+MAX_RETRIES = 3             # Retries after the first attempt
+BACKOFF_BASE = 0.5          # Seconds; doubles each retry
+BACKOFF_MAX = 30.0          # Cap for backoff and Retry-After
+CACHE_SIZE = 256            # Responses kept for conditional revalidation
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    content: bytes
+    not_modified: bool = False  # Served from cache after a 304
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class HttpFetcher:
+    """Pooled async client shared by every scout source"""
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_per_host: int = MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = MAX_RETRIES,
+    ):
+        self.headers = headers or {}
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.retries = retries
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+        # Cache key -> (etag, last_modified, body); survives across scans
+        self._cache: Dict[str, Tuple[Optional[str], Optional[str], bytes]] = {}
+        self.stats = {"requests": 0, "not_modified": 0, "retries": 0, "errors": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Connections and semaphores belong to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        if response is not None:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, BACKOFF_MAX)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def _remember(self, key: str, response: httpx.Response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        self._cache.pop(key, None)
+        if not etag and not last_modified:
+            return
+        self._cache[key] = (etag, last_modified, response.content)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.pop(next(iter(self._cache)))
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> FetchResult:
+        """
+        GET a URL, revalidating against the cached copy when there is one
+
+        Raises httpx.HTTPError once retries are exhausted.
+        """
+        client = self._get_client()
+        key = f"{url}?{urlencode(sorted((params or {}).items()))}"
+        headers = {}
+        cached = self._cache.get(key)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with self._host_limit(url):
+                    self.stats["requests"] += 1
+                    response = await client.get(url, params=params, headers=headers)
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if attempt >= self.retries:
+                    response.raise_for_status()
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    self.stats["errors"] += 1
+                    raise
+            except httpx.HTTPStatusError:
+                self.stats["errors"] += 1
+                raise
+
+            # Sleep outside the host slot so other requests can use it
+            delay = self._backoff(attempt, response)
+            attempt += 1
+            self.stats["retries"] += 1
+            print(f"Retrying {url} in {delay:.1f}s (attempt {attempt}/{self.retries})")
+            await asyncio.sleep(delay)
+
+        if response.status_code == 304 and cached:
+            self.stats["not_modified"] += 1
+            return FetchResult(url=url, status=200, content=cached[2], not_modified=True)
+
+        if response.status_code == 200:
+            self._remember(key, response)
+        return FetchResult(url=url, status=response.status_code, content=response.content)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# Global fetcher instance
+fetcher = HttpFetcher(headers={
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
+})
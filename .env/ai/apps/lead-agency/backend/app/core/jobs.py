@@ -0,0 +1,241 @@
+"""
+Search Jobs - Per-search state, progress events, cancellation and run records
+The pipeline runs on a worker thread and reports through its SearchJob;
+API handlers on the event loop read state and stream events from it.
+"""
+import asyncio
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.database import SessionLocal
+from app.models.search_run import SearchRun
+
+MAX_CONCURRENT_SEARCHES = 2   # Further searches wait as 'queued'
+JOB_HISTORY = 50              # Finished jobs kept in memory for status/events
+MAX_EVENTS = 5000             # Events kept per job for late subscribers
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class SearchCancelled(Exception):
+    """Raised inside the pipeline once a job has been cancelled"""
+
+
+class SearchJob:
+    """State of one search; pipeline methods are safe to call from any thread"""
+
+    def __init__(self, search_id: str, params: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+        self.id = search_id
+        self.params = params
+        self.status = 'queued'
+        self.stage: Optional[str] = None
+        self.stage_timings: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+        self._loop = loop
+        self._cancel = threading.Event()
+        self._events: List[Dict[str, Any]] = []
+        self._seq = 0
+        self._subscribers: List[asyncio.Queue] = []
+        self.task: Optional[asyncio.Task] = None
+
+    # ---- pipeline side (worker thread) ----
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise SearchCancelled()
+
+    @contextmanager
+    def timed_stage(self, name: str):
+        """Time a pipeline stage; cancellation is checked on entry"""
+        self.check_cancelled()
+        self.stage = name
+        self.emit('stage', stage=name, state='started')
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = round(time.perf_counter() - started, 3)
+            self.stage_timings[name] = round(self.stage_timings.get(name, 0) + seconds, 3)
+            self.emit('stage', stage=name, state='finished', seconds=seconds)
+
+    def count(self, name: str, amount: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def emit(self, event_type: str, **data):
+        event = {'type': event_type, 'time': datetime.now(timezone.utc).isoformat(), **data}
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+        except RuntimeError:
+            pass  # Event loop closed during shutdown
+
+    # ---- event loop side ----
+
+    def _dispatch(self, event: Dict[str, Any]):
+        self._seq += 1
+        event['id'] = self._seq
+        self._events.append(event)
+        if len(self._events) > MAX_EVENTS:
+            del self._events[0]
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def subscribe(self) -> Tuple[List[Dict[str, Any]], asyncio.Queue]:
+        """Events so far plus a queue of everything after them"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return list(self._events), queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def cancel(self):
+        if self.status not in TERMINAL_STATUSES:
+            self._cancel.set()
+            self.emit('cancel_requested')
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def _set_status(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        now = datetime.now(timezone.utc)
+        if status == 'running':
+            self.started_at = now
+        elif status in TERMINAL_STATUSES:
+            self.finished_at = now
+            self.stage = None
+        self.emit('status', status=status, error=error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'search_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'params': self.params,
+            'stage_timings': dict(self.stage_timings),
+            'counts': dict(self.counts),
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobManager:
+    """Runs search jobs on worker threads, a few at a time"""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_SEARCHES, history: int = JOB_HISTORY):
+        self.max_concurrent = max_concurrent
+        self.history = history
+        self._jobs: "OrderedDict[str, SearchJob]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def create(self, params: Dict[str, Any]) -> SearchJob:
+        """Register a queued job; call from the event loop"""
+        search_id = f"search_{int(datetime.now().timestamp())}_{secrets.token_hex(3)}"
+        job = SearchJob(search_id, params, asyncio.get_running_loop())
+        self._jobs[search_id] = job
+        self._trim()
+        return job
+
+    def start(self, job: SearchJob, target: Callable[[SearchJob], None]):
+        """Run target(job) on a worker thread once a slot is free"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        job.task = asyncio.get_running_loop().create_task(self._run(job, target))
+
+    async def _run(self, job: SearchJob, target: Callable[[SearchJob], None]):
+        await asyncio.to_thread(save_run, job)
+        async with self._slots:
+            if job.cancelled:
+                job._set_status('cancelled')
+            else:
+                job._set_status('running')
+                await asyncio.to_thread(save_run, job)
+                try:
+                    await asyncio.to_thread(target, job)
+                    job._set_status('completed')
+                except SearchCancelled:
+                    job._set_status('cancelled')
+                except Exception as e:
+                    print(f"Search {job.id} failed: {e}")
+                    job._set_status('failed', error=str(e))
+        await asyncio.to_thread(save_run, job)
+
+    def get(self, search_id: str) -> Optional[SearchJob]:
+        return self._jobs.get(search_id)
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    async def close(self):
+        """Cancel running searches and wait for their threads to notice"""
+        tasks = []
+        for job in self._jobs.values():
+            job.cancel()
+            if job.task:
+                tasks.append(job.task)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def save_run(job: SearchJob):
+    """Upsert the job's run record; failures are logged, not raised"""
+    db = SessionLocal()
+    try:
+        db.merge(SearchRun(
+            id=job.id,
+            params=job.params,
+            status=job.status,
+            stage_timings=job.stage_timings,
+            counts=job.counts,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Failed to save search run {job.id}: {e}")
+    finally:
+        db.close()
+
+
+def run_record(run: SearchRun) -> Dict[str, Any]:
+    """Stored run in the same shape as SearchJob.snapshot()"""
+    return {
+        'search_id': run.id,
+        'status': run.status,
+        'stage': None,
+        'params': run.params,
+        'stage_timings': run.stage_timings or {},
+        'counts': run.counts or {},
+        'error': run.error,
+        'created_at': run.created_at.isoformat() if run.created_at else None,
+        'started_at': run.started_at.isoformat() if run.started_at else None,
+        'finished_at': run.finished_at.isoformat() if run.finished_at else None,
+    }
+
+
+# Global job manager
+job_manager = JobManager()
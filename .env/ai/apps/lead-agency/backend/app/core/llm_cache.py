@@ -0,0 +1,166 @@
+"""
+LLM Response Cache - Persistent prompt-keyed cache in front of the Ollama cluster
+Re-running a search on postings we've already processed returns the stored
+research and drafts instead of regenerating them.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+
+from app.core.database import SessionLocal
+from app.core.ollama_client import ollama_cluster
+from app.models.llm_cache_entry import LLMCacheEntry
+
+LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))       # One week
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+PRUNE_EVERY = 100  # Writes between expiry/size sweeps
+
+_whitespace = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompts differing only in whitespace share an entry"""
+    return _whitespace.sub(' ', prompt).strip()
+
+
+def cache_key(model: str, prompt: str, options: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"model": model, "prompt": normalize_prompt(prompt), "options": options},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    Postgres-backed response cache with TTL and LRU size bound
+
+    Safe to call from worker threads: every operation uses its own session.
+    Cache failures are logged and bypassed, never raised to the caller.
+    """
+
+    def __init__(self, ttl_hours: int = LLM_CACHE_TTL_HOURS, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self.enabled = ttl_hours > 0 and max_entries > 0
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "evicted": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        db = SessionLocal()
+        try:
+            # Lookup and LRU bookkeeping in one round trip
+            response = db.execute(
+                update(LLMCacheEntry)
+                .where(LLMCacheEntry.key == key, LLMCacheEntry.created_at >= cutoff)
+                .values(hits=LLMCacheEntry.hits + 1, last_used_at=func.now())
+                .returning(LLMCacheEntry.response)
+            ).scalar_one_or_none()
+            db.commit()
+        finally:
+            db.close()
+
+        self._count("hits" if response is not None else "misses")
+        return response
+
+    def put(self, key: str, model: str, response: str):
+        db = SessionLocal()
+        try:
+            stmt = insert(LLMCacheEntry).values(key=key, model=model, response=response, hits=0)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[LLMCacheEntry.key],
+                set_={
+                    'response': stmt.excluded.response,
+                    'created_at': func.now(),
+                    'last_used_at': func.now(),
+                }
+            )
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        db = SessionLocal()
+        try:
+            expired = db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < cutoff))
+            overflow = (
+                select(LLMCacheEntry.key)
+                .order_by(LLMCacheEntry.last_used_at.desc())
+                .offset(self.max_entries)
+            )
+            evicted = db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(overflow)))
+            db.commit()
+            self._count("evicted", expired.rowcount + evicted.rowcount)
+        except Exception as e:
+            db.rollback()
+            self._count("errors")
+            print(f"LLM cache prune failed: {e}")
+        finally:
+            db.close()
+
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        node: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> str:
+        """ollama_cluster.generate with a cache lookup first; errors are never cached"""
+        if not self.enabled:
+            return ollama_cluster.generate(model, prompt, node, temperature, max_tokens)
+
+        key = cache_key(model, prompt, {"temperature": temperature, "max_tokens": max_tokens})
+        try:
+            cached = self.get(key)
+        except Exception as e:
+            self._count("errors")
+            print(f"LLM cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            return cached
+
+        response = ollama_cluster.generate(model, prompt, node, temperature, max_tokens)
+
+        try:
+            self.put(key, model, response)
+        except Exception as e:
+            self._count("errors")
+            print(f"LLM cache write failed: {e}")
+        return response
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        stats["enabled"] = self.enabled
+        return stats
+
+
+# Global instance
+llm_cache = LLMCache()
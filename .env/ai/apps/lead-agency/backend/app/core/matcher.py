@@ -0,0 +1,137 @@
+"""
+Keyword Matcher - Single-pass phrase matching for lead filters and scoring
+Every keyword list (subreddit keywords, tech stack, quality indicators, ...)
+is compiled into one Aho-Corasick automaton, so scanning a post costs one
+pass over its text no matter how many keywords are configured.
+"""
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config.settings import config
+
+try:
+    import ahocorasick
+except ImportError:  # Falls back to one substring check per phrase
+    ahocorasick = None
+
+# Fixed word lists used by the scout and qualifier
+HIRING_WORDS = ['hiring', 'looking for', 'need developer', 'seeking']
+REQUIREMENT_WORDS = ['require', 'requirement', 'specification', 'feature', 'must have']
+DESCRIPTION_TIMELINE_WORDS = ['timeline', 'deadline', 'delivery', 'week', 'month']
+TIMELINE_WORDS = ['timeline', 'deadline', 'delivery date']
+URGENT_WORDS = ['asap', 'urgent', 'immediately']
+ONGOING_WORDS = ['ongoing', 'long-term', 'maintenance', 'retainer']
+EXAMPLE_WORDS = ['portfolio', 'examples', 'previous work', 'samples']
+UNREALISTIC_WORDS = ['like facebook', 'like uber', 'like amazon', 'clone']
+
+SEPARATOR = '\x00'  # Joins texts for batch scans
+
+
+class KeywordMatcher:
+    """
+    Finds which keyword classes occur in a text, with `phrase in text`
+    semantics (case-insensitive substring, overlaps included)
+    """
+
+    def __init__(self):
+        # Phrase -> [(class, label)]
+        self._phrases: Dict[str, List[Tuple[str, str]]] = {}
+        self._automaton = None
+        self._compiled = False
+
+    def add(self, cls: str, phrases: Iterable[str], label: Optional[str] = None):
+        """Register phrases under a class; matches report `label` or the phrase itself"""
+        for phrase in phrases:
+            phrase = phrase.lower()
+            if phrase and SEPARATOR not in phrase:
+                self._phrases.setdefault(phrase, []).append((cls, label or phrase))
+        self._compiled = False
+
+    def compile(self) -> 'KeywordMatcher':
+        self._automaton = None
+        if ahocorasick is not None and self._phrases:
+            automaton = ahocorasick.Automaton()
+            for phrase in self._phrases:
+                automaton.add_word(phrase, phrase)
+            automaton.make_automaton()
+            self._automaton = automaton
+        self._compiled = True
+        return self
+
+    def _collect(self, phrases: Iterable[str]) -> Dict[str, Set[str]]:
+        found: Dict[str, Set[str]] = {}
+        for phrase in phrases:
+            for cls, label in self._phrases[phrase]:
+                found.setdefault(cls, set()).add(label)
+        return found
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """Class -> labels found in text"""
+        if not self._compiled:
+            self.compile()
+        text = text.lower()
+        if self._automaton is not None:
+            return self._collect({phrase for _, phrase in self._automaton.iter(text)})
+        return self._collect(phrase for phrase in self._phrases if phrase in text)
+
+    def scan_many(self, texts: List[str]) -> List[Dict[str, Set[str]]]:
+        """scan() for a batch of texts, in a single automaton pass when available"""
+        if not self._compiled:
+            self.compile()
+        if self._automaton is None:
+            return [self.scan(text) for text in texts]
+
+        lowered = [text.lower() for text in texts]
+        starts = []
+        position = 0
+        for text in lowered:
+            starts.append(position)
+            position += len(text) + len(SEPARATOR)
+
+        # No phrase contains the separator, so matches never span two texts
+        hits: List[Set[str]] = [set() for _ in texts]
+        for end, phrase in self._automaton.iter(SEPARATOR.join(lowered)):
+            hits[bisect_right(starts, end) - 1].add(phrase)
+        return [self._collect(phrases) for phrases in hits]
+
+
+def tech_variations(tech: str) -> List[str]:
+    """Spellings that count as a mention, e.g. "next.js" / "nextjs" """
+    tech = tech.lower()
+    return [tech, tech.replace('.', ''), tech.replace(' ', '')]
+
+
+def build_lead_matcher(cfg=config) -> KeywordMatcher:
+    """Compile every keyword list the scout and qualifier check"""
+    matcher = KeywordMatcher()
+
+    for subreddit in cfg.sources.reddit.subreddits:
+        matcher.add(f"subreddit:{subreddit['name']}", subreddit['keywords'])
+        matcher.add(f"subreddit_exclude:{subreddit['name']}", subreddit.get('exclude_keywords', []))
+    matcher.add('hn_keyword', cfg.sources.hackernews.keywords)
+
+    tech_stack = cfg.filters.tech_stack
+    matcher.add('preferred', tech_stack.preferred)
+    matcher.add('acceptable', tech_stack.acceptable)
+    matcher.add('avoid', tech_stack.avoid)
+    for tech in tech_stack.preferred + tech_stack.acceptable + tech_stack.avoid:
+        matcher.add('tech', tech_variations(tech), label=tech)
+
+    matcher.add('red_flag', cfg.filters.quality_indicators['red_flags'])
+    matcher.add('company', cfg.scoring.client_quality_scoring['company_indicators'])
+    matcher.add('startup', cfg.scoring.client_quality_scoring['startup_indicators'])
+
+    matcher.add('hiring', HIRING_WORDS)
+    matcher.add('requirements', REQUIREMENT_WORDS)
+    matcher.add('description_timeline', DESCRIPTION_TIMELINE_WORDS)
+    matcher.add('timeline', TIMELINE_WORDS)
+    matcher.add('urgent', URGENT_WORDS)
+    matcher.add('ongoing', ONGOING_WORDS)
+    matcher.add('examples', EXAMPLE_WORDS)
+    matcher.add('unrealistic', UNREALISTIC_WORDS)
+
+    return matcher.compile()
+
+
+# Global matcher instance, shared by the scout and qualifier
+lead_matcher = build_lead_matcher()
@@ -1,7 +1,80 @@
 import ollama
 import os
-import random
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+# Concurrent generations per node; more just queue inside Ollama and time out
+NODE_CONCURRENCY = int(os.getenv("OLLAMA_NODE_CONCURRENCY", "2"))
+MODEL_REFRESH_INTERVAL = 60.0   # Seconds between model/health probes
+PROBE_TIMEOUT = 5.0             # Seconds for a probe request
+GENERATE_TIMEOUT = 300.0        # Seconds for a generation request
+MAX_FAILURES = 3                # Consecutive failures before a node is skipped
+LATENCY_SMOOTHING = 0.3         # EWMA weight of the newest latency sample
+
+
+class OllamaNode:
+    """One Ollama endpoint: a persistent client plus its health and models"""
+
+    def __init__(self, name: str, endpoint: str):
+        self.name = name
+        self.endpoint = endpoint
+        # Each client keeps a keep-alive connection pool to its node
+        self.client = ollama.Client(host=endpoint, timeout=GENERATE_TIMEOUT)
+        self.probe_client = ollama.Client(host=endpoint, timeout=PROBE_TIMEOUT)
+        self.slots = threading.BoundedSemaphore(NODE_CONCURRENCY)
+
+        self.models: Set[str] = set()
+        self.failures = 0           # Consecutive failed requests or probes
+        self.latency = 1.0          # EWMA seconds per successful request
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def healthy(self) -> bool:
+        return self.failures < MAX_FAILURES
+
+    def has_model(self, model: str) -> bool:
+        # Tags are optional in requests ("gemma3" means "gemma3:latest")
+        return model in self.models or f"{model}:latest" in self.models
+
+    def cost(self) -> float:
+        """Lower is better: slow, busy or failing nodes are tried later"""
+        return self.latency * (1 + self.in_flight) * (1 + self.failures)
+
+    def track(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+
+    def record_success(self, seconds: float):
+        with self._lock:
+            self.failures = 0
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def probe(self) -> bool:
+        """Refresh the model list; also serves as the health check"""
+        try:
+            response = self.probe_client.list()
+        except Exception as e:
+            print(f"Ollama node {self.name} unreachable: {e}")
+            self.record_failure()
+            return False
+        self.models = {m['name'] for m in response.get('models', [])}
+        with self._lock:
+            self.failures = 0
+        return True
+
+    def close(self):
+        """Close both connection pools (ollama.Client has no close() of its own)"""
+        for client in (self.client, self.probe_client):
+            pool = getattr(client, '_client', None)
+            if pool is not None:
+                pool.close()
 
 
 class OllamaCluster:
@@ -22,6 +95,58 @@ class OllamaCluster:
             "callbox": "http://192.168.12.9:11434",    # L4: quick tasks
         }
 
+        # One OllamaNode per endpoint, named after its specialization when it has one
+        names = {endpoint: name for name, endpoint in self.nodes.items()}
+        self._nodes: Dict[str, OllamaNode] = {}
+        for endpoint in list(self.nodes.values()) + self.endpoints:
+            if endpoint not in self._nodes:
+                self._nodes[endpoint] = OllamaNode(names.get(endpoint, endpoint), endpoint)
+
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def refresh(self):
+        """Probe every node in parallel for its models and health"""
+        with ThreadPoolExecutor(max_workers=len(self._nodes)) as pool:
+            list(pool.map(OllamaNode.probe, self._nodes.values()))
+
+    def _ensure_refresh(self):
+        # The first caller probes synchronously, then a daemon thread takes over
+        with self._refresh_lock:
+            if self._refresh_thread is not None:
+                return
+            self.refresh()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, name="ollama-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(MODEL_REFRESH_INTERVAL):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Ollama refresh failed: {e}")
+
+    def _candidates(self, model: str, node: Optional[str]) -> List[OllamaNode]:
+        """Nodes to try, in order: the requested node, then the cheapest others holding the model"""
+        preferred = self._nodes.get(self.nodes.get(node or "hostbox", ""))
+
+        holders = [n for n in self._nodes.values() if n.has_model(model)]
+        if not holders:
+            # Model map may be stale or the node unreachable at the last probe;
+            # only the requested node is worth a try
+            return [preferred] if preferred else []
+
+        healthy = sorted((n for n in holders if n.healthy), key=OllamaNode.cost)
+        failing = sorted((n for n in holders if not n.healthy), key=OllamaNode.cost)
+        ordered = healthy + failing
+        if preferred in healthy:
+            ordered.remove(preferred)
+            ordered.insert(0, preferred)
+        return ordered
+
     def generate(
         self,
         model: str,
@@ -36,51 +161,77 @@ class OllamaCluster:
         Args:
             model: Model name (e.g., "qwen2.5:14b")
             prompt: Input prompt
-            node: Specific node to use (hostbox, workbox, helpbox, callbox)
+            node: Preferred node (hostbox, workbox, helpbox, callbox); defaults to
+                hostbox for reasoning tasks. Other nodes holding the model are
+                used when it is unhealthy or fails.
             temperature: Sampling temperature
             max_tokens: Max tokens to generate
 
         Returns:
             Generated text
         """
-        # Choose endpoint
-        if node and node in self.nodes:
-            endpoint = self.nodes[node]
-        else:
-            # Use hostbox as default for reasoning tasks
-            endpoint = self.nodes["hostbox"]
+        self._ensure_refresh()
 
-        try:
-            # Create client for specific endpoint
-            client = ollama.Client(host=endpoint)
-
-            # Generate response
-            response = client.generate(
-                model=model,
-                prompt=prompt,
-                options={
-                    "temperature": temperature,
-                    "num_predict": max_tokens,
-                }
-            )
+        candidates = self._candidates(model, node)
+        if not candidates:
+            raise RuntimeError(f"No Ollama node has model {model}")
 
-            return response['response']
+        last_error: Optional[Exception] = None
+        remaining = list(candidates)
+        while remaining:
+            target = self._acquire(remaining)
+            remaining.remove(target)
+            try:
+                target.track(1)
+                started = time.monotonic()
+                try:
+                    response = target.client.generate(
+                        model=model,
+                        prompt=prompt,
+                        options={
+                            "temperature": temperature,
+                            "num_predict": max_tokens,
+                        }
+                    )
+                finally:
+                    target.track(-1)
+                    target.slots.release()
 
-        except Exception as e:
-            print(f"Error with {endpoint}: {e}")
-            # Fallback to another endpoint
-            if len(self.endpoints) > 1:
-                fallback = random.choice([e for e in self.endpoints if e != endpoint])
-                print(f"Trying fallback: {fallback}")
-                client = ollama.Client(host=fallback)
-                response = client.generate(
-                    model=model,
-                    prompt=prompt,
-                    options={"temperature": temperature, "num_predict": max_tokens}
-                )
+                target.record_success(time.monotonic() - started)
                 return response['response']
-            else:
-                raise
+
+            except ollama.ResponseError as e:
+                last_error = e
+                print(f"Error with {target.name}: {e}")
+                if e.status_code == 404:
+                    # Model was removed since the last probe
+                    target.models.discard(model)
+                    target.models.discard(f"{model}:latest")
+                else:
+                    target.record_failure()
+
+            except Exception as e:
+                last_error = e
+                print(f"Error with {target.name}: {e}")
+                target.record_failure()
+
+        raise last_error
+
+    def _acquire(self, candidates: List[OllamaNode]) -> OllamaNode:
+        """
+        Take a slot on the first candidate with one free, so bursts spill over
+        to other nodes holding the model; if all are busy, wait for the first
+        """
+        for candidate in candidates:
+            if candidate.healthy and candidate.slots.acquire(blocking=False):
+                return candidate
+        candidates[0].slots.acquire()
+        return candidates[0]
+
+    def close(self):
+        self._stop.set()
+        for node in self._nodes.values():
+            node.close()
 
 
 # Global instance
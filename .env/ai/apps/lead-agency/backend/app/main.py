@@ -1,16 +1,27 @@
 """
 Lead Agency FastAPI Application
 """
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
+import asyncio
+import json
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from app.core.database import get_db, init_db
+from app.core.database import SessionLocal, get_db, init_db
+from app.core.dedup import SeenStore
+from app.core.jobs import SearchCancelled, SearchJob, TERMINAL_STATUSES, job_manager, run_record
+from app.core.llm_cache import llm_cache
+from app.core.ollama_client import ollama_cluster
 from app.models.lead import Lead
+from app.models.search_run import SearchRun
 from app.agents.scout import ScoutAgent
 from app.agents.qualifier import QualifierAgent
 from app.agents.researcher import ResearcherAgent
@@ -26,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Lead list paging; browsers hide other headers cross-origin
 )
 
 # Initialize database on startup
@@ -35,6 +47,12 @@ async def startup():
     print("✅ Database initialized")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await job_manager.close()
+    ollama_cluster.close()
+
+
 # ============================================================================
 # Pydantic Models (Request/Response schemas)
 # ============================================================================
@@ -92,47 +110,133 @@ async def root():
 
 
 @app.post("/api/search")
-async def start_search(
-    request: SearchRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+async def start_search(request: SearchRequest):
     """
     Start a lead search campaign
 
-    This runs in the background and processes leads through all agents
+    This runs in the background and processes leads through all agents.
+    Follow it with GET /api/search/{search_id}/events, stop it with
+    POST /api/search/{search_id}/cancel.
     """
-    search_id = f"search_{int(datetime.now().timestamp())}"
-
-    # Add background task
-    background_tasks.add_task(
-        run_lead_search,
-        db=db,
-        search_id=search_id,
-        categories=request.categories,
-        min_budget=request.min_budget,
-        sources=request.sources,
-        min_score=request.min_score
-    )
+    job = job_manager.create(request.model_dump())
+    job_manager.start(job, run_lead_search)
 
     return {
-        "search_id": search_id,
-        "status": "running",
+        "search_id": job.id,
+        "status": job.status,
         "sources_count": len(request.sources),
         "estimated_time": "5-10 minutes"
     }
 
 
+@app.get("/api/search")
+async def list_searches(limit: int = 20, db: Session = Depends(get_db)):
+    """Recent search runs, newest first"""
+    runs = db.query(SearchRun).order_by(SearchRun.created_at.desc()).limit(limit).all()
+    return [_search_state(run) for run in runs]
+
+
+@app.get("/api/search/{search_id}")
+async def get_search(search_id: str, db: Session = Depends(get_db)):
+    """Status, counts and per-stage timings of a search"""
+    job = job_manager.get(search_id)
+    if job:
+        return job.snapshot()
+
+    run = db.get(SearchRun, search_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Search not found")
+    return run_record(run)
+
+
+def _search_state(run: SearchRun) -> dict:
+    # A live job is fresher than its stored record
+    job = job_manager.get(run.id)
+    return job.snapshot() if job else run_record(run)
+
+
+@app.post("/api/search/{search_id}/cancel")
+async def cancel_search(search_id: str):
+    """Stop a queued or running search; leads stored so far are kept"""
+    job = job_manager.get(search_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Search not found or no longer running")
+    job.cancel()
+    return job.snapshot()
+
+
+SSE_KEEPALIVE = 15  # Seconds between comments on an idle event stream
+
+
+@app.get("/api/search/{search_id}/events")
+async def search_events(search_id: str, request: Request):
+    """
+    Server-sent events for a search: stage start/finish, each lead as it is
+    scored, stored and enriched, and status changes
+
+    Replays earlier events first, so connecting late misses nothing. The
+    stream ends after the final status event.
+    """
+    job = job_manager.get(search_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Search not found or no longer running")
+
+    last_id = int(request.headers.get("last-event-id", 0) or 0)
+
+    async def stream():
+        history, queue = job.subscribe()
+        try:
+            for event in history:
+                if event['id'] > last_id:
+                    yield _format_event(event)
+                if _is_final(event):
+                    return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_event(event)
+                if _is_final(event):
+                    return
+        finally:
+            job.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _is_final(event: dict) -> bool:
+    return event['type'] == 'status' and event['status'] in TERMINAL_STATUSES
+
+
+def _format_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
 @app.get("/api/leads", response_model=List[LeadResponse])
 async def get_leads(
+    response: Response,
     min_score: int = 0,
     status: Optional[str] = None,
     source: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     skip: int = 0,
     db: Session = Depends(get_db)
 ):
-    """Get list of leads with filters"""
+    """
+    Get list of leads with filters
+
+    Pages by keyset: pass the X-Next-Cursor header of one page as `cursor`
+    to get the next. `skip` still works but scans every skipped row.
+    """
 
     query = db.query(Lead)
 
@@ -146,15 +250,32 @@ async def get_leads(
     if source:
         query = query.filter(Lead.source == source)
 
-    # Order by score descending
-    query = query.order_by(Lead.score.desc())
+    # Resume after the last row of the previous page
+    if cursor:
+        last_score, last_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Lead.score, Lead.id) < tuple_(last_score, last_id))
+    elif skip:
+        query = query.offset(skip)
+
+    # Order by score descending (id breaks ties so pages are stable)
+    query = query.order_by(Lead.score.desc(), Lead.id.desc())
 
-    # Pagination
-    leads = query.offset(skip).limit(limit).all()
+    leads = query.limit(limit).all()
+
+    if len(leads) == limit:
+        response.headers["X-Next-Cursor"] = f"{leads[-1].score}:{leads[-1].id}"
 
     return leads
 
 
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        score, lead_id = cursor.split(":")
+        return int(score), int(lead_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/leads/{lead_id}", response_model=LeadDetailResponse)
 async def get_lead(lead_id: int, db: Session = Depends(get_db)):
     """Get full lead details"""
@@ -167,52 +288,223 @@ async def get_lead(lead_id: int, db: Session = Depends(get_db)):
     return lead
 
 
-@app.get("/api/stats")
-async def get_stats(db: Session = Depends(get_db)):
-    """Get statistics about leads"""
+STATS_CACHE_TTL = 60  # Seconds; bounds staleness from writers in other processes
 
-    total = db.query(Lead).count()
-    qualified = db.query(Lead).filter(Lead.qualified == True).count()
-    avg_score = db.query(Lead).with_entities(Lead.score).all()
+_stats_cache = {"summary": None, "expires": 0.0, "generation": 0}
 
-    # Calculate average
-    if avg_score:
-        avg = sum([s[0] for s in avg_score if s[0]]) / len([s for s in avg_score if s[0]])
-    else:
-        avg = 0
 
-    # By source
-    sources = db.query(Lead.source, func.count(Lead.id)).group_by(Lead.source).all()
+def invalidate_stats():
+    """Call after writing leads"""
+    _stats_cache["generation"] += 1
+    _stats_cache["summary"] = None
 
-    return {
-        "total_leads": total,
-        "qualified_leads": qualified,
-        "average_score": round(avg, 1),
-        "by_source": {source: count for source, count in sources}
+
+@app.get("/api/stats")
+async def get_stats(db: Session = Depends(get_db)):
+    """Get statistics about leads (cached until the next write)"""
+
+    now = time.monotonic()
+    if _stats_cache["summary"] is not None and now < _stats_cache["expires"]:
+        return _stats_cache["summary"]
+
+    generation = _stats_cache["generation"]
+    summary = _compute_stats(db)
+
+    # Don't cache a summary that a write made stale while it was computed
+    if generation == _stats_cache["generation"]:
+        _stats_cache["summary"] = summary
+        _stats_cache["expires"] = now + STATS_CACHE_TTL
+
+    return summary
+
+
+def _compute_stats(db: Session) -> dict:
+    """All lead statistics from one grouped query"""
+
+    scored = Lead.score > 0  # Unscored leads don't count towards score stats
+    rows = (
+        db.query(
+            Lead.source,
+            Lead.status,
+            func.grouping(Lead.source).label("by_source"),
+            func.grouping(Lead.status).label("by_status"),
+            func.count(Lead.id).label("total"),
+            func.count(Lead.id).filter(Lead.qualified == True).label("qualified"),
+            func.avg(Lead.score).filter(scored).label("avg_score"),
+            func.percentile_cont(0.5).within_group(Lead.score).filter(scored).label("p50"),
+            func.percentile_cont(0.9).within_group(Lead.score).filter(scored).label("p90"),
+        )
+        .group_by(func.grouping_sets(tuple_(), tuple_(Lead.source), tuple_(Lead.status)))
+        .all()
+    )
+
+    summary = {
+        "total_leads": 0,
+        "qualified_leads": 0,
+        "average_score": 0,
+        "score_percentiles": {"p50": None, "p90": None},
+        "by_source": {},
+        "by_status": {},
     }
+    for row in rows:
+        if row.by_source and row.by_status:
+            # Grand total
+            summary["total_leads"] = row.total
+            summary["qualified_leads"] = row.qualified
+            summary["average_score"] = round(float(row.avg_score or 0), 1)
+            summary["score_percentiles"] = {
+                "p50": round(row.p50, 1) if row.p50 is not None else None,
+                "p90": round(row.p90, 1) if row.p90 is not None else None,
+            }
+        elif row.by_status:
+            summary["by_source"][row.source] = row.total
+        else:
+            summary["by_status"][row.status] = row.total
+
+    return summary
+
+
+@app.get("/api/llm-cache")
+async def get_llm_cache_stats():
+    """Hit rate and eviction counts for the LLM response cache (since startup)"""
+    return llm_cache.get_stats()
 
 
 # ============================================================================
 # Background Task - Lead Search Pipeline
 # ============================================================================
 
-def run_lead_search(
+RESEARCH_MIN_SCORE = 80       # Leads scoring this high get research + outreach
+ENRICH_WORKERS = 8            # Leads enriched at once (Ollama nodes apply their own limits)
+ENRICH_BATCH_SIZE = 20        # Enriched leads written back per commit
+
+
+def _store_qualified_leads(db: Session, qualified: List[tuple]) -> Dict[str, int]:
+    """Upsert qualified leads in a single statement; returns dedup_key -> lead id"""
+    if not qualified:
+        return {}
+
+    rows = [
+        {
+            'source': lead_data['source'],
+            'title': lead_data['title'],
+            'description': lead_data.get('description'),
+            'url': lead_data.get('url'),
+            'dedup_key': lead_data['dedup_key'],
+            'budget_min': lead_data.get('budget_min'),
+            'budget_max': lead_data.get('budget_max'),
+            'tech_stack': lead_data.get('tech_stack', []),
+            'score': score,
+            'score_breakdown': breakdown,
+            'qualified': True,
+            'status': 'qualified',
+        }
+        for lead_data, score, breakdown in qualified
+    ]
+
+    stmt = insert(Lead)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Lead.dedup_key],
+        set_={
+            'score': stmt.excluded.score,
+            'score_breakdown': stmt.excluded.score_breakdown,
+            'updated_at': func.now(),
+        }
+    ).returning(Lead.id, Lead.dedup_key)
+
+    result = db.execute(stmt, rows)
+    lead_ids = {dedup_key: lead_id for lead_id, dedup_key in result}
+    db.commit()
+    invalidate_stats()
+    return lead_ids
+
+
+def _enrich_lead(lead_data: Dict, researcher: ResearcherAgent, outreach: OutreachAgent) -> Dict:
+    """Research + outreach for one lead; runs on a worker thread, no DB access"""
+    print(f"   🔬 Researching: {lead_data['title'][:50]}...")
+    research = researcher.research_lead(lead_data)
+
+    print(f"   ✉️  Drafting outreach: {lead_data['title'][:50]}...")
+    draft = outreach.draft_outreach(lead_data)
+
+    return {
+        'research_notes': research.get('research_notes'),
+        'estimated_hours': research.get('estimated_hours'),
+        'outreach_draft': draft,
+    }
+
+
+def _enrich_leads(
     db: Session,
-    search_id: str,
-    categories: List[str],
-    min_budget: int,
-    sources: List[str],
-    min_score: int
+    leads: List[tuple],
+    researcher: ResearcherAgent,
+    outreach: OutreachAgent,
+    job: SearchJob
 ):
     """
-    Run the full lead search pipeline
+    Enrich (lead_id, lead_data) pairs on a bounded thread pool
+
+    Results are written back by primary key in batches from this thread,
+    so the session is never shared with the workers. On cancellation, leads
+    not yet started are dropped; finished ones are still written.
+    """
+    if not leads:
+        return
+
+    pending = []
+
+    def flush():
+        if pending:
+            db.execute(update(Lead), pending)
+            db.commit()
+            pending.clear()
+
+    with ThreadPoolExecutor(max_workers=ENRICH_WORKERS, thread_name_prefix="enrich") as pool:
+        futures = {
+            pool.submit(_enrich_lead, lead_data, researcher, outreach): lead_id
+            for lead_id, lead_data in leads
+        }
+        for future in as_completed(futures):
+            if job.cancelled:
+                for other in futures:
+                    other.cancel()
+
+            if future.cancelled():
+                continue
+            try:
+                enrichment = future.result()
+            except Exception as e:
+                print(f"   Enrichment failed for lead {futures[future]}: {e}")
+                job.count('enrich_failed')
+                job.emit('lead_enrich_failed', lead_id=futures[future], error=str(e))
+                continue
+
+            pending.append({'id': futures[future], **enrichment})
+            job.count('enriched')
+            job.emit('lead_enriched', lead_id=futures[future],
+                     estimated_hours=enrichment['estimated_hours'])
+            if len(pending) >= ENRICH_BATCH_SIZE:
+                flush()
+
+    flush()
+    job.check_cancelled()
+
+
+def run_lead_search(job: SearchJob):
+    """
+    Run the full lead search pipeline for a job
 
     1. Scout finds raw leads
     2. Qualifier scores them
     3. Researcher enriches top leads
     4. Outreach drafts messages
+
+    Runs on a worker thread with its own session. Each stage is timed into
+    the job, and cancellation is honoured between stages and between leads.
     """
-    print(f"\n🔍 Starting search: {search_id}")
+    params = job.params
+    min_score = params['min_score']
+    print(f"\n🔍 Starting search: {job.id}")
 
     # Initialize agents
     scout = ScoutAgent()
@@ -220,60 +512,65 @@ def run_lead_search(
     researcher = ResearcherAgent()
     outreach = OutreachAgent()
 
-    # Step 1: Scout finds leads
-    print("📡 Scout: Finding leads...")
-    raw_leads = scout.search_all(categories=categories, min_budget=min_budget)
-    print(f"   Found {len(raw_leads)} raw leads")
-
-    qualified_count = 0
-
-    for lead_data in raw_leads:
-        # Step 2: Qualifier scores lead
-        print(f"   Scoring: {lead_data['title'][:50]}...")
-        score, breakdown, notes = qualifier.qualify_lead(lead_data)
-
-        # Skip if below minimum score
-        if score < min_score:
-            print(f"   ❌ Score {score} < {min_score}, skipping")
-            continue
-
-        print(f"   ✅ Score {score} - QUALIFIED")
-        qualified_count += 1
-
-        # Create lead in database
-        lead = Lead(
-            source=lead_data['source'],
-            title=lead_data['title'],
-            description=lead_data.get('description'),
-            url=lead_data.get('url'),
-            budget_min=lead_data.get('budget_min'),
-            budget_max=lead_data.get('budget_max'),
-            tech_stack=lead_data.get('tech_stack', []),
-            score=score,
-            score_breakdown=breakdown,
-            qualified=True,
-            status='qualified'
-        )
-
-        db.add(lead)
-        db.commit()
-        db.refresh(lead)
-
-        # Step 3: Research lead (for top scores only)
-        if score >= 80:
-            print(f"   🔬 Researching high-value lead...")
-            research = researcher.research_lead(lead_data)
-
-            lead.research_notes = research.get('research_notes')
-            lead.estimated_hours = research.get('estimated_hours')
-
-            # Step 4: Draft outreach
-            print(f"   ✉️  Drafting outreach...")
-            draft = outreach.draft_outreach(lead_data)
-
-            lead.outreach_draft = draft
-
-            db.commit()
-
-    print(f"\n✅ Search complete: {qualified_count}/{len(raw_leads)} leads qualified")
+    db = SessionLocal()
+    try:
+        # Step 1: Scout finds leads, skipping posts earlier runs already processed
+        with job.timed_stage('fetch'):
+            print("📡 Scout: Finding leads...")
+            raw_leads = scout.search_all(categories=params['categories'], min_budget=params['min_budget'])
+            job.count('found', len(raw_leads))
+
+        with job.timed_stage('dedup'):
+            seen = SeenStore(db)
+            raw_leads = seen.filter_new(raw_leads)
+            job.count('new', len(raw_leads))
+            print(f"   Found {len(raw_leads)} new raw leads")
+
+        # Step 2: Qualifier scores every lead in one batch
+        with job.timed_stage('scoring'):
+            scores = qualifier.qualify_leads(raw_leads)
+
+            qualified = []
+            for lead_data, (score, breakdown, notes) in zip(raw_leads, scores):
+                print(f"   Scoring: {lead_data['title'][:50]}...")
+                passed = score >= min_score
+                job.emit('lead_scored', title=lead_data['title'], url=lead_data.get('url'),
+                         source=lead_data['source'], score=score, qualified=passed)
+
+                # Skip if below minimum score
+                if not passed:
+                    print(f"   ❌ Score {score} < {min_score}, skipping")
+                    continue
+
+                print(f"   ✅ Score {score} - QUALIFIED")
+                qualified.append((lead_data, score, breakdown))
+
+            job.count('qualified', len(qualified))
+
+        # Store all qualified leads in one transaction
+        with job.timed_stage('store'):
+            lead_ids = _store_qualified_leads(db, qualified)
+            for lead_data, score, _ in qualified:
+                job.emit('lead_stored', lead_id=lead_ids[lead_data['dedup_key']],
+                         title=lead_data['title'], score=score)
+
+            # Every scouted post is recorded, so the next run doesn't re-qualify it
+            seen.mark_seen(raw_leads, lead_ids)
+
+        # Steps 3 & 4: Research and draft outreach for top scores only (LLM time)
+        with job.timed_stage('enrichment'):
+            to_enrich = [
+                (lead_ids[lead_data['dedup_key']], lead_data)
+                for lead_data, score, _ in qualified
+                if score >= RESEARCH_MIN_SCORE
+            ]
+            _enrich_leads(db, to_enrich, researcher, outreach, job)
+
+    except SearchCancelled:
+        print(f"\n⏹️  Search cancelled: {job.id}")
+        raise
+    finally:
+        db.close()
+
+    print(f"\n✅ Search complete: {len(qualified)}/{len(raw_leads)} leads qualified")
     print(f"   Min score: {min_score}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ARRAY, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ARRAY, JSON, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -13,6 +13,7 @@ class Lead(Base):
     title = Column(Text, nullable=False)
     description = Column(Text)
     url = Column(Text)
+    dedup_key = Column(String(64), unique=True)  # Canonical URL or content hash, see core/dedup.py
 
     # Budget
     budget_min = Column(Integer)
@@ -50,5 +51,10 @@ class Lead(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Keyset pagination for /api/leads: ORDER BY score DESC, id DESC
+        Index('ix_leads_score_id', 'score', 'id'),
+    )
+
     def __repr__(self):
         return f"<Lead(id={self.id}, title='{self.title[:50]}', score={self.score})>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class LLMCacheEntry(Base):
+    """A cached model response, keyed by normalized prompt + model + options"""
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256, see core/llm_cache.py
+    model = Column(String(100), index=True)
+    response = Column(Text, nullable=False)
+    hits = Column(Integer, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheEntry(key='{self.key[:12]}', model='{self.model}', hits={self.hits})>"
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SearchRun(Base):
+    """Record of one /api/search job, kept after the in-memory job is gone"""
+    __tablename__ = "search_runs"
+
+    id = Column(String(64), primary_key=True)  # search_id
+    params = Column(JSON)
+    status = Column(String(20), index=True)
+    # Status values: 'queued', 'running', 'completed', 'failed', 'cancelled'
+
+    stage_timings = Column(JSON)  # Stage name -> seconds
+    counts = Column(JSON)         # found, qualified, enriched, ...
+    error = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<SearchRun(id='{self.id}', status='{self.status}')>"
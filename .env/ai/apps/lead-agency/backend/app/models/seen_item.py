@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SeenItem(Base):
+    """Every scouted post, qualified or not, so later runs can skip it"""
+    __tablename__ = "seen_items"
+
+    # Canonical URL hash, or content hash for posts without a URL
+    key = Column(String(64), primary_key=True)
+
+    source = Column(String(50), index=True)
+    url = Column(Text)
+    content_hash = Column(String(64), index=True)
+
+    simhash = Column(BigInteger)  # Signed 64-bit SimHash; NULL for very short posts
+
+    lead_id = Column(Integer)  # Set when the post was stored as a lead
+
+    first_seen = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<SeenItem(key='{self.key[:12]}', source='{self.source}', lead_id={self.lead_id})>"
@@ -0,0 +1,272 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import main
+from app.core.database import get_db
+from app.core.jobs import SearchJob
+from app.main import app
+from app.models.lead import Lead
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # ARRAY is the only Postgres-only column type; lead listing works the same on SQLite
+    monkeypatch.setattr(Lead.__table__.c.tech_stack, 'type', JSON())
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Lead.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats_cache(monkeypatch):
+    monkeypatch.setattr(main, '_stats_cache', {"summary": None, "expires": 0.0, "generation": 0})
+
+
+def add_leads(db, scores):
+    db.add_all(Lead(source='reddit', title=f'lead {n}', score=score, tech_stack=[])
+               for n, score in enumerate(scores))
+    db.commit()
+
+
+def finished_job(search_id):
+    """A completed job whose events are all in its history"""
+    loop = asyncio.new_event_loop()
+    job = SearchJob(search_id, {}, loop)
+    job._set_status('running')
+    job.emit('stage', stage='fetch', state='started')
+    job.emit('lead_scored', title='Need an app', score=85)
+    job._set_status('completed')
+    job.emit('lead_enriched', lead_id=1)  # Anything after the final status is not streamed
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+    return job
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class FakeSession:
+    """Records statements; returns canned rows from execute()"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.commits = 0
+
+    def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+        return iter(self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestCors:
+    """Test cross-origin access for the dashboard"""
+
+    def test_next_cursor_header_is_exposed(self):
+        response = TestClient(app).get('/', headers={'Origin': 'http://localhost:3000'})
+        assert response.status_code == 200
+        assert 'X-Next-Cursor' in response.headers['Access-Control-Expose-Headers']
+
+
+class TestLeadPaging:
+    """Test keyset pagination of the lead list"""
+
+    def test_decode_cursor(self):
+        assert main._decode_cursor('85:12') == (85, 12)
+        for bad in ('', '85', '85:12:1', 'high:12'):
+            with pytest.raises(HTTPException) as error:
+                main._decode_cursor(bad)
+            assert error.value.status_code == 400
+
+    def test_bad_cursor_is_rejected(self, client):
+        response = client.get('/api/leads', params={'cursor': 'nope'})
+        assert response.status_code == 400
+
+    def test_next_cursor_only_on_full_pages(self, client, db):
+        add_leads(db, [90, 80, 70])
+        full = client.get('/api/leads', params={'limit': 2})
+        last = full.json()[-1]
+        assert full.headers['X-Next-Cursor'] == f"{last['score']}:{last['id']}"
+
+        rest = client.get('/api/leads', params={'limit': 2, 'cursor': full.headers['X-Next-Cursor']})
+        assert [lead['score'] for lead in rest.json()] == [70]
+        assert 'X-Next-Cursor' not in rest.headers
+
+    def test_pages_have_no_gaps_or_duplicates_across_ties(self, client, db):
+        add_leads(db, [50 + n % 3 for n in range(23)])
+        expected = [(lead.score, lead.id) for lead in db.query(Lead).order_by(Lead.score.desc(), Lead.id.desc())]
+
+        seen, params = [], {'limit': 4}
+        while True:
+            response = client.get('/api/leads', params=params)
+            seen.extend((lead['score'], lead['id']) for lead in response.json())
+            if 'X-Next-Cursor' not in response.headers:
+                break
+            params['cursor'] = response.headers['X-Next-Cursor']
+
+        assert seen == expected
+
+    def test_min_score_filter_combines_with_cursor(self, client, db):
+        add_leads(db, [90, 90, 60, 90, 40])
+        first = client.get('/api/leads', params={'limit': 2, 'min_score': 50})
+        second = client.get('/api/leads', params={'limit': 2, 'min_score': 50,
+                                                  'cursor': first.headers['X-Next-Cursor']})
+        scores = [lead['score'] for lead in first.json() + second.json()]
+        assert scores == [90, 90, 90, 60]
+
+
+class TestStats:
+    """Test the cached stats summary"""
+
+    @pytest.mark.asyncio
+    async def test_summary_is_cached(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(main, '_compute_stats', lambda db: calls.append(db) or {'total_leads': len(calls)})
+
+        assert await main.get_stats(db=None) == {'total_leads': 1}
+        assert await main.get_stats(db=None) == {'total_leads': 1}
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_write_during_compute_is_not_cached(self, monkeypatch):
+        """A summary made stale by a concurrent write is returned but not kept"""
+        calls = []
+
+        def compute(db):
+            calls.append(db)
+            if len(calls) == 1:
+                main.invalidate_stats()  # A pipeline stored leads mid-query
+            return {'total_leads': len(calls)}
+
+        monkeypatch.setattr(main, '_compute_stats', compute)
+        assert await main.get_stats(db=None) == {'total_leads': 1}
+        assert await main.get_stats(db=None) == {'total_leads': 2}
+        assert await main.get_stats(db=None) == {'total_leads': 2}
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_storing_leads_invalidates_summary(self, monkeypatch):
+        monkeypatch.setattr(main, '_compute_stats', lambda db: {'total_leads': 0})
+        await main.get_stats(db=None)
+        generation = main._stats_cache['generation']
+
+        session = FakeSession(rows=[(7, 'key-1')])
+        qualified = [({'source': 'reddit', 'title': 'Need an app', 'dedup_key': 'key-1'}, 85, {})]
+        assert main._store_qualified_leads(session, qualified) == {'key-1': 7}
+        assert session.commits == 1
+        assert main._stats_cache['summary'] is None
+        assert main._stats_cache['generation'] == generation + 1
+
+    def test_storing_nothing_keeps_summary(self):
+        session = FakeSession()
+        assert main._store_qualified_leads(session, []) == {}
+        assert session.executed == []
+        assert main._stats_cache['generation'] == 0
+
+    def test_grouping_sets_rows_map_to_summary(self):
+        def row(source=None, status=None, by_source=0, by_status=0, total=0, qualified=0,
+                avg_score=None, p50=None, p90=None):
+            return SimpleNamespace(source=source, status=status, by_source=by_source, by_status=by_status,
+                                   total=total, qualified=qualified, avg_score=avg_score, p50=p50, p90=p90)
+
+        rows = [
+            row(by_source=1, by_status=1, total=5, qualified=3, avg_score=72.46, p50=75.0, p90=88.44),
+            row(source='reddit', by_status=1, total=3),
+            row(source='hackernews', by_status=1, total=2),
+            row(status='qualified', by_source=1, total=3),
+            row(status='new', by_source=1, total=2),
+        ]
+        query = SimpleNamespace(group_by=lambda *args: SimpleNamespace(all=lambda: rows))
+        db = SimpleNamespace(query=lambda *columns: query)
+
+        assert main._compute_stats(db) == {
+            "total_leads": 5,
+            "qualified_leads": 3,
+            "average_score": 72.5,
+            "score_percentiles": {"p50": 75.0, "p90": 88.4},
+            "by_source": {"reddit": 3, "hackernews": 2},
+            "by_status": {"qualified": 3, "new": 2},
+        }
+
+    def test_empty_table_summary(self):
+        rows = [SimpleNamespace(source=None, status=None, by_source=1, by_status=1, total=0, qualified=0,
+                                avg_score=None, p50=None, p90=None)]
+        query = SimpleNamespace(group_by=lambda *args: SimpleNamespace(all=lambda: rows))
+        summary = main._compute_stats(SimpleNamespace(query=lambda *columns: query))
+        assert summary["average_score"] == 0
+        assert summary["score_percentiles"] == {"p50": None, "p90": None}
+
+
+class TestSearchEvents:
+    """Test the server-sent event stream of a search"""
+
+    def test_unknown_search(self):
+        assert TestClient(app).get('/api/search/missing/events').status_code == 404
+
+    def test_replays_history_and_ends_after_final_status(self, monkeypatch):
+        job = finished_job('search_done')
+        monkeypatch.setitem(main.job_manager._jobs, job.id, job)
+
+        response = TestClient(app).get(f'/api/search/{job.id}/events')
+        assert response.headers['content-type'].startswith('text/event-stream')
+        events = parse_events(response.text)
+        assert [(event_id, kind) for event_id, kind, _ in events] == [
+            (1, 'status'), (2, 'stage'), (3, 'lead_scored'), (4, 'status')
+        ]
+        assert events[-1][2]['status'] == 'completed'
+
+    def test_resumes_after_last_event_id(self, monkeypatch):
+        job = finished_job('search_resumed')
+        monkeypatch.setitem(main.job_manager._jobs, job.id, job)
+
+        response = TestClient(app).get(f'/api/search/{job.id}/events', headers={'Last-Event-ID': '2'})
+        assert [event_id for event_id, _, _ in parse_events(response.text)] == [3, 4]
+
+    def test_streams_live_events_until_final_status(self, monkeypatch):
+        monkeypatch.setattr(main, 'init_db', lambda: None)
+        monkeypatch.setattr(main.ollama_cluster, 'close', lambda: None)
+
+        with TestClient(app) as client:
+            job = SearchJob('search_live', {}, client.portal.call(asyncio.get_running_loop))
+            monkeypatch.setitem(main.job_manager._jobs, job.id, job)
+            job._set_status('running')
+
+            def finish():
+                job.emit('lead_scored', title='Need an app', score=85)
+                job._set_status('completed')
+                job.emit('lead_enriched', lead_id=1)
+
+            timer = threading.Timer(0.1, finish)
+            timer.start()
+            response = client.get(f'/api/search/{job.id}/events')
+            timer.join()
+
+        events = parse_events(response.text)
+        assert [kind for _, kind, _ in events] == ['status', 'lead_scored', 'status']
+        assert [data['status'] for _, kind, data in events if kind == 'status'] == ['running', 'completed']
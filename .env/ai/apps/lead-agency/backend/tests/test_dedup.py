@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.dedup import SeenStore, _to_signed, canonical_url, fingerprint
+from app.models.seen_item import SeenItem
+
+LONG_TEXT = (
+    "We are a small logistics startup looking for an experienced developer to build "
+    "a customer dashboard with React and a Python API, budget around five thousand"
+)
+
+
+def lead(title, description='', url=None, source='reddit'):
+    return {'title': title, 'description': description, 'url': url, 'source': source}
+
+
+@pytest.fixture
+def db():
+    # filter_new only reads, so SQLite stands in for Postgres here
+    engine = create_engine('sqlite://')
+    SeenItem.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def store_seen(db, item, last_seen=None):
+    fp = fingerprint(item)
+    db.add(SeenItem(
+        key=fp['key'],
+        source=item['source'],
+        url=fp['url'],
+        content_hash=fp['content_hash'],
+        simhash=_to_signed(fp['simhash']) if fp['simhash'] is not None else None,
+        last_seen=last_seen or datetime.now(timezone.utc),
+    ))
+    db.commit()
+
+
+class TestCanonicalUrl:
+    """Test URL keys used to recognise reposts"""
+
+    def test_drops_scheme_www_query_and_trailing_slash(self):
+        assert canonical_url('https://www.Reddit.com/r/forhire/1/?utm_source=x#top') == '//reddit.com/r/forhire/1'
+        assert canonical_url('http://reddit.com/r/forhire/1') == canonical_url('https://reddit.com/r/forhire/1/')
+
+    def test_keeps_query_for_hn_items(self):
+        first = canonical_url('https://news.ycombinator.com/item?id=101')
+        second = canonical_url('https://news.ycombinator.com/item?id=202')
+        assert first != second
+        assert first == canonical_url('http://www.news.ycombinator.com/item/?id=101#c')
+
+    def test_query_only_kept_on_item_paths(self):
+        assert canonical_url('https://news.ycombinator.com/newest?next=5') == '//news.ycombinator.com/newest'
+
+    def test_hn_comments_get_distinct_keys(self):
+        comments = [lead('Same short text', url=f'https://news.ycombinator.com/item?id={n}', source='hackernews')
+                    for n in (1, 2)]
+        keys = {fingerprint(item)['key'] for item in comments}
+        assert len(keys) == 2
+
+    def test_empty(self):
+        assert canonical_url(None) is None
+        assert canonical_url('') is None
+
+
+class TestSeenStore:
+    """Test filtering scouted posts against earlier runs"""
+
+    def test_new_leads_are_kept_with_keys(self, db):
+        leads = [lead('Need a Django dev', url='https://reddit.com/r/forhire/1'),
+                 lead('Build my app', url='https://reddit.com/r/forhire/2')]
+        new = SeenStore(db).filter_new(leads)
+        assert [item['title'] for item in new] == ['Need a Django dev', 'Build my app']
+        assert all(item['dedup_key'] == item['_fingerprint']['key'] for item in new)
+
+    def test_drops_seen_url_variants(self, db):
+        store_seen(db, lead('Old post', url='https://www.reddit.com/r/forhire/1/'))
+        new = SeenStore(db).filter_new([lead('Edited title', url='http://reddit.com/r/forhire/1?utm=x')])
+        assert new == []
+
+    def test_drops_seen_text_without_url(self, db):
+        store_seen(db, lead('Need a  React developer!'))
+        assert SeenStore(db).filter_new([lead('need a react developer')]) == []
+
+    def test_drops_repeats_within_batch(self, db):
+        leads = [lead('Same post', url='https://a.com/x'),
+                 lead('Same post', url='https://a.com/x/'),
+                 lead(LONG_TEXT, url='https://reddit.com/r/a/1'),
+                 lead(LONG_TEXT + ' thanks', url='https://reddit.com/r/b/2')]
+        new = SeenStore(db).filter_new(leads)
+        assert [item['url'] for item in new] == ['https://a.com/x', 'https://reddit.com/r/a/1']
+
+    def test_drops_recent_near_duplicates(self, db):
+        store_seen(db, lead(LONG_TEXT, url='https://reddit.com/r/a/1'))
+        repost = lead(LONG_TEXT.replace('five', '5'), url='https://reddit.com/r/b/9')
+        assert SeenStore(db).filter_new([repost]) == []
+
+    def test_old_near_duplicates_are_kept(self, db):
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        store_seen(db, lead(LONG_TEXT, url='https://reddit.com/r/a/1'), last_seen=old)
+        repost = lead(LONG_TEXT.replace('five', '5'), url='https://reddit.com/r/b/9')
+        assert len(SeenStore(db).filter_new([repost])) == 1
+
+    def test_empty_batch(self, db):
+        assert SeenStore(db).filter_new([]) == []
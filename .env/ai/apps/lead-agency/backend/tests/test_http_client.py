@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.core import http_client
+from app.core.http_client import HttpFetcher
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Local HTTP server whose responses are scripted per path"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FixtureHandler)
+        self.scripts = {}      # path -> list of (status, headers, body); the last one repeats
+        self.requests = []     # (path, request headers) in arrival order
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        with server.lock:
+            server.requests.append((path, dict(self.headers)))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            script = server.scripts.get(path, [(404, {}, b'')])
+            status, headers, body = script.pop(0) if len(script) > 1 else script[0]
+        try:
+            time.sleep(server.delay)
+            if callable(body):
+                status, headers, body = body(self.headers)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FixtureServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, 'BACKOFF_BASE', 0.01)
+
+
+class TestHttpFetcher:
+    """Test the pooled fetcher against a local fixture server"""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, server):
+        server.scripts['/flaky'] = [(503, {}, b''), (502, {}, b''), (200, {}, b'{"ok": true}')]
+        fetcher = HttpFetcher(retries=3)
+
+        result = await fetcher.get(f"{server.url}/flaky")
+        assert result.status == 200
+        assert result.json() == {'ok': True}
+        assert fetcher.stats['retries'] == 2
+        assert len(server.requests) == 3
+        await fetcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retries(self, server):
+        server.scripts['/down'] = [(500, {}, b'')]
+        fetcher = HttpFetcher(retries=2)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetcher.get(f"{server.url}/down")
+        assert len(server.requests) == 3
+        assert fetcher.stats['errors'] == 1
+        await fetcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, server):
+        server.scripts['/missing'] = [(404, {}, b'gone')]
+        fetcher = HttpFetcher(retries=3)
+
+        result = await fetcher.get(f"{server.url}/missing")
+        assert result.status == 404
+        assert len(server.requests) == 1
+        await fetcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_honours_retry_after(self, server, monkeypatch):
+        server.scripts['/limited'] = [(429, {'Retry-After': '7'}, b''), (200, {}, b'done')]
+        delays = []
+        real_sleep = asyncio.sleep
+
+        async def record_sleep(delay):
+            delays.append(delay)
+            await real_sleep(0)
+
+        monkeypatch.setattr(http_client.asyncio, 'sleep', record_sleep)
+        fetcher = HttpFetcher()
+
+        result = await fetcher.get(f"{server.url}/limited")
+        assert result.content == b'done'
+        assert delays == [7.0]
+        await fetcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_revalidates_with_etag(self, server):
+        def conditional(headers):
+            if headers.get('If-None-Match') == '"v1"':
+                return 304, {'ETag': '"v1"'}, b''
+            return 200, {'ETag': '"v1"'}, b'page body'
+
+        server.scripts['/page'] = [(200, {}, conditional)]
+        fetcher = HttpFetcher()
+
+        first = await fetcher.get(f"{server.url}/page", params={'q': 'x'})
+        second = await fetcher.get(f"{server.url}/page", params={'q': 'x'})
+        assert not first.not_modified
+        assert second.not_modified
+        assert second.status == 200
+        assert second.content == b'page body'
+        assert server.requests[1][1].get('If-None-Match') == '"v1"'
+        assert fetcher.stats['not_modified'] == 1
+        await fetcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_per_host(self, server):
+        server.scripts['/slow'] = [(200, {}, b'ok')]
+        server.delay = 0.1
+        fetcher = HttpFetcher(max_per_host=2)
+
+        results = await asyncio.gather(*(fetcher.get(f"{server.url}/slow", params={'i': i}) for i in range(6)))
+        assert [r.status for r in results] == [200] * 6
+        assert server.max_active == 2
+        await fetcher.aclose()
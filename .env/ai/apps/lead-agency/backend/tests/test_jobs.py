@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core import jobs
+from app.core.jobs import JobManager
+
+
+async def settle():
+    """Let events emitted with call_soon_threadsafe reach the job"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def no_run_records(monkeypatch):
+    monkeypatch.setattr(jobs, 'save_run', lambda job: None)
+
+
+class TestSearchJobEvents:
+    """Test event history and replay for late subscribers"""
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_gets_history_then_live_events(self):
+        job = JobManager().create({'categories': ['web']})
+        job.emit('lead', title='first')
+        job.emit('lead', title='second')
+        await settle()
+
+        history, queue = job.subscribe()
+        assert [event['title'] for event in history] == ['first', 'second']
+        assert [event['id'] for event in history] == [1, 2]
+
+        job.emit('lead', title='third')
+        await settle()
+        live = queue.get_nowait()
+        assert (live['id'], live['title']) == (3, 'third')
+        assert queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_events_from_worker_thread_keep_order(self):
+        job = JobManager().create({})
+        thread = threading.Thread(target=lambda: [job.emit('tick', n=n) for n in range(100)])
+        thread.start()
+        thread.join()
+        await settle()
+
+        history, _ = job.subscribe()
+        assert [event['n'] for event in history] == list(range(100))
+        assert [event['id'] for event in history] == list(range(1, 101))
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(jobs, 'MAX_EVENTS', 5)
+        job = JobManager().create({})
+        for n in range(8):
+            job.emit('tick', n=n)
+        await settle()
+
+        history, _ = job.subscribe()
+        assert [event['id'] for event in history] == [4, 5, 6, 7, 8]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_queue_gets_nothing(self):
+        job = JobManager().create({})
+        _, queue = job.subscribe()
+        job.unsubscribe(queue)
+        job.emit('tick')
+        await settle()
+        assert queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_run_ends_with_final_status(self):
+        manager = JobManager()
+        job = manager.create({})
+
+        def pipeline(job):
+            with job.timed_stage('scout'):
+                job.count('posts', 3)
+
+        manager.start(job, pipeline)
+        await job.task
+        await settle()
+
+        history, _ = job.subscribe()
+        statuses = [event['status'] for event in history if event['type'] == 'status']
+        assert statuses == ['running', 'completed']
+        stages = [(event['stage'], event['state']) for event in history if event['type'] == 'stage']
+        assert stages == [('scout', 'started'), ('scout', 'finished')]
+        assert job.counts == {'posts': 3}
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_pipeline(self):
+        manager = JobManager()
+        job = manager.create({})
+        started = threading.Event()
+
+        def pipeline(job):
+            started.set()
+            while True:
+                job.check_cancelled()
+                time.sleep(0.001)
+
+        manager.start(job, pipeline)
+        await asyncio.to_thread(started.wait)
+        job.cancel()
+        await job.task
+        await settle()
+
+        assert job.status == 'cancelled'
+        history, _ = job.subscribe()
+        assert history[-1]['status'] == 'cancelled'
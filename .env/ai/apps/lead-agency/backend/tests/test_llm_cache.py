@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import llm_cache as llm_cache_module
+from app.core.llm_cache import LLMCache, cache_key, normalize_prompt
+from app.models.llm_cache_entry import LLMCacheEntry
+
+
+class FakeCluster:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def generate(self, model, prompt, node=None, temperature=0.7, max_tokens=1000):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class DictCache(LLMCache):
+    """LLMCache with get/put over a dict instead of Postgres"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entries = {}
+
+    def get(self, key):
+        response = self.entries.get(key)
+        self._count("hits" if response is not None else "misses")
+        return response
+
+    def put(self, key, model, response):
+        self.entries[key] = response
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    # get() only needs UPDATE ... RETURNING, which SQLite supports
+    engine = create_engine('sqlite://')
+    LLMCacheEntry.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(llm_cache_module, 'SessionLocal', factory)
+    yield factory
+    engine.dispose()
+
+
+def use_cluster(monkeypatch, outcomes):
+    cluster = FakeCluster(outcomes)
+    monkeypatch.setattr(llm_cache_module, 'ollama_cluster', cluster)
+    return cluster
+
+
+class TestCacheKey:
+    """Test prompt normalization and key derivation"""
+
+    def test_whitespace_differences_share_a_key(self):
+        options = {'temperature': 0.7, 'max_tokens': 500}
+        assert normalize_prompt('  Draft a\n\nreply\tnow ') == 'Draft a reply now'
+        assert cache_key('qwen', 'Draft a\n reply', options) == cache_key('qwen', ' Draft a reply  ', options)
+
+    def test_model_and_options_change_the_key(self):
+        base = cache_key('qwen', 'prompt', {'temperature': 0.7, 'max_tokens': 500})
+        assert cache_key('gemma', 'prompt', {'temperature': 0.7, 'max_tokens': 500}) != base
+        assert cache_key('qwen', 'prompt', {'temperature': 0.2, 'max_tokens': 500}) != base
+        assert cache_key('qwen', 'prompt', {'temperature': 0.7, 'max_tokens': 800}) != base
+        assert cache_key('qwen', 'prompt', {'max_tokens': 500, 'temperature': 0.7}) == base
+
+    def test_wording_changes_the_key(self):
+        assert cache_key('qwen', 'draft a reply', {}) != cache_key('qwen', 'draft a Reply', {})
+
+
+class TestLLMCacheGet:
+    """Test lookups against the cache table"""
+
+    def add_entry(self, sessions, key, age):
+        db = sessions()
+        created = datetime.now(timezone.utc) - age
+        db.add(LLMCacheEntry(key=key, model='qwen', response=f'response {key}', hits=0,
+                             created_at=created, last_used_at=created))
+        db.commit()
+        db.close()
+
+    def test_fresh_entry_is_a_hit(self, sessions):
+        self.add_entry(sessions, 'fresh', timedelta(hours=1))
+        cache = LLMCache(ttl_hours=24)
+        assert cache.get('fresh') == 'response fresh'
+
+        db = sessions()
+        assert db.get(LLMCacheEntry, 'fresh').hits == 1
+        db.close()
+
+    def test_entries_past_ttl_are_misses(self, sessions):
+        self.add_entry(sessions, 'stale', timedelta(hours=25))
+        cache = LLMCache(ttl_hours=24)
+        assert cache.get('stale') is None
+        assert cache.get('unknown') is None
+        assert cache.stats['misses'] == 2
+
+
+class TestLLMCacheGenerate:
+    """Test the cached generate() path"""
+
+    def test_second_call_is_served_from_cache(self, monkeypatch):
+        cluster = use_cluster(monkeypatch, ['first answer'])
+        cache = DictCache()
+
+        assert cache.generate('qwen', 'Research this lead') == 'first answer'
+        assert cache.generate('qwen', 'Research  this\nlead') == 'first answer'
+        assert cluster.calls == 1
+
+    def test_errors_are_never_cached(self, monkeypatch):
+        cluster = use_cluster(monkeypatch, [TimeoutError('node down'), 'recovered'])
+        cache = DictCache()
+
+        with pytest.raises(TimeoutError):
+            cache.generate('qwen', 'prompt')
+        assert cache.entries == {}
+        assert cache.generate('qwen', 'prompt') == 'recovered'
+        assert cluster.calls == 2
+
+    def test_cache_failures_fall_through_to_the_model(self, monkeypatch):
+        cluster = use_cluster(monkeypatch, ['answer'])
+        cache = LLMCache()
+
+        def broken(*args):
+            raise ConnectionError('database unavailable')
+
+        monkeypatch.setattr(cache, 'get', broken)
+        monkeypatch.setattr(cache, 'put', broken)
+        assert cache.generate('qwen', 'prompt') == 'answer'
+        assert cache.stats['errors'] == 2
+        assert cluster.calls == 1
+
+    def test_disabled_cache_is_bypassed(self, monkeypatch):
+        cluster = use_cluster(monkeypatch, ['one', 'two'])
+        cache = DictCache(ttl_hours=0)
+
+        assert [cache.generate('qwen', 'prompt') for _ in range(2)] == ['one', 'two']
+        assert cache.entries == {}
+        assert cache.get_stats()['enabled'] is False
+
+    def test_hit_rate(self, monkeypatch):
+        use_cluster(monkeypatch, ['a', 'b'])
+        cache = DictCache()
+        assert cache.get_stats()['hit_rate'] is None
+
+        for prompt in ('first', 'first', 'first', 'second'):
+            cache.generate('qwen', prompt)
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses']) == (2, 2)
+        assert stats['hit_rate'] == 0.5
@@ -0,0 +1,59 @@
+import pytest
+
+from app.core import matcher as matcher_module
+from app.core.matcher import KeywordMatcher
+
+TEXTS = [
+    "Hiring a React developer, ASAP",
+    "Looking for someone to build a Next.js app",
+    "",
+    "need developer for long-term maintenance of our django site",
+    "nothing relevant here",
+]
+
+
+def build_matcher() -> KeywordMatcher:
+    matcher = KeywordMatcher()
+    matcher.add('hiring', ['hiring', 'looking for', 'need developer'])
+    matcher.add('urgent', ['asap', 'urgent'])
+    matcher.add('ongoing', ['long-term', 'maintenance'])
+    matcher.add('tech', ['next.js', 'nextjs'], label='next.js')
+    matcher.add('tech', ['react'])
+    matcher.add('tech', ['django'])
+    return matcher.compile()
+
+
+@pytest.fixture(params=['automaton', 'substring'])
+def matcher(request, monkeypatch):
+    if request.param == 'automaton':
+        pytest.importorskip('ahocorasick')
+    else:
+        monkeypatch.setattr(matcher_module, 'ahocorasick', None)
+    return build_matcher()
+
+
+class TestKeywordMatcher:
+    """Test batch keyword scans"""
+
+    def test_scan_many_matches_scan(self, matcher):
+        assert matcher.scan_many(TEXTS) == [matcher.scan(text) for text in TEXTS]
+
+    def test_scan_many_finds_each_texts_classes(self, matcher):
+        results = matcher.scan_many(TEXTS)
+        assert results[0] == {'hiring': {'hiring'}, 'urgent': {'asap'}, 'tech': {'react'}}
+        assert results[1] == {'hiring': {'looking for'}, 'tech': {'next.js'}}
+        assert results[2] == {}
+        assert results[3]['ongoing'] == {'long-term', 'maintenance'}
+        assert results[4] == {}
+
+    def test_matches_do_not_span_texts(self, matcher):
+        """A phrase split across two neighbouring texts is not a match"""
+        assert matcher.scan_many(['we are looking', 'for nobody']) == [{}, {}]
+        assert matcher.scan_many(['need', 'developer']) == [{}, {}]
+
+    def test_empty_batch(self, matcher):
+        assert matcher.scan_many([]) == []
+
+    def test_phrases_added_after_compile_are_used(self, matcher):
+        matcher.add('budget', ['budget'])
+        assert matcher.scan_many(['our budget is $5k'])[0] == {'budget': {'budget'}}
@@ -0,0 +1,144 @@
+import threading
+
+import ollama
+import pytest
+
+from app.core import ollama_client
+from app.core.ollama_client import MAX_FAILURES, OllamaCluster
+
+
+class FakeClient:
+    """Stands in for ollama.Client; replies or raises per scripted outcome"""
+
+    def __init__(self, name, outcomes=None):
+        self.name = name
+        self.outcomes = list(outcomes or [])
+        self.calls = []
+
+    def generate(self, model, prompt, options):
+        self.calls.append(model)
+        outcome = self.outcomes.pop(0) if self.outcomes else f"from {self.name}"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {'response': outcome}
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    monkeypatch.delenv('OLLAMA_ENDPOINTS', raising=False)
+    cluster = OllamaCluster()
+    monkeypatch.setattr(cluster, '_ensure_refresh', lambda: None)  # No network probes
+    for name, endpoint in cluster.nodes.items():
+        node = cluster._nodes[endpoint]
+        node.close()
+        node.client = node.probe_client = FakeClient(name)
+    yield cluster
+    cluster.close()
+
+
+def node(cluster, name):
+    return cluster._nodes[cluster.nodes[name]]
+
+
+def names(nodes):
+    return [n.name for n in nodes]
+
+
+def give_model(cluster, model, **latencies):
+    for name, latency in latencies.items():
+        node(cluster, name).models = {model}
+        node(cluster, name).latency = latency
+
+
+class TestCandidates:
+    """Test the order nodes are tried in"""
+
+    def test_preferred_node_first_when_healthy(self, cluster):
+        give_model(cluster, 'qwen:latest', hostbox=5.0, workbox=1.0, callbox=2.0)
+        assert names(cluster._candidates('qwen', None)) == ['hostbox', 'workbox', 'callbox']
+        assert names(cluster._candidates('qwen', 'callbox')) == ['callbox', 'workbox', 'hostbox']
+
+    def test_preferred_node_without_model_is_skipped(self, cluster):
+        give_model(cluster, 'qwen', workbox=1.0, callbox=2.0)
+        assert names(cluster._candidates('qwen', 'hostbox')) == ['workbox', 'callbox']
+
+    def test_unhealthy_nodes_go_last(self, cluster):
+        give_model(cluster, 'qwen', hostbox=1.0, workbox=3.0, callbox=2.0)
+        node(cluster, 'hostbox').failures = MAX_FAILURES
+        assert names(cluster._candidates('qwen', 'hostbox')) == ['callbox', 'workbox', 'hostbox']
+
+    def test_empty_model_map_tries_only_preferred(self, cluster):
+        assert names(cluster._candidates('qwen', 'helpbox')) == ['helpbox']
+        assert names(cluster._candidates('qwen', None)) == ['hostbox']
+        assert cluster._candidates('qwen', 'nowhere') == []
+
+
+class TestGenerate:
+    """Test slot spill-over and failover between nodes"""
+
+    def test_spills_over_when_preferred_slots_are_full(self, cluster):
+        give_model(cluster, 'qwen', hostbox=1.0, workbox=2.0)
+        host = node(cluster, 'hostbox')
+        for _ in range(ollama_client.NODE_CONCURRENCY):
+            assert host.slots.acquire(blocking=False)
+
+        assert cluster.generate('qwen', 'hi') == 'from workbox'
+        assert host.client.calls == []
+        assert node(cluster, 'workbox').in_flight == 0
+
+    def test_waits_for_first_candidate_when_all_are_busy(self, cluster):
+        give_model(cluster, 'qwen', hostbox=1.0, workbox=2.0)
+        host, work = node(cluster, 'hostbox'), node(cluster, 'workbox')
+        for _ in range(ollama_client.NODE_CONCURRENCY):
+            host.slots.acquire()
+            work.slots.acquire()
+
+        threading.Timer(0.05, host.slots.release).start()
+        assert cluster._acquire(cluster._candidates('qwen', None)) is host
+
+    def test_missing_model_is_dropped_without_failure(self, cluster):
+        give_model(cluster, 'qwen', hostbox=1.0, workbox=2.0)
+        host = node(cluster, 'hostbox')
+        host.client.outcomes = [ollama.ResponseError('model "qwen" not found', 404)]
+
+        assert cluster.generate('qwen', 'hi') == 'from workbox'
+        assert host.models == set()
+        assert host.failures == 0
+        assert names(cluster._candidates('qwen', None)) == ['workbox']
+
+    def test_fails_over_on_other_errors(self, cluster):
+        give_model(cluster, 'qwen', hostbox=1.0, workbox=2.0)
+        host = node(cluster, 'hostbox')
+        host.client.outcomes = [ollama.ResponseError('server busy', 500)]
+
+        assert cluster.generate('qwen', 'hi') == 'from workbox'
+        assert host.failures == 1
+        assert node(cluster, 'workbox').failures == 0
+
+    def test_raises_last_error_when_every_node_fails(self, cluster):
+        give_model(cluster, 'qwen', hostbox=1.0, workbox=2.0)
+        node(cluster, 'hostbox').client.outcomes = [ConnectionError('refused')]
+        node(cluster, 'workbox').client.outcomes = [TimeoutError('timed out')]
+
+        with pytest.raises(TimeoutError):
+            cluster.generate('qwen', 'hi')
+        assert [node(cluster, n).failures for n in ('hostbox', 'workbox')] == [1, 1]
+        assert all(n.slots.acquire(blocking=False) for n in cluster._nodes.values())
+
+    def test_no_node_for_model(self, cluster):
+        with pytest.raises(RuntimeError):
+            cluster.generate('qwen', 'hi', node='nowhere')
+
+
+class TestClose:
+    """Test releasing the node connection pools"""
+
+    def test_closes_real_clients(self, monkeypatch):
+        monkeypatch.delenv('OLLAMA_ENDPOINTS', raising=False)
+        cluster = OllamaCluster()
+        cluster.close()
+        assert all(n.client._client.is_closed and n.probe_client._client.is_closed
+                   for n in cluster._nodes.values())
+
+    def test_tolerates_clients_without_pool(self, cluster):
+        cluster.close()
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import main
+from app.core.jobs import SearchCancelled, SearchJob
+
+
+class FakeSession:
+    """Records write-back batches instead of touching a database"""
+
+    def __init__(self):
+        self.batches = []
+        self.commits = 0
+        self.closed = False
+
+    def execute(self, stmt, params=None):
+        self.batches.append(list(params))
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def written(self):
+        return [row['id'] for batch in self.batches for row in batch]
+
+
+class StubResearcher:
+    def __init__(self, delay=0.0, fail=(), hook=None):
+        self.delay = delay
+        self.fail = set(fail)
+        self.hook = hook
+        self.started = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def research_lead(self, lead_data):
+        with self.lock:
+            self.started.append(lead_data['n'])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.hook:
+                self.hook(lead_data)
+            time.sleep(self.delay)
+            if lead_data['n'] in self.fail:
+                raise RuntimeError("model timed out")
+            return {'research_notes': f"notes {lead_data['n']}", 'estimated_hours': 10}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class StubOutreach:
+    def draft_outreach(self, lead_data):
+        return f"Hi about {lead_data['title']}"
+
+
+def make_leads(count):
+    return [(100 + n, {'n': n, 'title': f'lead {n}'}) for n in range(count)]
+
+
+@pytest.fixture
+def job():
+    loop = asyncio.new_event_loop()
+    yield SearchJob('search-1', {'min_score': 70, 'categories': ['web'], 'min_budget': 0}, loop)
+    loop.close()
+
+
+class TestEnrichLeads:
+    """Test concurrent enrichment and batched write-back"""
+
+    def test_runs_concurrently_up_to_worker_limit(self, job, monkeypatch):
+        monkeypatch.setattr(main, 'ENRICH_WORKERS', 3)
+        researcher = StubResearcher(delay=0.05)
+        db = FakeSession()
+
+        main._enrich_leads(db, make_leads(9), researcher, StubOutreach(), job)
+        assert researcher.max_active == 3
+        assert sorted(db.written) == [100 + n for n in range(9)]
+        assert job.counts == {'enriched': 9}
+
+    def test_writes_back_in_batches(self, job, monkeypatch):
+        monkeypatch.setattr(main, 'ENRICH_BATCH_SIZE', 3)
+        db = FakeSession()
+
+        main._enrich_leads(db, make_leads(7), StubResearcher(), StubOutreach(), job)
+        assert [len(batch) for batch in db.batches] == [3, 3, 1]
+        assert db.commits == 3
+        row = db.batches[0][0]
+        assert set(row) == {'id', 'research_notes', 'estimated_hours', 'outreach_draft'}
+
+    def test_failed_enrichment_is_counted_and_skipped(self, job):
+        db = FakeSession()
+
+        main._enrich_leads(db, make_leads(4), StubResearcher(fail={2}), StubOutreach(), job)
+        assert sorted(db.written) == [100, 101, 103]
+        assert job.counts == {'enriched': 3, 'enrich_failed': 1}
+
+    def test_cancel_drops_unstarted_but_flushes_finished(self, job, monkeypatch):
+        monkeypatch.setattr(main, 'ENRICH_WORKERS', 1)
+        release = threading.Event()
+
+        def hook(lead_data):
+            if lead_data['n'] == 0:
+                job.cancel()
+                threading.Timer(0.05, release.set).start()
+            else:
+                release.wait()  # Anything picked up before the cancel lands still finishes
+
+        researcher = StubResearcher(hook=hook)
+        db = FakeSession()
+
+        with pytest.raises(SearchCancelled):
+            main._enrich_leads(db, make_leads(6), researcher, StubOutreach(), job)
+        assert 0 in researcher.started
+        assert len(researcher.started) < 6
+        assert sorted(db.written) == sorted(100 + n for n in researcher.started)
+
+    def test_nothing_to_enrich(self, job):
+        db = FakeSession()
+        main._enrich_leads(db, [], StubResearcher(), StubOutreach(), job)
+        assert db.batches == []
+        assert db.commits == 0
+
+
+class TestRunLeadSearch:
+    """Test the pipeline wiring with stub agents"""
+
+    def test_only_top_scores_are_enriched(self, job, monkeypatch):
+        raw = [{'title': f'post {n}', 'source': 'reddit', 'n': n, 'score': score}
+               for n, score in enumerate([95, 60, 82, 75])]
+        db = FakeSession()
+        researcher = StubResearcher()
+        marked = []
+
+        class Scout:
+            def search_all(self, categories, min_budget):
+                return raw
+
+        class Qualifier:
+            def qualify_leads(self, leads):
+                return [(lead['score'], {}, '') for lead in leads]
+
+        class Seen:
+            def __init__(self, db):
+                pass
+
+            def filter_new(self, leads):
+                return [{**lead, 'dedup_key': f"key-{lead['n']}"} for lead in leads]
+
+            def mark_seen(self, leads, lead_ids):
+                marked.extend(lead['dedup_key'] for lead in leads)
+
+        def store(db, qualified):
+            return {lead['dedup_key']: 100 + lead['n'] for lead, _, _ in qualified}
+
+        monkeypatch.setattr(main, 'ScoutAgent', Scout)
+        monkeypatch.setattr(main, 'QualifierAgent', Qualifier)
+        monkeypatch.setattr(main, 'ResearcherAgent', lambda: researcher)
+        monkeypatch.setattr(main, 'OutreachAgent', StubOutreach)
+        monkeypatch.setattr(main, 'SeenStore', Seen)
+        monkeypatch.setattr(main, 'SessionLocal', lambda: db)
+        monkeypatch.setattr(main, '_store_qualified_leads', store)
+
+        main.run_lead_search(job)
+        assert sorted(researcher.started) == [0, 2]
+        assert sorted(db.written) == [100, 102]
+        assert marked == ['key-0', 'key-1', 'key-2', 'key-3']
+        assert job.counts == {'found': 4, 'new': 4, 'qualified': 3, 'enriched': 2}
+        assert set(job.stage_timings) == {'fetch', 'dedup', 'scoring', 'store', 'enrichment'}
+        assert db.closed
@@ -0,0 +1,55 @@
+import pytest
+
+from app.agents.qualifier import QualifierAgent
+from app.core import matcher as matcher_module
+from app.core.matcher import build_lead_matcher
+
+LEADS = [
+    {
+        'title': 'Hiring a React developer ASAP',
+        'description': 'Our startup needs a dashboard.\n- login\n- reports\nBudget is firm, must be done in a week',
+        'budget_min': 5000,
+        'tech_stack': ['React', 'Python'],
+    },
+    {
+        'title': 'Long-term Django maintenance',
+        'description': 'Established company looking for ongoing help. Requirements: Django, Postgres. '
+                       'Timeline: 3 months. See our portfolio for examples. ' + 'More detail here. ' * 40,
+        'budget_min': 12000,
+        'tech_stack': ['Django', 'PHP'],
+    },
+    {'title': '', 'description': ''},
+    {'title': 'NEED A WORDPRESS SITE', 'description': 'cheap, quick, urgent', 'budget_min': 100},
+    {'title': 'Build an MVP', 'description': 'Startup', 'tech_stack': []},
+]
+
+
+@pytest.fixture(params=['automaton', 'substring'])
+def qualifier(request, monkeypatch):
+    if request.param == 'automaton':
+        pytest.importorskip('ahocorasick')
+    else:
+        monkeypatch.setattr(matcher_module, 'ahocorasick', None)
+    agent = QualifierAgent()
+    agent.matcher = build_lead_matcher()
+    return agent
+
+
+class TestQualifierAgent:
+    """Test batch qualification against per-lead scoring"""
+
+    def test_batch_matches_per_lead_scoring(self, qualifier):
+        assert qualifier.qualify_leads(LEADS) == [qualifier.qualify_lead(lead) for lead in LEADS]
+
+    def test_batch_keeps_lead_order(self, qualifier):
+        forward = qualifier.qualify_leads(LEADS)
+        backward = qualifier.qualify_leads(LEADS[::-1])
+        assert backward == forward[::-1]
+
+    def test_keywords_do_not_leak_between_leads(self, qualifier):
+        """A phrase split across two adjacent leads matches neither"""
+        leads = [{'title': 'we need it', 'description': 'as'}, {'title': 'ap', 'description': 'thanks'}]
+        assert qualifier.qualify_leads(leads) == [qualifier.qualify_lead(lead) for lead in leads]
+
+    def test_empty_batch(self, qualifier):
+        assert qualifier.qualify_leads([]) == []
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import { Stats } from '../types/lead';
 
@@ -12,6 +12,19 @@ const SearchControl: React.FC<SearchControlProps> = ({ onSearchStarted, onSearch
   const [searching, setSearching] = useState(false);
   const [searchId, setSearchId] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const eventsRef = useRef<EventSource | null>(null);
+
+  // Stop listening if the component goes away mid-search
+  useEffect(() => () => eventsRef.current?.close(), []);
+
+  const finishSearch = (message: string | null = null) => {
+    eventsRef.current?.close();
+    eventsRef.current = null;
+    if (message) setError(message);
+    setSearching(false);
+    setSearchId(null);
+    onSearchComplete();
+  };
 
   const startSearch = async () => {
     try {
@@ -28,12 +41,17 @@ const SearchControl: React.FC<SearchControlProps> = ({ onSearchStarted, onSearch
 
       setSearchId(response.data.search_id);
 
-      // Poll for completion (simplified - waits 5-10 minutes as per API response)
-      setTimeout(() => {
-        setSearching(false);
-        setSearchId(null);
-        onSearchComplete();
-      }, 10 * 60 * 1000); // 10 minutes
+      // Finish when the search reports a final status
+      const events = new EventSource(`/api/search/${response.data.search_id}/events`);
+      eventsRef.current = events;
+      events.addEventListener('status', (event) => {
+        const { status, error } = JSON.parse((event as MessageEvent).data);
+        if (status === 'completed' || status === 'failed' || status === 'cancelled') {
+          finishSearch(status === 'failed' ? error || 'Search failed' : null);
+        }
+      });
+      // Without this the browser keeps reconnecting, e.g. to a search the server has forgotten
+      events.onerror = () => finishSearch('Lost connection to the search progress stream');
 
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to start search');
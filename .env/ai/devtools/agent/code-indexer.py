@@ -6,7 +6,14 @@ Better than DuckDB for this use case - lighter weight, optimized for search
 
 import sqlite3
 import os
+import re
 import sys
+import json
+import time
+import hashlib
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import mimetypes
 from datetime import datetime
@@ -32,6 +39,153 @@ EXCLUDE_EXTS = {
     ".woff", ".woff2", ".ttf", ".eot"
 }
 
+SCHEMA_FILES = """
+    CREATE TABLE IF NOT EXISTS file_state (
+        id INTEGER PRIMARY KEY,     -- rowid of the file's code_files row
+        path TEXT UNIQUE NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        hash TEXT NOT NULL
+    )
+"""
+
+# Identifiers stay whole ('_' is a token character, no stemming); their
+# snake_case/camelCase parts go in the subtokens column
+SCHEMA_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS code_files USING fts5(
+        file_path UNINDEXED,
+        content,
+        language UNINDEXED,
+        size UNINDEXED,
+        modified UNINDEXED,
+        subtokens,
+        tokenize="unicode61 tokenchars '_'"
+    )
+"""
+
+# Substring/punctuation search; reads content from code_files, stores only the index
+SCHEMA_TRIGRAMS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS code_trigrams USING fts5(
+        content,
+        content='code_files',
+        tokenize='trigram'
+    )
+"""
+
+SCHEMA_SYMBOLS = """
+    CREATE TABLE IF NOT EXISTS symbols (
+        file_id INTEGER NOT NULL,
+        name TEXT NOT NULL COLLATE NOCASE,
+        kind TEXT NOT NULL,
+        line INTEGER NOT NULL
+    )
+"""
+
+SCHEMA = [
+    SCHEMA_FILES,
+    SCHEMA_FTS,
+    SCHEMA_TRIGRAMS,
+    SCHEMA_SYMBOLS,
+    "CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols (name)",
+    "CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols (file_id)",
+]
+
+SCHEMA_VERSION = 2  # PRAGMA user_version; older indexes are rebuilt by `build`
+
+MAX_FILE_SIZE = 1_000_000   # Skip files > 1MB
+READ_WORKERS = 8            # Threads reading and hashing changed files
+BATCH_SIZE = 500            # Files written per executemany/commit
+WATCH_DEBOUNCE = 1.0        # Seconds to collect filesystem events before syncing
+WATCH_INTERVAL = 30         # Seconds between rescans when polling
+SYMBOL_BOOST = 10.0         # Added to the score of files defining a queried symbol
+
+LANGUAGES = {
+    '.rs': 'rust', '.go': 'go', '.py': 'python',
+    '.js': 'javascript', '.ts': 'typescript',
+    '.md': 'markdown', '.yaml': 'yaml', '.yml': 'yaml',
+    '.toml': 'toml', '.json': 'json', '.sh': 'bash'
+}
+
+IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+QUERY_TERM_RE = re.compile(r'\w+')  # Numbers and other words count as search terms too
+SUBTOKEN_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+# Quoted phrases, boolean operators and prefix* queries are FTS5 syntax;
+# other punctuation is code
+FTS_SYNTAX_RE = re.compile(r'"|\b(?:AND|OR|NOT|NEAR)\b|\w\*')
+
+# Definitions per language: (kind, pattern capturing the name)
+_JS_SYMBOLS = [
+    ("function", r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)'),
+    ("class", r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)'),
+    ("function", r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*=>'),
+    ("interface", r'^\s*(?:export\s+)?interface\s+([A-Za-z_$][\w$]*)'),
+    ("type", r'^\s*(?:export\s+)?type\s+([A-Za-z_$][\w$]*)\s*='),
+]
+SYMBOL_PATTERNS = {
+    language: [(kind, re.compile(pattern, re.MULTILINE)) for kind, pattern in patterns]
+    for language, patterns in {
+        'python': [
+            ("function", r'^\s*(?:async\s+)?def\s+(\w+)'),
+            ("class", r'^\s*class\s+(\w+)'),
+        ],
+        'javascript': _JS_SYMBOLS,
+        'typescript': _JS_SYMBOLS,
+        'rust': [
+            ("function", r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(\w+)'),
+            ("struct", r'^\s*(?:pub(?:\([^)]*\))?\s+)?struct\s+(\w+)'),
+            ("enum", r'^\s*(?:pub(?:\([^)]*\))?\s+)?enum\s+(\w+)'),
+            ("trait", r'^\s*(?:pub(?:\([^)]*\))?\s+)?trait\s+(\w+)'),
+        ],
+        'go': [
+            ("function", r'^func\s+(?:\([^)]*\)\s*)?(\w+)'),
+            ("struct", r'^type\s+(\w+)\s+struct\b'),
+            ("interface", r'^type\s+(\w+)\s+interface\b'),
+        ],
+        'bash': [
+            ("function", r'^\s*(?:function\s+([\w-]+)|([\w-]+)\s*\(\s*\)\s*\{)'),
+        ],
+    }.items()
+}
+
+@lru_cache(maxsize=65536)
+def split_identifier(identifier):
+    """snake_case, camelCase and HTTPServer-style parts, lowercased"""
+    return tuple(part.lower() for part in SUBTOKEN_RE.findall(identifier))
+
+def subtokens(content):
+    """Parts of every compound identifier, in order (whole identifiers are in content)"""
+    parts = []
+    for identifier in IDENTIFIER_RE.findall(content):
+        split = split_identifier(identifier)
+        if len(split) > 1:
+            parts.extend(split)
+    return ' '.join(parts)
+
+def extract_symbols(language, content):
+    """(name, kind, line) for each definition found by the language's patterns"""
+    symbols = []
+    for kind, pattern in SYMBOL_PATTERNS.get(language, []):
+        for match in pattern.finditer(content):
+            name = next(group for group in match.groups() if group)
+            line = content.count('\n', 0, match.start(1) if match.group(1) else match.start(2)) + 1
+            symbols.append((name, kind, line))
+    return sorted(symbols, key=lambda symbol: symbol[2])
+
+def language_for(path):
+    return LANGUAGES.get(os.path.splitext(path)[1], 'unknown')
+
+def is_indexable_name(name):
+    """Extension and mime checks that need only the file name"""
+    if os.path.splitext(name)[1] in EXCLUDE_EXTS:
+        return False
+
+    # Check if text file
+    mime_type, _ = mimetypes.guess_type(name)
+    if mime_type and not mime_type.startswith('text'):
+        return False
+
+    return True
+
 def should_index(file_path):
     """Check if file should be indexed"""
     path = Path(file_path)
@@ -41,148 +195,522 @@ def should_index(file_path):
         if part in EXCLUDE_DIRS:
             return False
 
-    # Check excluded extensions
-    if path.suffix in EXCLUDE_EXTS:
-        return False
-
-    # Check if text file
-    mime_type, _ = mimetypes.guess_type(str(path))
-    if mime_type and not mime_type.startswith('text'):
+    if not is_indexable_name(path.name):
         return False
 
-    # Check file size (skip files > 1MB)
     try:
-        if path.stat().st_size > 1_000_000:
-            return False
-    except:
+        return path.is_file() and path.stat().st_size <= MAX_FILE_SIZE
+    except OSError:
         return False
 
-    return True
+def walk_files(root):
+    """
+    Yield (path, size, mtime_ns) for indexable files under root
+
+    Excluded directories are pruned without being entered; stats come from
+    the directory listing, so unchanged files are never opened.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            print(f"❌ Cannot read {directory}: {e}")
+            continue
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in EXCLUDE_DIRS:
+                        stack.append(entry.path)
+                elif entry.is_file() and is_indexable_name(entry.name):
+                    stat = entry.stat()
+                    if stat.st_size <= MAX_FILE_SIZE:
+                        yield entry.path, stat.st_size, stat.st_mtime_ns
+            except OSError:
+                continue
 
-def create_index():
-    """Create SQLite FTS5 index"""
+def read_file(path):
+    """Content, content hash, subtokens and symbols; runs on a worker thread"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    content = data.decode('utf-8', errors='ignore')
+    return (
+        content,
+        hashlib.sha1(data).hexdigest(),
+        subtokens(content),
+        extract_symbols(language_for(path), content),
+    )
+
+def connect():
+    """Open the index, creating tables as needed"""
     # Ensure directory exists
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # Drop existing table
-    cur.execute("DROP TABLE IF EXISTS code_files")
-
-    # Create FTS5 table
-    cur.execute("""
-        CREATE VIRTUAL TABLE code_files USING fts5(
-            file_path UNINDEXED,
-            content,
-            language UNINDEXED,
-            size UNINDEXED,
-            modified UNINDEXED,
-            tokenize='porter ascii'
+    # Searches keep working while a build or the watcher writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    if is_outdated(conn):
+        # Older layouts can't be updated in place
+        drop_index(conn)
+    return conn
+
+def is_outdated(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION
+
+def drop_index(conn):
+    for table in ("code_trigrams", "code_files", "symbols", "file_state"):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+class IndexWriter:
+    """Applies file changes to code_files, code_trigrams, symbols and file_state in batches"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.known = {
+            path: (file_id, size, mtime_ns, digest)
+            for file_id, path, size, mtime_ns, digest
+            in conn.execute("SELECT id, path, size, mtime_ns, hash FROM file_state")
+        }
+        self.next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM file_state").fetchone()[0]
+        self.counts = {'added': 0, 'updated': 0, 'touched': 0, 'removed': 0, 'errors': 0}
+
+    def is_unchanged(self, path, size, mtime_ns):
+        state = self.known.get(path)
+        return state is not None and state[1] == size and state[2] == mtime_ns
+
+    def apply(self, files, progress=False):
+        """Read, hash and store (path, size, mtime_ns) entries whose stat changed"""
+        batch = []
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            for start in range(0, len(files), BATCH_SIZE):
+                chunk = files[start:start + BATCH_SIZE]
+                futures = [pool.submit(read_file, path) for path, _, _ in chunk]
+                for (path, size, mtime_ns), future in zip(chunk, futures):
+                    try:
+                        content, digest, parts, symbols = future.result()
+                    except Exception as e:
+                        print(f"❌ Error indexing {path}: {e}")
+                        self.counts['errors'] += 1
+                        continue
+                    batch.append((path, size, mtime_ns, content, digest, parts, symbols))
+                self._write(batch)
+                batch = []
+                if progress:
+                    done = min(start + BATCH_SIZE, len(files))
+                    print(f"  Indexed {done}/{len(files)} changed files...", end='\r')
+
+    def _write(self, batch):
+        inserts, updates, touched, symbols = [], [], [], []
+        for path, size, mtime_ns, content, digest, parts, file_symbols in batch:
+            state = self.known.get(path)
+            modified = datetime.fromtimestamp(mtime_ns / 1e9).isoformat()
+            language = language_for(path)
+
+            if state is None:
+                file_id = self.next_id
+                self.next_id += 1
+                inserts.append((file_id, path, content, language, size, modified, parts, mtime_ns, digest))
+                self.counts['added'] += 1
+            elif state[3] == digest:
+                # Touched but not edited: only the stat changed
+                file_id = state[0]
+                touched.append((size, mtime_ns, file_id))
+                self.counts['touched'] += 1
+                self.known[path] = (file_id, size, mtime_ns, digest)
+                continue
+            else:
+                file_id = state[0]
+                updates.append((file_id, path, content, language, size, modified, parts, mtime_ns, digest))
+                self.counts['updated'] += 1
+            self.known[path] = (file_id, size, mtime_ns, digest)
+            symbols.extend((file_id, name, kind, line) for name, kind, line in file_symbols)
+
+        cur = self.conn.cursor()
+        # External-content trigram rows are removed using the old content, so before the update
+        self._unindex_trigrams(cur, [(r[0],) for r in updates])
+        cur.executemany("DELETE FROM symbols WHERE file_id = ?", [(r[0],) for r in updates])
+
+        cur.executemany(
+            "INSERT INTO file_state (id, path, size, mtime_ns, hash) VALUES (?, ?, ?, ?, ?)",
+            [(r[0], r[1], r[4], r[7], r[8]) for r in inserts]
+        )
+        cur.executemany(
+            "INSERT INTO code_files (rowid, file_path, content, language, size, modified, subtokens) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [r[:7] for r in inserts]
+        )
+        cur.executemany(
+            "UPDATE file_state SET size = ?, mtime_ns = ?, hash = ? WHERE id = ?",
+            [(r[4], r[7], r[8], r[0]) for r in updates]
+        )
+        cur.executemany(
+            "UPDATE code_files SET content = ?, language = ?, size = ?, modified = ?, subtokens = ? "
+            "WHERE rowid = ?",
+            [(r[2], r[3], r[4], r[5], r[6], r[0]) for r in updates]
+        )
+        cur.executemany(
+            "INSERT INTO code_trigrams (rowid, content) VALUES (?, ?)",
+            [(r[0], r[2]) for r in inserts + updates]
+        )
+        cur.executemany("INSERT INTO symbols (file_id, name, kind, line) VALUES (?, ?, ?, ?)", symbols)
+        cur.executemany("UPDATE file_state SET size = ?, mtime_ns = ? WHERE id = ?", touched)
+        self.conn.commit()
+
+    def _unindex_trigrams(self, cur, ids):
+        cur.executemany(
+            "INSERT INTO code_trigrams (code_trigrams, rowid, content) "
+            "SELECT 'delete', rowid, content FROM code_files WHERE rowid = ?",
+            ids
         )
-    """)
+
+    def remove(self, paths):
+        ids = [(self.known.pop(path)[0],) for path in paths if path in self.known]
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            cur = self.conn.cursor()
+            self._unindex_trigrams(cur, chunk)
+            cur.executemany("DELETE FROM code_files WHERE rowid = ?", chunk)
+            cur.executemany("DELETE FROM symbols WHERE file_id = ?", chunk)
+            cur.executemany("DELETE FROM file_state WHERE id = ?", chunk)
+            self.conn.commit()
+        self.counts['removed'] += len(ids)
+
+def under_missing_root(path, missing_roots):
+    return any(path == root or path.startswith(root + os.sep) for root in missing_roots)
+
+def create_index(full=False):
+    """
+    Create or update the SQLite FTS5 index
+
+    Only files whose size or mtime changed since the last build are read;
+    of those, only ones whose content hash changed are re-indexed.
+    full=True drops the index and re-reads everything.
+    """
+    started = time.monotonic()
+    conn = connect()
+    if full:
+        drop_index(conn)
 
     print(f"🔍 Indexing code files...")
-    indexed = 0
-    skipped = 0
+    writer = IndexWriter(conn)
 
+    seen = set()
+    changed = []
+    missing_roots = []
     for root in INDEX_ROOTS:
-        for file_path in Path(root).rglob('*'):
-            if not file_path.is_file():
-                continue
+        if not os.path.isdir(root):
+            # Keep its entries; an unmounted tree shouldn't empty the index
+            print(f"⚠️  Index root not found, keeping its entries: {root}")
+            missing_roots.append(root)
+            continue
+        for path, size, mtime_ns in walk_files(root):
+            seen.add(path)
+            if not writer.is_unchanged(path, size, mtime_ns):
+                changed.append((path, size, mtime_ns))
+
+    writer.apply(changed, progress=True)
+    writer.remove([
+        path for path in list(writer.known)
+        if path not in seen and not under_missing_root(path, missing_roots)
+    ])
+    conn.close()
 
-            if not should_index(file_path):
-                skipped += 1
-                continue
+    counts = writer.counts
+    print(f"\n✅ Indexed {len(seen)} files in {time.monotonic() - started:.1f}s: "
+          f"{counts['added']} added, {counts['updated']} updated, "
+          f"{counts['removed']} removed, {counts['errors']} errors")
+    print(f"📁 Database: {DB_PATH}")
+    print(f"📊 Size: {Path(DB_PATH).stat().st_size / 1024 / 1024:.2f} MB")
 
-            try:
-                # Read file content
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                # Determine language
-                ext_map = {
-                    '.rs': 'rust', '.go': 'go', '.py': 'python',
-                    '.js': 'javascript', '.ts': 'typescript',
-                    '.md': 'markdown', '.yaml': 'yaml', '.yml': 'yaml',
-                    '.toml': 'toml', '.json': 'json', '.sh': 'bash'
-                }
-                language = ext_map.get(file_path.suffix, 'unknown')
-
-                # Get file stats
-                stat = file_path.stat()
-
-                # Insert into index
-                cur.execute("""
-                    INSERT INTO code_files (file_path, content, language, size, modified)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    str(file_path),
-                    content,
-                    language,
-                    stat.st_size,
-                    datetime.fromtimestamp(stat.st_mtime).isoformat()
-                ))
-
-                indexed += 1
-                if indexed % 100 == 0:
-                    print(f"  Indexed {indexed} files...", end='\r')
-
-            except Exception as e:
-                print(f"❌ Error indexing {file_path}: {e}")
+def sync_paths(conn, paths):
+    """Bring specific files or directories up to date (used by watch mode)"""
+    writer = IndexWriter(conn)
+    changed, gone = [], set()
+
+    for path in paths:
+        if os.path.isdir(path):
+            if any(part in EXCLUDE_DIRS for part in Path(path).parts):
                 continue
+            current = {p: (size, mtime) for p, size, mtime in walk_files(path)}
+            prefix = path.rstrip(os.sep) + os.sep
+            gone.update(p for p in writer.known if p.startswith(prefix) and p not in current)
+            changed.extend(
+                (p, size, mtime) for p, (size, mtime) in current.items()
+                if not writer.is_unchanged(p, size, mtime)
+            )
+        elif should_index(path):
+            stat = os.stat(path)
+            if not writer.is_unchanged(path, stat.st_size, stat.st_mtime_ns):
+                changed.append((path, stat.st_size, stat.st_mtime_ns))
+        else:
+            # Deleted, excluded, or a deleted directory's contents
+            gone.add(path)
+            prefix = path.rstrip(os.sep) + os.sep
+            gone.update(p for p in writer.known if p.startswith(prefix))
 
-    conn.commit()
-    conn.close()
+    writer.apply(changed)
+    writer.remove(gone)
+    return writer.counts
 
-    print(f"\n✅ Indexed {indexed} files (skipped {skipped})")
-    print(f"📁 Database: {DB_PATH}")
-    print(f"📊 Size: {Path(DB_PATH).stat().st_size / 1024 / 1024:.2f} MB")
+def watch():
+    """
+    Keep the index live: sync files as they change
 
-def search(query, limit=20):
-    """Search the index"""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    Uses watchdog (inotify/FSEvents) when installed, otherwise rescans
+    every WATCH_INTERVAL seconds, which only stats unchanged files.
+    """
+    create_index()
 
-    cur.execute("""
-        SELECT file_path, snippet(code_files, 1, '→ ', ' ←', '...', 30) as snippet, language
-        FROM code_files
-        WHERE code_files MATCH ?
-        ORDER BY rank
-        LIMIT ?
-    """, (query, limit))
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        print(f"👀 watchdog not installed, rescanning every {WATCH_INTERVAL}s (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(WATCH_INTERVAL)
+                create_index()
+        except KeyboardInterrupt:
+            return
+
+    dirty = set()
+    lock = threading.Lock()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            with lock:
+                dirty.add(event.src_path)
+                if getattr(event, 'dest_path', None):
+                    dirty.add(event.dest_path)
+
+    observer = Observer()
+    for root in INDEX_ROOTS:
+        if os.path.isdir(root):
+            observer.schedule(Handler(), root, recursive=True)
+    observer.start()
+    print("👀 Watching for changes (Ctrl-C to stop)")
 
-    results = cur.fetchall()
-    conn.close()
+    conn = connect()
+    try:
+        while True:
+            time.sleep(WATCH_DEBOUNCE)
+            with lock:
+                paths = list(dirty)
+                dirty.clear()
+            if not paths:
+                continue
+            counts = sync_paths(conn, paths)
+            if counts['added'] or counts['updated'] or counts['removed']:
+                print(f"🔄 {counts['added']} added, {counts['updated']} updated, "
+                      f"{counts['removed']} removed")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        observer.stop()
+        observer.join()
+        conn.close()
+
+def build_query(query):
+    """
+    FTS query for plain words: each compound identifier also matches as a
+    phrase of its parts, so getUserName finds get_user_name and vice versa.
+    Other words (numbers such as 404) are matched as they are. Queries
+    already using FTS5 syntax are passed through.
+    """
+    if FTS_SYNTAX_RE.search(query):
+        return query
+    terms = []
+    for word in QUERY_TERM_RE.findall(query):
+        parts = split_identifier(word) if IDENTIFIER_RE.fullmatch(word) else ()
+        if len(parts) > 1:
+            terms.append(f'({word} OR subtokens:"{" ".join(parts)}")')
+        else:
+            terms.append(word)
+    # FTS5 only implies AND between barewords, not next to a parenthesised group
+    return ' AND '.join(terms)
+
+def is_substring_query(query):
+    """Anything beyond identifiers, whitespace and FTS syntax is matched literally"""
+    return not FTS_SYNTAX_RE.search(query) and bool(re.search(r'[^\w\s]', query))
+
+def search(query, limit=20, substring=None):
+    """
+    Search the index
+
+    Plain words use the code tokenizer, ranked by bm25 with files that
+    define a queried symbol boosted; queries with punctuation (or
+    substring=True) are matched literally through the trigram index.
+    Returns dicts with path, language, score, snippet and definitions.
+    """
+    if substring is None:
+        substring = is_substring_query(query)
 
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        if substring:
+            results = _substring_search(conn, query, limit)
+        else:
+            results = _token_search(conn, query, limit)
+    finally:
+        conn.close()
     return results
 
+def _substring_search(conn, query, limit):
+    if len(query) < 3:
+        raise ValueError("Substring queries need at least 3 characters")
+    rows = conn.execute("""
+        SELECT f.rowid, f.file_path, f.language, -bm25(code_trigrams),
+               snippet(code_trigrams, 0, '→ ', ' ←', '...', 30)
+        FROM code_trigrams
+        JOIN code_files f ON f.rowid = code_trigrams.rowid
+        WHERE code_trigrams MATCH ?
+        ORDER BY code_trigrams.rank
+        LIMIT ?
+    """, ('"' + query.replace('"', '""') + '"', limit)).fetchall()
+    return [_result(conn, row, []) for row in rows]
+
+def _token_search(conn, query, limit):
+    match = build_query(query)
+    if not match:
+        return []
+
+    # Files defining a queried identifier, with where
+    names = {word for word in QUERY_TERM_RE.findall(query) if IDENTIFIER_RE.fullmatch(word)}
+    definitions = {}
+    if names:
+        placeholders = ', '.join('?' * len(names))
+        for file_id, name, kind, line in conn.execute(
+            f"SELECT file_id, name, kind, line FROM symbols WHERE name IN ({placeholders}) ORDER BY line",
+            list(names)
+        ):
+            definitions.setdefault(file_id, []).append({'name': name, 'kind': kind, 'line': line})
+
+    # Content matches weigh more than subtoken matches
+    select = """
+        SELECT rowid, file_path, language, -bm25(code_files, 0, 1.0, 0, 0, 0, 0.5),
+               snippet(code_files, 1, '→ ', ' ←', '...', 30)
+        FROM code_files
+        WHERE code_files MATCH ?
+    """
+    rows = {row[0]: row for row in conn.execute(select + " ORDER BY rank LIMIT ?", (match, limit))}
+    missing = [file_id for file_id in definitions if file_id not in rows]
+    if missing:
+        placeholders = ', '.join('?' * len(missing))
+        rows.update((row[0], row) for row in conn.execute(
+            select + f" AND rowid IN ({placeholders})", [match] + missing
+        ))
+
+    results = [_result(conn, row, definitions.get(row[0], [])) for row in rows.values()]
+    results.sort(key=lambda result: result['score'], reverse=True)
+    return results[:limit]
+
+def _result(conn, row, definitions):
+    file_id, path, language, score, snippet = row
+    if definitions:
+        score += SYMBOL_BOOST
+    return {
+        'path': path,
+        'language': language,
+        'score': round(score, 3),
+        'snippet': snippet,
+        'definitions': definitions,
+    }
+
+def find_symbol(name, limit=50):
+    """Definitions named exactly `name` (case-insensitive)"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute("""
+            SELECT s.name, s.kind, f.path, s.line
+            FROM symbols s JOIN file_state f ON f.id = s.file_id
+            WHERE s.name = ?
+            ORDER BY f.path, s.line
+            LIMIT ?
+        """, (name, limit)).fetchall()
+    finally:
+        conn.close()
+    return [{'name': n, 'kind': kind, 'path': path, 'line': line} for n, kind, path, line in rows]
+
+def pop_option(args, flag, default=None):
+    """Remove `flag value` from args and return the value"""
+    if flag not in args:
+        return default
+    index = args.index(flag)
+    value = args[index + 1] if index + 1 < len(args) else default
+    del args[index:index + 2]
+    return value
+
+def pop_flag(args, flag):
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  Build index:  python code-indexer.py build")
-        print("  Search:       python code-indexer.py search 'your query'")
+        print("  Build index:  python code-indexer.py build [--full]")
+        print("  Keep updated: python code-indexer.py watch")
+        print("  Search:       python code-indexer.py search [--json] [--substring] [--limit N] 'your query'")
+        print("  Definitions:  python code-indexer.py symbol [--json] NAME")
         sys.exit(1)
 
     command = sys.argv[1]
+    args = sys.argv[2:]
+    as_json = pop_flag(args, "--json")
 
     if command == "build":
-        create_index()
+        create_index(full="--full" in args)
+    elif command == "watch":
+        watch()
     elif command == "search":
-        if len(sys.argv) < 3:
+        substring = True if pop_flag(args, "--substring") else None
+        limit = int(pop_option(args, "--limit", 20))
+        if not args:
             print("❌ Please provide search query")
             sys.exit(1)
 
-        query = " ".join(sys.argv[2:])
-        print(f"🔍 Searching for: {query}\n")
-
-        results = search(query)
-        if not results:
+        query = " ".join(args)
+        started = time.perf_counter()
+        try:
+            results = search(query, limit=limit, substring=substring)
+        except (ValueError, sqlite3.OperationalError) as e:
+            if as_json:
+                print(json.dumps({'query': query, 'error': str(e)}))
+            else:
+                print(f"❌ {e} (run `build` if the index is missing or outdated)")
+            sys.exit(2)
+        took_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if as_json:
+            print(json.dumps({'query': query, 'took_ms': took_ms, 'results': results}))
+        elif not results:
             print("No results found")
         else:
-            for i, (path, snippet, lang) in enumerate(results, 1):
-                print(f"{i}. [{lang}] {path}")
-                print(f"   {snippet}")
+            print(f"🔍 Searching for: {query} ({took_ms} ms)\n")
+            for i, result in enumerate(results, 1):
+                print(f"{i}. [{result['language']}] {result['path']}")
+                for definition in result['definitions']:
+                    print(f"   ★ {definition['kind']} {definition['name']} (line {definition['line']})")
+                print(f"   {result['snippet']}")
                 print()
+    elif command == "symbol":
+        if not args:
+            print("❌ Please provide a symbol name")
+            sys.exit(1)
+        symbols = find_symbol(args[0])
+        if as_json:
+            print(json.dumps({'name': args[0], 'results': symbols}))
+        elif not symbols:
+            print("No definitions found")
+        else:
+            for symbol in symbols:
+                print(f"{symbol['path']}:{symbol['line']}  {symbol['kind']} {symbol['name']}")
     else:
         print(f"❌ Unknown command: {command}")